@@ -0,0 +1,168 @@
+"""
+Peak memory of taking a large attachment upload and mailing it, buffered
+against streamed. The buffered path reads the request body into memory,
+keeps the file as bytes and builds the whole MIME message before sending
+it; the streamed path writes the upload to the attachment storage as it
+arrives and sends the mail with the encoded attachment going from disk to
+the socket. Each mode runs in a fresh process against a local SMTP sink,
+so its peak RSS is its own.
+
+    python -m benchmarks.attachments --size-mb 100
+"""
+
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import AsyncIterator, Dict
+
+from src.attachment_module.storage import AttachmentStorage
+from src.attachment_module.upload import MultipartFileReader
+from src.channels.base import ChannelMessage
+from src.channels.email_channel import SMTP_COMPAT32, EmailChannel
+from src.channels.smtp_sink import SMTPSinkServer
+
+BOUNDARY = "benchmarkboundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+# about what an ASGI server hands over per receive()
+RECEIVE_SIZE = 64 * 1024
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def upload_stream(path: str) -> AsyncIterator[bytes]:
+    """A multipart upload of the file, in the pieces a server would receive"""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="report.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+    with open(path, "rb") as file:
+        while chunk := file.read(RECEIVE_SIZE):
+            yield chunk
+            await asyncio.sleep(0)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def buffered(path: str, root: str, channel: EmailChannel) -> Dict[str, float]:
+    started = time.perf_counter()
+    body = b"".join([chunk async for chunk in upload_stream(path)])
+
+    async def whole_body():
+        yield body
+
+    reader = MultipartFileReader(CONTENT_TYPE, whole_body())
+    content = b"".join([chunk async for chunk in reader.chunks()])
+    del body
+    sha256 = hashlib.sha256(content).hexdigest()
+    with open(os.path.join(root, sha256), "wb") as file:
+        file.write(content)
+    del content
+    uploaded = time.perf_counter()
+
+    with open(os.path.join(root, sha256), "rb") as file:
+        content = file.read()
+    email = MIMEMultipart("mixed")
+    email.attach(MIMEText("Your report is attached", "plain"))
+    part = MIMEApplication(content, "pdf")
+    part.add_header("Content-Disposition", "attachment", filename="report.pdf")
+    email.attach(part)
+    email["From"] = channel.sender
+    email["To"] = "bench@example.com"
+    email["Subject"] = "Your report"
+    data = email.as_bytes(policy=SMTP_COMPAT32)
+    await channel.pool.send(channel.sender, ["bench@example.com"], data)
+    return {"upload": uploaded - started, "send": time.perf_counter() - uploaded}
+
+
+async def streamed(path: str, root: str, channel: EmailChannel) -> Dict[str, float]:
+    started = time.perf_counter()
+    storage = channel.attachments
+    reader = MultipartFileReader(CONTENT_TYPE, upload_stream(path))
+    blob = await storage.save(reader.chunks())
+    uploaded = time.perf_counter()
+
+    result = await channel.send(
+        ChannelMessage(
+            channel="email",
+            to="bench@example.com",
+            subject="Your report",
+            body="Your report is attached",
+            attachments=[
+                {
+                    "sha256": blob.sha256,
+                    "filename": reader.filename,
+                    "content_type": reader.content_type,
+                }
+            ],
+        )
+    )
+    if not result.success:
+        raise RuntimeError(result.error)
+    return {"upload": uploaded - started, "send": time.perf_counter() - uploaded}
+
+
+def run_mode(mode: str, path: str, port: int, use_uvloop: bool) -> Dict[str, float]:
+    if use_uvloop:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    baseline = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as root:
+        channel = EmailChannel(
+            "127.0.0.1",
+            port,
+            "bench@notifyhub.local",
+            attachments=AttachmentStorage(root, max_size=os.path.getsize(path)),
+        )
+
+        async def main():
+            try:
+                return await (streamed if mode == "streamed" else buffered)(
+                    path, root, channel
+                )
+            finally:
+                await channel.close()
+
+        timings = asyncio.run(main())
+    return {**timings, "baseline": baseline, "peak": peak_rss_mb()}
+
+
+async def main(args):
+    context = multiprocessing.get_context("spawn")
+    with tempfile.NamedTemporaryFile() as attachment:
+        for _ in range(args.size_mb):
+            attachment.write(os.urandom(1024 * 1024))
+        attachment.flush()
+        async with SMTPSinkServer() as sink:
+            loop = asyncio.get_running_loop()
+            for mode in ("buffered", "streamed"):
+                with context.Pool(1) as pool:
+                    result = await loop.run_in_executor(
+                        None,
+                        pool.apply,
+                        run_mode,
+                        (mode, attachment.name, sink.port, args.uvloop),
+                    )
+                print(
+                    f"{mode:<10} peak RSS {result['peak']:8,.1f} MB "
+                    f"({result['peak'] - result['baseline']:+8,.1f} MB over start)  "
+                    f"upload {result['upload']:6.2f}s  send {result['send']:6.2f}s"
+                )
+            print(f"{sink.messages_received} messages received by the sink")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--uvloop", action="store_true")
+    asyncio.run(main(parser.parse_args()))
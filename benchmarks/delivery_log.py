@@ -0,0 +1,114 @@
+"""
+Delivery log writes: sustained status rows/sec through the write-behind
+buffer (COPY in batches) against one INSERT per status change, on
+DATABASE_URL. A producer records dispatcher sized batches as fast as the
+writer keeps up with; rows still buffered at the end don't count.
+
+    python -m benchmarks.delivery_log --duration 30
+    python -m benchmarks.delivery_log --duration 30 --mode single
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete, insert
+
+from src.database.db import async_session, db_init
+from src.delivery_module.models import DeliveryLog
+from src.delivery_module.partitions import DeliveryLogPartitions
+from src.delivery_module.writer import DELIVERY_LOG_COLUMNS, DeliveryLogWriter, utc_now
+from src.dispatch.schema import DispatchItem
+from src.dispatch.status import DeliveryStatus
+
+BENCH_OWNER = uuid.UUID("00000000-0000-4000-8000-0000000d1106")
+
+
+def status_changes(count: int):
+    return [
+        (
+            DispatchItem(
+                channel="email",
+                to=f"user{index}@example.com",
+                body="benchmark",
+                recipient_uid=uuid.uuid4(),
+                owner_uid=BENCH_OWNER,
+            ),
+            DeliveryStatus.SENT,
+        )
+        for index in range(count)
+    ]
+
+
+async def write_behind(args, partitions: DeliveryLogPartitions) -> int:
+    writer = DeliveryLogWriter(
+        async_session,
+        flush_interval=args.flush_interval,
+        batch_size=args.batch_size,
+        max_buffered=args.batch_size * 20,
+        partitions=partitions,
+    )
+    flusher = asyncio.create_task(writer.run())
+    changes = status_changes(args.dispatch_batch)
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        writer.record(changes)
+        # let the flusher run, and don't outrun it by more than a batch or two
+        await asyncio.sleep(0)
+        while len(writer.buffer) > args.batch_size * 2:
+            await asyncio.sleep(0.001)
+    flusher.cancel()
+    await asyncio.gather(flusher, return_exceptions=True)
+    print(f"flushes {writer.flushes}, dropped {writer.dropped}")
+    return writer.written
+
+
+async def single(args) -> int:
+    changes = status_changes(args.dispatch_batch)
+    written = 0
+    deadline = time.perf_counter() + args.duration
+    async with async_session() as session:
+        while time.perf_counter() < deadline:
+            for item, status in changes:
+                row = DeliveryLogWriter.row(item, status, utc_now())
+                await session.execute(
+                    insert(DeliveryLog).values(dict(zip(DELIVERY_LOG_COLUMNS, row)))
+                )
+                await session.commit()
+                written += 1
+    return written
+
+
+async def main(args):
+    await db_init()
+    partitions = DeliveryLogPartitions(async_session)
+    await partitions.maintain()
+    try:
+        started = time.perf_counter()
+        if args.mode == "single":
+            written = await single(args)
+        else:
+            written = await write_behind(args, partitions)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{args.mode}: {written:,} rows in {elapsed:.1f}s, {written / elapsed:,.0f} rows/s"
+        )
+    finally:
+        async with async_session() as session:
+            await session.execute(
+                delete(DeliveryLog).where(DeliveryLog.owner_uid == BENCH_OWNER)
+            )
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--mode", choices=["write-behind", "single"], default="write-behind"
+    )
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--dispatch-batch", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--flush-interval", type=float, default=0.25)
+    asyncio.run(main(parser.parse_args()))
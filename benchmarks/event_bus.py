@@ -0,0 +1,51 @@
+"""
+Microbenchmark of the in-process event bus: events/sec on a single core.
+
+    python -m benchmarks.event_bus --events 200000 --subscribers 4
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from src.core.event.bus import EventBus
+from src.core.event.events import RecipientCreated
+
+
+async def run(events: int, subscribers: int, batch_size: int, queue_size: int):
+    bus = EventBus(max_queue_size=queue_size, batch_size=batch_size)
+    received = 0
+
+    async def handler(batch):
+        nonlocal received
+        received += len(batch)
+
+    for index in range(subscribers):
+        bus.subscribe(RecipientCreated, handler, name=f"subscriber-{index}")
+    await bus.start()
+
+    payload = [
+        RecipientCreated(recipient_uid=uuid4(), created_by=None) for _ in range(1000)
+    ]
+    started = time.perf_counter()
+    for index in range(events):
+        await bus.publish(payload[index % 1000])
+    await bus.stop(drain_timeout=60)
+    elapsed = time.perf_counter() - started
+
+    print(f"published      {events}")
+    print(f"delivered      {received} ({subscribers} subscribers)")
+    print(f"elapsed        {elapsed:.3f}s")
+    print(f"events/sec     {events / elapsed:,.0f} published")
+    print(f"deliveries/sec {received / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--subscribers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.subscribers, args.batch_size, args.queue_size))
@@ -0,0 +1,131 @@
+"""
+Broadcast fan-out: time to first queued send, total time and peak RSS for a
+large audience, streamed from a server-side cursor versus loaded as a list
+through RecipientService.retrieve_all_recipient. Run each mode in its own
+process, peak RSS never goes down within one.
+
+    python -m benchmarks.fanout --recipients 10000000 --seed
+    python -m benchmarks.fanout --mode stream
+    python -m benchmarks.fanout --mode list --cleanup
+
+Uses DATABASE_URL and REDIS_URL from the environment.
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+import uuid
+
+import redis.asyncio as aioredis
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.core.config.env_data import Config
+from src.dispatch.fanout import AudienceFanout
+from src.dispatch.queue import DispatchQueue
+from src.dispatch.schema import BroadcastSchema
+from src.recipient_module.models import Recipient
+from src.recipient_module.service import RecipientService
+
+# fixed owner so --seed, the runs and --cleanup see the same audience
+BENCH_OWNER = uuid.UUID("00000000-0000-4000-8000-00000000be0c")
+
+
+def peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class TimedQueue(DispatchQueue):
+    """Dispatch queue recording when the first item was pushed"""
+
+    first_push = None
+
+    async def enqueue(self, items):
+        count = await super().enqueue(items)
+        if self.first_push is None:
+            self.first_push = time.perf_counter()
+        return count
+
+
+async def seed(engine, recipients: int, batch_size: int = 10000):
+    async with AsyncSession(engine) as session:
+        for start in range(0, recipients, batch_size):
+            await session.execute(
+                insert(Recipient),
+                [
+                    {
+                        "uid": uuid.uuid4(),
+                        "first_name": f"First{index}",
+                        "email": f"user{index}@example.com",
+                        "created_by": BENCH_OWNER,
+                    }
+                    for index in range(start, min(start + batch_size, recipients))
+                ],
+            )
+            await session.commit()
+    print(f"seeded {recipients:,} recipients")
+
+
+async def run(engine, queue: TimedQueue, mode: str, chunk_size: int):
+    broadcast = BroadcastSchema(channel="email", subject="Hello", body="Benchmark")
+    started = time.perf_counter()
+    async with AsyncSession(engine) as session:
+        if mode == "stream":
+            queued = await AudienceFanout(queue, chunk_size).fan_out(
+                broadcast, BENCH_OWNER, session
+            )
+        else:
+            recipients = await RecipientService().retrieve_all_recipient(
+                BENCH_OWNER, session
+            )
+            rows = [(recipient.uid, recipient.email) for recipient in recipients]
+            queued = 0
+            for start in range(0, len(rows), chunk_size):
+                queued += await queue.enqueue(
+                    AudienceFanout.build_items(
+                        broadcast,
+                        uuid.uuid4(),
+                        BENCH_OWNER,
+                        rows[start : start + chunk_size],
+                    )
+                )
+    elapsed = time.perf_counter() - started
+    first = (queue.first_push or time.perf_counter()) - started
+    print(
+        f"{mode:<7} {queued:>11,} queued  first send after {first:7.2f}s  "
+        f"total {elapsed:8.1f}s  peak RSS {peak_rss_mib():8.1f} MiB"
+    )
+
+
+async def main(args):
+    engine = create_async_engine(Config.DATABASE_URL)
+    redis = aioredis.from_url(Config.REDIS_URL, decode_responses=True)
+    prefix = f"bench:fanout:{uuid.uuid4()}"
+    queue = TimedQueue(redis, prefix=prefix)
+    try:
+        if args.seed:
+            await seed(engine, args.recipients)
+        if args.mode:
+            await run(engine, queue, args.mode, args.chunk_size)
+        if args.cleanup:
+            async with AsyncSession(engine) as session:
+                await session.execute(
+                    delete(Recipient).where(Recipient.created_by == BENCH_OWNER)
+                )
+                await session.commit()
+    finally:
+        async for key in redis.scan_iter(match=f"{prefix}:*"):
+            await redis.delete(key)
+        await redis.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=1000000)
+    parser.add_argument("--chunk-size", type=int, default=Config.FANOUT_CHUNK_SIZE)
+    parser.add_argument("--mode", choices=["stream", "list"], default=None)
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,86 @@
+"""
+Cost of the send idempotency layer: claim overhead per message and memory
+per million keys, for the local LRU and (with a reachable Redis) Redis itself.
+
+    python -m benchmarks.idempotency --keys 1000000 --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+import uuid
+
+import redis.asyncio as aioredis
+
+from src.dispatch.idempotency import IdempotencyGuard, LocalKeyCache
+
+
+def local_cache_memory(keys: int):
+    tracemalloc.start()
+    cache = LocalKeyCache(max_size=keys)
+    scope = str(uuid.uuid4())
+    for index in range(keys):
+        cache.add(IdempotencyGuard.key(scope, f"order-{index}:receipt"), 0.0)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"local LRU        {current / keys:8.1f} B/key  {current / 2**20:8.1f} MiB per {keys:,} keys"
+    )
+
+
+async def claim_overhead(redis, keys: int, batch_size: int):
+    guard = IdempotencyGuard(redis, ttl=300, local_cache_size=keys)
+    scope = str(uuid.uuid4())
+    batches = [
+        [
+            IdempotencyGuard.key(scope, f"k{index}")
+            for index in range(start, start + batch_size)
+        ]
+        for start in range(0, keys, batch_size)
+    ]
+    info_before = await redis.info("memory")
+
+    started = time.perf_counter()
+    for batch in batches:
+        await guard.claim(batch)
+    new_keys = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for batch in batches:
+        await guard.claim(batch)
+    hot_duplicates = time.perf_counter() - started
+
+    info_after = await redis.info("memory")
+    redis_bytes = info_after["used_memory"] - info_before["used_memory"]
+    print(
+        f"new keys         {new_keys / keys * 1e6:8.2f} us/message (Redis SET NX, batches of {batch_size})"
+    )
+    print(
+        f"hot duplicates   {hot_duplicates / keys * 1e6:8.2f} us/message (local LRU, no Redis call)"
+    )
+    print(
+        f"Redis memory     {redis_bytes / keys:8.1f} B/key  {redis_bytes / keys * 1e6 / 2**20:8.1f} MiB per 1M keys"
+    )
+    async for key in redis.scan_iter(match=f"idempotency:{scope}:*", count=10000):
+        await redis.delete(key)
+
+
+async def main(keys: int, batch_size: int, redis_url: str):
+    local_cache_memory(keys)
+    if not redis_url:
+        return
+    redis = aioredis.from_url(redis_url)
+    try:
+        await claim_overhead(redis, keys, batch_size)
+    finally:
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.keys, args.batch_size, args.redis_url))
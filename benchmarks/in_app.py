@@ -0,0 +1,151 @@
+"""
+In-app delivery: how many sockets one process holds and how long a message
+per user takes to reach all of them. Runs uvicorn in-process with the real
+ConnectionHub behind an unauthenticated bench route, opens the client
+sockets from the same process, publishes one message per user through
+InAppChannel and reports p50/p99/max publish-to-receive latency.
+
+Clients and server share the process, so RSS per connection is an upper
+bound for the server side. Raise the open file limit for large runs.
+
+    python -m benchmarks.in_app --sockets 50000 --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import time
+import uuid
+from typing import List
+
+import redis.asyncio as aioredis
+import uvicorn
+import websockets
+from fastapi import FastAPI, WebSocket
+
+from src.channels.base import ChannelMessage
+from src.channels.in_app import ConnectionHub, InAppChannel
+
+# ephemeral ports run out at ~28k connections to one address, so the
+# sockets are spread over several listeners
+SOCKETS_PER_PORT = 20000
+
+
+def rss_mib() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def build_app(hub: ConnectionHub) -> FastAPI:
+    app = FastAPI()
+
+    @app.websocket("/bench/{user_uid}")
+    async def bench_socket(websocket: WebSocket, user_uid: str):
+        await websocket.accept()
+        connection = await hub.register(websocket, user_uid)
+        try:
+            await connection.run()
+        finally:
+            await hub.unregister(connection)
+
+    return app
+
+
+async def client(url: str, ready: asyncio.Event, latencies: List[float], done):
+    async with websockets.connect(url, max_queue=None, ping_interval=None) as socket:
+        ready.set()
+        payload = json.loads(await socket.recv())
+        latencies.append(time.time() - payload["sent_at"])
+        done()
+
+
+async def main(args):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    redis = aioredis.from_url(args.redis_url, decode_responses=True)
+    hub = ConnectionHub(redis, buffer_size=args.buffer_size)
+    app = build_app(hub)
+    ports = [
+        args.port + index
+        for index in range((args.sockets + SOCKETS_PER_PORT - 1) // SOCKETS_PER_PORT)
+    ]
+    servers = [
+        uvicorn.Server(
+            uvicorn.Config(
+                app, host="127.0.0.1", port=port, log_level="warning", ws="websockets"
+            )
+        )
+        for port in ports
+    ]
+    server_tasks = [asyncio.create_task(server.serve()) for server in servers]
+    while not all(server.started for server in servers):
+        await asyncio.sleep(0.05)
+
+    rss_before = rss_mib()
+    users = [str(uuid.uuid4()) for _ in range(args.sockets)]
+    latencies: List[float] = []
+    received = asyncio.Event()
+
+    def done():
+        if len(latencies) == len(users):
+            received.set()
+
+    started = time.perf_counter()
+    clients = []
+    for start in range(0, len(users), args.connect_batch):
+        batch = []
+        for index in range(start, min(start + args.connect_batch, len(users))):
+            ready = asyncio.Event()
+            port = ports[index // SOCKETS_PER_PORT]
+            url = f"ws://127.0.0.1:{port}/bench/{users[index]}"
+            clients.append(asyncio.create_task(client(url, ready, latencies, done)))
+            batch.append(ready.wait())
+        await asyncio.gather(*batch)
+    while hub.stats()["connections"] < len(users):
+        await asyncio.sleep(0.05)
+    connect_time = time.perf_counter() - started
+    rss_after = rss_mib()
+    print(
+        f"connected {len(users):,} sockets in {connect_time:.1f}s, "
+        f"{(rss_after - rss_before) * 1024 / len(users):.1f} KiB RSS per socket "
+        "(client and server)"
+    )
+
+    channel = InAppChannel(redis)
+    started = time.perf_counter()
+    for start in range(0, len(users), 1000):
+        await channel.send_many(
+            [
+                ChannelMessage(channel=InAppChannel.name, to=user, body="benchmark")
+                for user in users[start : start + 1000]
+            ]
+        )
+    await asyncio.wait_for(received.wait(), args.timeout)
+    elapsed = time.perf_counter() - started
+    cuts = statistics.quantiles(latencies, n=100)
+    print(
+        f"broadcast to {len(users):,} sockets in {elapsed:.2f}s: "
+        f"p50 {cuts[49] * 1e3:.1f} ms  p99 {cuts[98] * 1e3:.1f} ms  "
+        f"max {max(latencies) * 1e3:.1f} ms"
+    )
+
+    await asyncio.gather(*clients, return_exceptions=True)
+    await hub.stop()
+    for server in servers:
+        server.should_exit = True
+    await asyncio.gather(*server_tasks, return_exceptions=True)
+    await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--sockets", type=int, default=50000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--buffer-size", type=int, default=256)
+    parser.add_argument("--connect-batch", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+"""
+Request throughput with logging on: a FastAPI route behind
+CorrelationIdMiddleware logging one INFO line (and a few DEBUG lines that
+INFO drops) per request, called in-process through ASGI, concurrency
+requests at a time. Compares no logging, a StreamHandler formatting and
+writing JSON on the event loop (what echo=True and print did), and the
+queue handler of src.utils.logger, on a fast sink (/dev/null) and on a
+slow one (a write taking --slow-write-ms, like a blocked stdout pipe).
+
+    python -m benchmarks.logging_throughput --requests 50000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from fastapi import FastAPI
+
+from src.utils.logger import (
+    CorrelationIdMiddleware,
+    JsonFormatter,
+    configure_logging,
+    stop_logging,
+)
+
+logger = logging.getLogger("benchmarks.logging_throughput")
+
+
+class SlowSink:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, data: str):
+        time.sleep(self.delay)
+
+    def flush(self):
+        pass
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CorrelationIdMiddleware)
+
+    @app.get("/bench/{item_id}")
+    async def bench(item_id: int):
+        for step in range(5):
+            logger.debug("Item %d step %d", item_id, step)
+        logger.info("Served item %d", item_id, extra={"item_id": item_id})
+        return {"item_id": item_id}
+
+    return app
+
+
+async def call(app: FastAPI, item_id: int):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/bench/{item_id}",
+        "raw_path": f"/bench/{item_id}".encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, requests, concurrency):
+        await asyncio.gather(
+            *(call(app, item) for item in range(offset, offset + concurrency))
+        )
+    return requests / (time.perf_counter() - started)
+
+
+def direct(stream):
+    # the logging module defaults, which configure_logging trims
+    logging._srcfile = os.path.normcase(logging.addLevelName.__code__.co_filename)
+    logging.logThreads = True
+    logging.logMultiprocessing = True
+    root = logging.getLogger()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+
+
+def main(args):
+    app = build_app()
+    devnull = open("/dev/null", "w")
+    slow = SlowSink(args.slow_write_ms / 1000)
+    results = []
+    for label, sink, setup in (
+        ("no logging", "-", lambda: logging.getLogger().setLevel(logging.CRITICAL)),
+        ("on the loop (before)", "fast", lambda: direct(devnull)),
+        ("queue", "fast", lambda: configure_logging(stream=devnull)),
+        ("on the loop (before)", "slow", lambda: direct(slow)),
+        ("queue", "slow", lambda: configure_logging(stream=slow)),
+    ):
+        handler = setup()
+        asyncio.run(run(app, min(args.requests, 2000), args.concurrency))  # warm up
+        rate = asyncio.run(run(app, args.requests, args.concurrency))
+        dropped = getattr(handler, "dropped", 0)
+        stop_logging()
+        print(f"{label:<22} {sink:<5} {rate:10,.0f} req/s  {dropped:>8,} dropped")
+        results.append({"mode": label, "sink": sink, "rps": rate, "dropped": dropped})
+    if args.json:
+        print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--slow-write-ms", type=float, default=0.2)
+    parser.add_argument("--json", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,129 @@
+"""
+Cost of the metrics: ns per counter increment and histogram observation
+(against the same histogram behind a threading.Lock), request throughput
+of an in-process ASGI route with and without MetricsMiddleware, and the
+time to render /metrics from the snapshots of --processes processes.
+
+    python -m benchmarks.metrics_overhead --requests 50000 --processes 16
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+import timeit
+
+from fastapi import FastAPI
+
+from src.metrics.exposition import merge, render
+from src.metrics.instruments import MetricsMiddleware, http_request_duration
+from src.metrics.registry import MetricsRegistry
+
+
+def per_call_ns(function, number: int = 200000) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e9
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+
+    @app.get("/recipients/{recipient_uid}")
+    async def bench(recipient_uid: str):
+        return {"recipient_uid": recipient_uid}
+
+    return app
+
+
+async def call(app: FastAPI, item: int):
+    path = f"/recipients/{item}"
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def throughput(app: FastAPI, requests: int, concurrency: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, requests, concurrency):
+        await asyncio.gather(
+            *(call(app, item) for item in range(offset, offset + concurrency))
+        )
+    return requests / (time.perf_counter() - started)
+
+
+def process_snapshot(routes: int):
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "http_request_duration_seconds", "", ["method", "route", "status"]
+    )
+    counter = registry.counter("calls_total", "", ["call"])
+    for route in range(routes):
+        for status in ("200", "400", "404"):
+            histogram.labels("GET", f"/route/{route}", status).observe(0.01)
+        counter.labels(f"call-{route}").inc()
+    return registry.snapshot()
+
+
+def main(args):
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "")
+    histogram = registry.histogram("bench_seconds", "", ["route"]).labels("/bench")
+    lock = threading.Lock()
+
+    def locked_observe():
+        with lock:
+            histogram.observe(0.003)
+
+    print(f"{'counter inc':<28} {per_call_ns(counter.inc):8.0f} ns")
+    observe_ns = per_call_ns(lambda: histogram.observe(0.003))
+    print(f"{'histogram observe':<28} {observe_ns:8.0f} ns")
+    print(f"{'histogram observe + lock':<28} {per_call_ns(locked_observe):8.0f} ns")
+
+    for label, instrumented in (
+        ("without middleware", False),
+        ("with middleware", True),
+    ):
+        app = build_app(instrumented)
+        asyncio.run(throughput(app, 2000, args.concurrency))  # warm up
+        rate = asyncio.run(throughput(app, args.requests, args.concurrency))
+        print(f"{label:<28} {rate:8,.0f} req/s")
+    print(f"{'route series':<28} {len(http_request_duration.series):8,}")
+
+    snapshots = [(process_snapshot(args.routes), True) for _ in range(args.processes)]
+    own = process_snapshot(args.routes)
+    started = time.perf_counter()
+    body = render(merge(own, snapshots))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'render /metrics':<28} {elapsed * 1000:8.1f} ms  "
+        f"{args.processes + 1} processes, {len(body) / 1024:,.0f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=16)
+    parser.add_argument("--routes", type=int, default=60)
+    main(parser.parse_args())
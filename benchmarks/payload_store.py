@@ -0,0 +1,101 @@
+"""
+Bytes per queued message for a broadcast, with the content inline in every
+queue item versus stored once in the payload store and referenced by hash.
+Counts the JSON pushed to the queue plus the stored payload spread over the
+audience, for each compression codec, and the Redis memory the queued items
+take when --redis-url is given.
+
+    python -m benchmarks.payload_store --recipients 100000 --body-size 4000
+    python -m benchmarks.payload_store --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import uuid
+from typing import List
+
+import redis.asyncio as aioredis
+
+from src.dispatch.fanout import AudienceFanout
+from src.dispatch.payloads import ZSTD_AVAILABLE, PayloadCodec
+from src.dispatch.queue import DispatchQueue
+from src.dispatch.schema import BroadcastSchema, DispatchItem
+
+
+def campaign_body(size: int) -> str:
+    # words repeat like in a real newsletter, so it compresses like one
+    words = [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9)))
+        for _ in range(300)
+    ]
+    body = []
+    while sum(len(word) + 1 for word in body) < size:
+        body.append(random.choice(words))
+    return " ".join(body)[:size]
+
+
+async def redis_bytes(
+    redis: aioredis.Redis, prefix: str, items: List[DispatchItem]
+) -> int:
+    queue = DispatchQueue(redis, prefix=prefix)
+    before = (await redis.info("memory"))["used_memory"]
+    for start in range(0, len(items), 5000):
+        await queue.enqueue(items[start : start + 5000])
+    used = (await redis.info("memory"))["used_memory"] - before
+    async for key in redis.scan_iter(match=f"{prefix}:*"):
+        await redis.delete(key)
+    return used
+
+
+async def main(args):
+    broadcast = BroadcastSchema(
+        channel="email",
+        subject="Our autumn newsletter",
+        body=campaign_body(args.body_size),
+        metadata={"campaign": "autumn"},
+    )
+    rows = [(uuid.uuid4(), f"recipient{i}@example.com") for i in range(args.recipients)]
+    broadcast_uid, owner_uid = uuid.uuid4(), uuid.uuid4()
+    inline = AudienceFanout.build_items(broadcast, broadcast_uid, owner_uid, rows)
+    payload = {
+        "body": broadcast.body,
+        "subject": broadcast.subject,
+        "metadata": broadcast.metadata,
+    }
+    referenced = AudienceFanout.build_items(
+        broadcast, broadcast_uid, owner_uid, rows, payload_ref="0" * 64
+    )
+
+    inline_bytes = sum(len(item.model_dump_json()) for item in inline)
+    print(f"{'inline (before)':<22} {inline_bytes / len(rows):10,.1f} bytes/message")
+    reference_bytes = sum(len(item.dump()) for item in referenced)
+    codecs = ["none", "gzip"] + (["zstd"] if ZSTD_AVAILABLE else [])
+    for codec in codecs:
+        stored = len(PayloadCodec(codec).encode(payload))
+        print(
+            f"{'by reference, ' + codec:<22} "
+            f"{(reference_bytes + stored) / len(rows):10,.1f} bytes/message  "
+            f"(payload {stored:,} bytes once)"
+        )
+
+    if args.redis_url:
+        redis = aioredis.from_url(args.redis_url, decode_responses=True)
+        prefix = f"bench:payload:{uuid.uuid4()}"
+        try:
+            for label, items in (("inline", inline), ("by reference", referenced)):
+                used = await redis_bytes(redis, f"{prefix}:{label}", items)
+                print(
+                    f"{'redis, ' + label:<22} {used / len(rows):10,.1f} bytes/message"
+                )
+        finally:
+            await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=100000)
+    parser.add_argument("--body-size", type=int, default=4000)
+    parser.add_argument("--redis-url", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,134 @@
+"""
+Transactional latency under a bulk flood: a trickle of transactional messages
+is sent through the real dispatch queue and dispatcher, first on an idle
+queue, then behind a bulk backlog, and p50/p99 queue-to-send latency is
+reported for both. The channel is a stand-in that sleeps per message.
+
+    python -m benchmarks.priority_lanes --redis-url redis://localhost:6379 --bulk 50000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import List
+
+import redis.asyncio as aioredis
+
+from src.channels.base import ChannelAdapter, ChannelMessage, DeliveryResult
+from src.dispatch.dispatcher import Dispatcher
+from src.dispatch.queue import DispatchQueue
+from src.dispatch.retry import RetryScheduler
+from src.dispatch.schema import DispatchItem, Lane
+
+
+class SleepChannel(ChannelAdapter):
+    name = "bench"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.transactional_latencies: List[float] = []
+
+    async def send(self, message: ChannelMessage) -> DeliveryResult:
+        await asyncio.sleep(self.latency)
+        if message.metadata.get("lane") == Lane.TRANSACTIONAL.value:
+            self.transactional_latencies.append(
+                time.perf_counter() - message.metadata["queued_at"]
+            )
+        return DeliveryResult(success=True)
+
+
+def _item(lane: Lane) -> DispatchItem:
+    return DispatchItem(
+        channel=SleepChannel.name,
+        to="bench@example.com",
+        body="benchmark",
+        priority=lane,
+        metadata={"lane": lane.value, "queued_at": time.perf_counter()},
+    )
+
+
+def _report(label: str, latencies: List[float]):
+    if len(latencies) < 2:
+        print(f"{label:<22} not enough samples")
+        return
+    cuts = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<22} p50 {cuts[49] * 1e3:8.1f} ms  p99 {cuts[98] * 1e3:8.1f} ms  ({len(latencies)} messages)"
+    )
+
+
+async def run_phase(
+    redis: aioredis.Redis,
+    prefix: str,
+    latency: float,
+    bulk: int,
+    transactional: int,
+    interval: float,
+    consumers: int,
+    reserved: int,
+    batch_size: int,
+) -> List[float]:
+    # each phase gets its own keys, so a blocking pop cancelled at the end of
+    # one phase can't take items of the next
+    queue = DispatchQueue(redis, prefix=f"{prefix}:queue")
+    channel = SleepChannel(latency)
+    dispatcher = Dispatcher(
+        queue=queue,
+        retry_scheduler=RetryScheduler(redis, queue, prefix=f"{prefix}:retry"),
+        get_channel=lambda name: channel,
+    )
+    for start in range(0, bulk, 1000):
+        await queue.enqueue([_item(Lane.BULK) for _ in range(min(1000, bulk - start))])
+    workers = asyncio.create_task(
+        dispatcher.run_consumers(
+            consumers, {Lane.TRANSACTIONAL: reserved}, batch_size=batch_size
+        )
+    )
+    try:
+        for _ in range(transactional):
+            await queue.enqueue([_item(Lane.TRANSACTIONAL)])
+            await asyncio.sleep(interval)
+        while len(channel.transactional_latencies) < transactional:
+            await asyncio.sleep(0.01)
+    finally:
+        workers.cancel()
+        await asyncio.gather(workers, return_exceptions=True)
+    print(f"bulk left in queue     {(await queue.depths())[Lane.BULK]:,}")
+    return channel.transactional_latencies
+
+
+async def main(args):
+    redis = aioredis.from_url(args.redis_url, decode_responses=True)
+    prefix = f"bench:{uuid.uuid4()}"
+    phase = dict(
+        latency=args.latency,
+        transactional=args.transactional,
+        interval=args.interval,
+        consumers=args.consumers,
+        reserved=args.reserved,
+        batch_size=args.batch_size,
+    )
+    try:
+        idle = await run_phase(redis, f"{prefix}:idle", bulk=0, **phase)
+        _report("idle queue", idle)
+        loaded = await run_phase(redis, f"{prefix}:loaded", bulk=args.bulk, **phase)
+        _report(f"behind {args.bulk:,} bulk", loaded)
+    finally:
+        async for key in redis.scan_iter(match=f"{prefix}:*"):
+            await redis.delete(key)
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--bulk", type=int, default=50000)
+    parser.add_argument("--transactional", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--consumers", type=int, default=8)
+    parser.add_argument("--reserved", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,118 @@
+"""
+Fault injection for the provider circuit breakers and adaptive concurrency.
+Dispatcher-like consumers send mixed batches to two webhook hosts on the
+local sink; midway, one host starts failing (--fault error: fast 503s,
+--fault slow: 503s after --slow-latency), then recovers.
+Reports per phase how many deliveries/sec the healthy host still gets,
+with the provider guard and without it.
+
+    python -m benchmarks.provider_faults --phase 10
+    python -m benchmarks.provider_faults --phase 10 --fault slow
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from src.channels.base import ChannelMessage
+from src.channels.resilience import ProviderGuard
+from src.channels.webhook import WebhookChannel
+from src.channels.webhook_sink import WebhookSinkServer
+
+HEALTHY_HOST = "127.0.0.2"
+DEGRADED_HOST = "127.0.0.3"
+
+
+async def consumer(channel, batch, sent: Counter, stop: asyncio.Event):
+    while not stop.is_set():
+        results = await channel.send_many(batch)
+        for message, result in zip(batch, results):
+            if result.success:
+                sent[message.to] += 1
+
+
+async def run(args, guarded: bool):
+    async with WebhookSinkServer(
+        "0.0.0.0", args.port, latency=args.latency, slow_latency=args.slow_latency
+    ) as sink:
+        channel = WebhookChannel(
+            signing_secret="benchmark-secret",
+            max_concurrency_per_host=args.max_concurrency,
+            timeout=args.timeout,
+            queue_timeout=args.timeout,
+            http2=False,
+        )
+        if guarded:
+            channel.guard = ProviderGuard(
+                min_requests=5,
+                window=args.phase / 4,
+                open_timeout=args.phase / 2,
+                max_concurrency=args.max_concurrency,
+                queue_timeout=0.05,
+            )
+        urls = {
+            host: f"http://{host}:{sink.port}/hooks"
+            for host in (HEALTHY_HOST, DEGRADED_HOST)
+        }
+        batch = [
+            ChannelMessage(channel="webhook", to=urls[host], body="benchmark")
+            for _ in range(args.batch_size // 2)
+            for host in (HEALTHY_HOST, DEGRADED_HOST)
+        ]
+        sent: Counter = Counter()
+        stop = asyncio.Event()
+        consumers = [
+            asyncio.create_task(consumer(channel, batch, sent, stop))
+            for _ in range(args.consumers)
+        ]
+        print(f"{'guarded' if guarded else 'unguarded'}:")
+        for phase in ("healthy", "degraded", "recovered"):
+            if phase == "degraded":
+                sink.failing_hosts.add(DEGRADED_HOST)
+                if args.fault == "slow":
+                    sink.slow_hosts.add(DEGRADED_HOST)
+            elif phase == "recovered":
+                sink.slow_hosts.clear()
+                sink.failing_hosts.clear()
+            before = sent.copy()
+            await asyncio.sleep(args.phase)
+            rates = {
+                host: (sent[url] - before[url]) / args.phase
+                for host, url in urls.items()
+            }
+            state = ""
+            if channel.guard is not None:
+                stats = channel.guard.stats().get(f"webhook:{DEGRADED_HOST}", {})
+                state = (
+                    f"  degraded host circuit {stats.get('state')}, "
+                    f"opened {stats.get('times_opened')}x"
+                )
+            print(
+                f"  {phase:<10} healthy {rates[HEALTHY_HOST]:8,.0f}/s  "
+                f"degraded {rates[DEGRADED_HOST]:8,.0f}/s{state}"
+            )
+        stop.set()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        await channel.close()
+
+
+async def main(args):
+    await run(args, guarded=True)
+    if not args.guarded_only:
+        await run(args, guarded=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phase", type=float, default=10.0, help="seconds per phase")
+    parser.add_argument("--consumers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.001)
+    parser.add_argument("--slow-latency", type=float, default=1.5)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8810)
+    parser.add_argument("--fault", choices=["error", "slow"], default="error")
+    parser.add_argument("--guarded-only", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""
+Aggregate throughput of N worker processes sharing one provider rate limit.
+Exits non-zero when the aggregate rate deviates more than --tolerance from
+the limit. Needs a running Redis.
+
+    python -m benchmarks.rate_limit --redis-url redis://localhost:6379 --rate 100 --workers 8
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+import uuid
+
+import redis.asyncio as aioredis
+
+from src.dispatch.rate_limit import RateLimiter
+
+
+async def run_worker(
+    redis, key: str, rate: float, start_at: float, warmup: float, duration: float
+) -> int:
+    """Acquire tokens as fast as allowed; count those granted inside the measured window"""
+    limiter = RateLimiter(redis, key, rate)
+    window_start, window_end = start_at + warmup, start_at + warmup + duration
+    await asyncio.sleep(max(start_at - time.time(), 0))
+    counted = 0
+    while True:
+        await limiter.acquire()
+        now = time.time()
+        if now >= window_end:
+            return counted
+        if now >= window_start:
+            counted += 1
+
+
+def worker_process(
+    redis_url: str,
+    key: str,
+    rate: float,
+    start_at: float,
+    warmup: float,
+    duration: float,
+    results,
+):
+    async def main():
+        redis = aioredis.from_url(redis_url)
+        try:
+            results.put(await run_worker(redis, key, rate, start_at, warmup, duration))
+        finally:
+            await redis.close()
+
+    asyncio.run(main())
+
+
+def main(
+    redis_url: str,
+    rate: float,
+    workers: int,
+    warmup: float,
+    duration: float,
+    tolerance: float,
+) -> int:
+    key = f"bench:{uuid.uuid4()}"
+    start_at = time.time() + 1
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker_process,
+            args=(redis_url, key, rate, start_at, warmup, duration, results),
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    counts = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    achieved = sum(counts) / duration
+    deviation = abs(achieved - rate) / rate
+    print(f"workers        {workers}")
+    print(f"per worker     {counts}")
+    print(f"limit          {rate:,.1f}/s")
+    print(f"aggregate      {achieved:,.1f}/s")
+    print(f"deviation      {deviation:.2%} (tolerance {tolerance:.0%})")
+    return 0 if deviation <= tolerance else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--rate", type=float, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=2,
+        help="seconds ignored while the initial burst drains",
+    )
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    args = parser.parse_args()
+    sys.exit(
+        main(
+            args.redis_url,
+            args.rate,
+            args.workers,
+            args.warmup,
+            args.duration,
+            args.tolerance,
+        )
+    )
@@ -0,0 +1,148 @@
+"""
+Delivery receipt ingestion on one node: providers POST receipt batches to
+the real receipt router served by uvicorn in-process, and the receipt
+buffer applies them to the delivery log on DATABASE_URL. Seeds --receipts
+sent rows first, reports the acknowledged rate and the end-to-end rate at
+which receipts land in the delivery log. --ingest-only skips the database
+and measures the callback path alone.
+
+    python -m benchmarks.receipts --receipts 200000 --batch 100 --clients 32
+    python -m benchmarks.receipts --receipts 200000 --ingest-only
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import delete
+
+from src.core.config.env_data import Config
+from src.database.db import async_session, db_init
+from src.delivery_module.models import DeliveryLog
+from src.delivery_module.partitions import DeliveryLogPartitions
+from src.delivery_module.writer import DeliveryLogWriter, utc_now
+from src.dispatch.schema import DispatchItem
+from src.dispatch.status import DeliveryStatus
+from src.receipt_module.router import receipt_router
+from src.receipt_module.service import receipt_buffer
+
+BENCH_OWNER = uuid.UUID("00000000-0000-4000-8000-00000000bec1")
+BENCH_TOKEN = "benchmark-receipt-token"
+
+
+async def seed(notification_uids):
+    await db_init()
+    await DeliveryLogPartitions(async_session).maintain()
+    writer = DeliveryLogWriter(async_session, batch_size=10000)
+    writer.record(
+        [
+            (
+                DispatchItem(
+                    uid=uid,
+                    channel="email",
+                    to=f"user{index}@example.com",
+                    body="benchmark",
+                    owner_uid=BENCH_OWNER,
+                ),
+                DeliveryStatus.SENT,
+            )
+            for index, uid in enumerate(notification_uids)
+        ]
+    )
+    await writer.flush()
+
+
+async def cleanup():
+    async with async_session() as session:
+        await session.execute(
+            delete(DeliveryLog).where(DeliveryLog.owner_uid == BENCH_OWNER)
+        )
+        await session.commit()
+
+
+async def client(url: str, batches, acked: list):
+    async with httpx.AsyncClient(headers={"X-Receipt-Token": BENCH_TOKEN}) as http:
+        while batches:
+            batch = batches.pop()
+            response = await http.post(url, content=batch)
+            response.raise_for_status()
+            acked.append(response.json()["accepted"])
+
+
+async def main(args):
+    notification_uids = [uuid.uuid4() for _ in range(args.receipts)]
+    if args.ingest_only:
+
+        async def count_only(rows):
+            return len(rows)
+
+        receipt_buffer.apply = count_only
+    else:
+        print(f"seeding {args.receipts:,} sent rows")
+        await seed(notification_uids)
+
+    Config.RECEIPT_PROVIDER_TOKENS = {"bench": BENCH_TOKEN}
+    app = FastAPI()
+    app.include_router(receipt_router)
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning")
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    flusher = asyncio.create_task(receipt_buffer.run())
+
+    occurred_at = utc_now().isoformat()
+    batches = [
+        (
+            '{"receipts": ['
+            + ",".join(
+                f'{{"notification_uid": "{uid}", "status": "delivered", '
+                f'"occurred_at": "{occurred_at}"}}'
+                for uid in notification_uids[start : start + args.batch]
+            )
+            + "]}"
+        ).encode()
+        for start in range(0, len(notification_uids), args.batch)
+    ]
+    acked: list = []
+    url = f"http://127.0.0.1:{args.port}/receipts/bench"
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client(url, batches, acked) for _ in range(args.clients))
+        )
+        ack_elapsed = time.perf_counter() - started
+        while receipt_buffer.applied + receipt_buffer.unmatched < args.receipts:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        print(
+            f"acknowledged {sum(acked):,} receipts in {ack_elapsed:.2f}s "
+            f"({sum(acked) / ack_elapsed:,.0f}/s, batches of {args.batch})"
+        )
+        print(
+            f"applied {receipt_buffer.applied:,} "
+            f"(unmatched {receipt_buffer.unmatched:,}) in {elapsed:.2f}s "
+            f"({receipt_buffer.applied / elapsed:,.0f}/s end to end)"
+        )
+    finally:
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        server.should_exit = True
+        await server_task
+        if not args.ingest_only:
+            await cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--receipts", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8820)
+    parser.add_argument("--ingest-only", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Planning a 9am-local-time campaign with quiet hours: working out a send
+time for every recipient and one schedule entry each, against counting
+recipients per timezone in one pass and computing one send time per
+timezone, merged into per-instant buckets.
+
+    python -m benchmarks.send_time_planning --recipients 5000000
+"""
+
+import argparse
+import random
+import time
+import zoneinfo
+from datetime import datetime, timezone
+
+from src.schedular.planner import QuietHours, SendTimePlanner
+
+
+def audience_timezones(count: int):
+    zones = sorted(zoneinfo.available_timezones())
+    # a few big zones hold most recipients, like a real customer base
+    weights = [random.paretovariate(1.2) for _ in zones]
+    # a tenth of recipients never set a timezone
+    return random.choices(zones + [None], weights + [sum(weights) / 9], k=count)
+
+
+def per_recipient(planner: SendTimePlanner, timezones, now: datetime):
+    return [
+        (index, planner.send_time(planner.zone(name), now).timestamp())
+        for index, name in enumerate(timezones)
+    ]
+
+
+def main(args):
+    random.seed(7)
+    timezones = audience_timezones(args.recipients)
+    planner = SendTimePlanner(
+        local_time=datetime.strptime(args.local_time, "%H:%M").time(),
+        quiet_hours=QuietHours(
+            datetime.strptime("21:00", "%H:%M").time(),
+            datetime.strptime("08:00", "%H:%M").time(),
+        ),
+    )
+    now = datetime.now(timezone.utc)
+    print(
+        f"{args.recipients:,} recipients in {len(set(timezones)):,} timezones, "
+        f"sending at {args.local_time} local time"
+    )
+
+    started = time.perf_counter()
+    entries = per_recipient(planner, timezones, now)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'per recipient (before)':<24} {elapsed:7.2f}s "
+        f"{len(entries) / elapsed:12,.0f} recipients/s  {len(entries):>10,} schedule entries"
+    )
+    del entries
+
+    started = time.perf_counter()
+    buckets = planner.plan_recipients(timezones, now)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'bucketed':<24} {elapsed:7.2f}s "
+        f"{args.recipients / elapsed:12,.0f} recipients/s  {len(buckets):>10,} schedule entries"
+    )
+    assert sum(bucket.recipients for bucket in buckets) == args.recipients
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=5000000)
+    parser.add_argument("--local-time", default="09:00")
+    main(parser.parse_args())
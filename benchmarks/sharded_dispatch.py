@@ -0,0 +1,140 @@
+"""
+Per-recipient ordering and throughput of the sharded dispatch queue against
+the shared one. Every recipient gets a numbered sequence of notifications
+through a stand-in channel that sleeps per message and fails a share of
+them as retryable; the report counts recipients whose notifications went
+out of order. With --join-at a second shard worker joins halfway through,
+so the run also covers a rebalance.
+
+    python -m benchmarks.sharded_dispatch --redis-url redis://localhost:6379 --recipients 2000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+import redis.asyncio as aioredis
+
+from src.channels.base import ChannelAdapter, ChannelMessage, DeliveryResult
+from src.dispatch.dispatcher import Dispatcher
+from src.dispatch.queue import DispatchQueue
+from src.dispatch.retry import RetryPolicy, RetryScheduler
+from src.dispatch.schema import DispatchItem
+from src.dispatch.sharding import ShardCoordinator, ShardedDispatchQueue, ShardWorker
+
+
+class FlakyChannel(ChannelAdapter):
+    name = "bench"
+
+    def __init__(self, latency: float, fail_rate: float):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.sequences: Dict[str, List[int]] = defaultdict(list)
+
+    async def send(self, message: ChannelMessage) -> DeliveryResult:
+        await asyncio.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            return DeliveryResult(success=False, retryable=True, error="flaky")
+        self.sequences[message.recipient_uid].append(message.metadata["seq"])
+        return DeliveryResult(success=True)
+
+    @property
+    def delivered(self) -> int:
+        return sum(len(sequence) for sequence in self.sequences.values())
+
+    def out_of_order(self) -> int:
+        return sum(sequence != sorted(sequence) for sequence in self.sequences.values())
+
+
+async def run_mode(args, redis: aioredis.Redis, prefix: str, sharded: bool):
+    channel = FlakyChannel(args.latency, args.fail_rate)
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0, max_attempts=100)
+    if sharded:
+        queue = ShardedDispatchQueue(redis, args.shards, prefix=f"{prefix}:queue")
+    else:
+        queue = DispatchQueue(redis, prefix=f"{prefix}:queue")
+    retry = RetryScheduler(redis, queue, policy, prefix=f"{prefix}:retry")
+
+    def worker(name: str) -> asyncio.Task:
+        dispatcher = Dispatcher(queue, retry, get_channel=lambda name: channel)
+        if not sharded:
+            return asyncio.create_task(
+                dispatcher.run_consumers(args.consumers, batch_size=args.batch_size)
+            )
+        coordinator = ShardCoordinator(
+            redis, name, args.shards, ttl=5, prefix=f"{prefix}:queue"
+        )
+        return asyncio.create_task(
+            ShardWorker(
+                dispatcher,
+                queue,
+                coordinator,
+                batch_size=args.batch_size,
+                rebalance_interval=0.5,
+            ).run()
+        )
+
+    recipients = [uuid.uuid4() for _ in range(args.recipients)]
+    total = args.recipients * args.sequence
+    workers = [worker("first")]
+    if not sharded:
+        workers.append(asyncio.create_task(retry.run(max_interval=0.1)))
+    started = time.perf_counter()
+    try:
+        for seq in range(args.sequence):
+            await queue.enqueue(
+                [
+                    DispatchItem(
+                        channel=FlakyChannel.name,
+                        to="bench@example.com",
+                        body="benchmark",
+                        recipient_uid=recipient,
+                        metadata={"seq": seq},
+                    )
+                    for recipient in recipients
+                ]
+            )
+            if sharded and args.join_at and seq == args.sequence // 2:
+                workers.append(worker("second"))
+        while channel.delivered < total:
+            await asyncio.sleep(0.05)
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    label = f"sharded ({args.shards} shards)" if sharded else "shared queue"
+    print(
+        f"{label:<22} {total / elapsed:10,.0f} msg/s  "
+        f"{channel.out_of_order():,} of {args.recipients:,} recipients out of order"
+    )
+
+
+async def main(args):
+    redis = aioredis.from_url(args.redis_url, decode_responses=True)
+    prefix = f"bench:{uuid.uuid4()}"
+    try:
+        await run_mode(args, redis, f"{prefix}:shared", sharded=False)
+        await run_mode(args, redis, f"{prefix}:sharded", sharded=True)
+    finally:
+        async for key in redis.scan_iter(match=f"{prefix}:*"):
+            await redis.delete(key)
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--recipients", type=int, default=2000)
+    parser.add_argument("--sequence", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--consumers", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--fail-rate", type=float, default=0.05)
+    parser.add_argument("--join-at", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""
+SMS route lookups/sec: parsing the free-form number at every send and
+scanning the routing prefixes, against the prefix trie over numbers that
+were normalized to E.164 when the recipient was written.
+
+    python -m benchmarks.sms_routing --numbers 1000000 --carrier-prefixes 5000
+"""
+
+import argparse
+import random
+import time
+
+from src.channels.sms_routing import SmsRoute, SmsRoutingTable
+from src.recipient_module.phone import CALLING_CODES, normalize_phone_number
+
+
+def routing_prefixes(carrier_prefixes: int):
+    routes = {code: SmsRoute(provider=f"country-{code}") for code in CALLING_CODES}
+    while len(routes) < len(CALLING_CODES) + carrier_prefixes:
+        code = random.choice(CALLING_CODES)
+        carrier = "".join(random.choices("0123456789", k=random.randint(1, 4)))
+        routes[code + carrier] = SmsRoute(provider=f"carrier-{code}", tier="mobile")
+    return routes
+
+
+def formatted(number: str) -> str:
+    # how people type them in: spaces, dashes, 00 instead of +
+    digits = number[1:]
+    prefix = random.choice(("+", "00"))
+    return f"{prefix}{digits[:2]} {digits[2:5]}-{digits[5:8]} {digits[8:]}"
+
+
+def timed(label: str, lookup, numbers):
+    started = time.perf_counter()
+    for number in numbers:
+        lookup(number)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<30} {len(numbers) / elapsed:14,.0f} lookups/s")
+
+
+def main(args):
+    random.seed(7)
+    routes = routing_prefixes(args.carrier_prefixes)
+    table = SmsRoutingTable(routes)
+    numbers = [
+        "+"
+        + random.choice(CALLING_CODES)
+        + "".join(random.choices("0123456789", k=random.randint(7, 10)))
+        for _ in range(args.numbers)
+    ]
+    raw_numbers = [formatted(number) for number in numbers]
+    print(f"{len(routes):,} routing prefixes, {args.numbers:,} numbers")
+
+    by_length = sorted(routes.items(), key=lambda item: -len(item[0]))
+
+    def parse_and_scan(raw: str):
+        digits = normalize_phone_number(raw)[1:]
+        for prefix, route in by_length:
+            if digits.startswith(prefix):
+                return route
+        return None
+
+    def parse_and_trie(raw: str):
+        return table.route(normalize_phone_number(raw))
+
+    sample = raw_numbers[: args.scan_sample]
+    timed("parse + prefix scan (before)", parse_and_scan, sample)
+    timed("parse + trie", parse_and_trie, raw_numbers)
+    timed("trie on stored E.164", table.route, numbers)
+    for raw, number in zip(sample[:1000], numbers):
+        assert parse_and_scan(raw) == table.route(number)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--numbers", type=int, default=1000000)
+    parser.add_argument("--carrier-prefixes", type=int, default=5000)
+    parser.add_argument(
+        "--scan-sample",
+        type=int,
+        default=20000,
+        help="numbers to time the prefix scan on, it is slow",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,61 @@
+"""
+Email channel throughput against the local SMTP sink: messages/sec vs pool size.
+
+    python -m benchmarks.smtp_channel --messages 20000 --pool-sizes 1 2 4 8 16
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.channels.base import ChannelMessage
+from src.channels.email_channel import EmailChannel
+from src.channels.smtp_sink import SMTPSinkServer
+
+
+async def run_once(messages: int, pool_size: int, latency: float):
+    async with SMTPSinkServer(latency=latency) as sink:
+        channel = EmailChannel(
+            host=sink.host,
+            port=sink.port,
+            sender="bench@notifyhub.local",
+            max_connections_per_host=pool_size,
+            max_messages_per_connection=1000,
+        )
+        batch = [
+            ChannelMessage(
+                channel="email",
+                to=f"user{index}@example.com",
+                subject="Benchmark",
+                body="Hello from the notify hub benchmark",
+            )
+            for index in range(messages)
+        ]
+        started = time.perf_counter()
+        results = await channel.send_many(batch)
+        elapsed = time.perf_counter() - started
+        await channel.close()
+    sent = sum(result.success for result in results)
+    print(
+        f"pool={pool_size:<4} sent={sent:<7} sessions={sink.sessions_opened:<5} "
+        f"elapsed={elapsed:.2f}s msg/s={sent / elapsed:,.0f}"
+    )
+
+
+async def main(messages: int, pool_sizes, latency: float):
+    for pool_size in pool_sizes:
+        await run_once(messages, pool_size, latency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.001,
+        help="simulated server-side delay per message",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.pool_sizes, args.latency))
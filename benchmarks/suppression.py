@@ -0,0 +1,118 @@
+"""
+Suppression checks at fan-out time: Bloom filter lookups/sec, measured
+false-positive rate against the configured one, and filter memory. With
+--database, also the end-to-end SuppressionFilter.suppressed() rate on
+fan-out sized chunks against DATABASE_URL, exact lookups included.
+
+    python -m benchmarks.suppression --suppressed 1000000 --lookups 1000000
+    python -m benchmarks.suppression --suppressed 100000 --database
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import delete
+
+from src.database.db import async_session
+from src.suppression_module.bloom import BloomFilter
+from src.suppression_module.filter import SuppressionFilter, suppression_key
+from src.suppression_module.models import Suppression
+
+BENCH_OWNER = uuid.UUID("00000000-0000-4000-8000-0000000005b0")
+
+
+def suppressed_address(index: int) -> str:
+    return f"bounced{index}@example.com"
+
+
+def clean_address(index: int) -> str:
+    return f"user{index}@example.com"
+
+
+def bloom_only(suppressed: int, lookups: int, error_rate: float):
+    bloom = BloomFilter(suppressed, error_rate)
+    started = time.perf_counter()
+    for index in range(suppressed):
+        bloom.add(suppression_key(BENCH_OWNER, "email", suppressed_address(index)))
+    build = time.perf_counter() - started
+
+    keys = [
+        suppression_key(BENCH_OWNER, "email", clean_address(index))
+        for index in range(lookups)
+    ]
+    started = time.perf_counter()
+    false_positives = sum(1 for key in keys if key in bloom)
+    elapsed = time.perf_counter() - started
+    print(
+        f"filter          {bloom.memory / 2**20:8.1f} MiB for {suppressed:,} entries, "
+        f"{bloom.hashes} hashes, built in {build:.1f}s"
+    )
+    print(f"lookups         {lookups / elapsed:12,.0f} /s")
+    print(f"false positives {false_positives / lookups:12.5f} (target {error_rate})")
+
+
+async def end_to_end(suppressed: int, lookups: int, error_rate: float, chunk: int):
+    async with async_session() as session:
+        for start in range(0, suppressed, 5000):
+            await session.execute(
+                pg.insert(Suppression)
+                .values(
+                    [
+                        {
+                            "owner_uid": BENCH_OWNER,
+                            "channel": "email",
+                            "address": suppressed_address(index),
+                            "reason": "bounced",
+                        }
+                        for index in range(start, min(start + 5000, suppressed))
+                    ]
+                )
+                .on_conflict_do_nothing()
+            )
+        await session.commit()
+    try:
+        suppression = SuppressionFilter(
+            async_session, capacity=suppressed, error_rate=error_rate
+        )
+        await suppression.refresh()
+        # every 100th address is suppressed, the rest should be filter misses
+        addresses = [
+            suppressed_address(index) if index % 100 == 0 else clean_address(index)
+            for index in range(lookups)
+        ]
+        started = time.perf_counter()
+        for start in range(0, lookups, chunk):
+            await suppression.suppressed(
+                BENCH_OWNER, "email", addresses[start : start + chunk]
+            )
+        elapsed = time.perf_counter() - started
+        stats = suppression.stats()
+        print(f"end to end      {lookups / elapsed:12,.0f} /s in chunks of {chunk:,}")
+        print(
+            f"false positives {stats['false_positive_rate']:12.5f} "
+            f"({stats['false_positives']} exact lookups wasted)"
+        )
+    finally:
+        async with async_session() as session:
+            await session.execute(
+                delete(Suppression).where(Suppression.owner_uid == BENCH_OWNER)
+            )
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--suppressed", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=1000000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--database", action="store_true")
+    args = parser.parse_args()
+    bloom_only(args.suppressed, args.lookups, args.error_rate)
+    if args.database:
+        asyncio.run(
+            end_to_end(args.suppressed, args.lookups, args.error_rate, args.chunk_size)
+        )
@@ -0,0 +1,85 @@
+"""
+Template rendering throughput: renders/sec for a campaign with cold vs warm
+caches, in-process and across the process pool.
+
+    python -m benchmarks.template_render --recipients 1000000 --processes 8
+"""
+
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+from uuid import uuid4
+
+from src.template_module.renderer import TemplateRenderer
+
+SUBJECT = "{{ first_name }}, your weekly summary"
+BODY = """Hi {{ first_name }} {{ last_name or "" }},
+
+{% for item in items %}- {{ item | upper }}
+{% endfor %}
+You are receiving this at {{ email }}. Reply STOP to {{ phone_number }} to opt out.
+"""
+
+
+def contexts(count: int):
+    return [
+        {
+            "uid": str(uuid4()),
+            "first_name": f"First{index}",
+            "last_name": f"Last{index}",
+            "email": f"user{index}@example.com",
+            "phone_number": f"+1555{index:07d}",
+            "items": ["deploys", "alerts", "invoices"],
+        }
+        for index in range(count)
+    ]
+
+
+async def timed(label: str, renderer: TemplateRenderer, parts, batch, **kwargs):
+    started = time.perf_counter()
+    rendered = await renderer.render_batch_parallel(parts, batch, **kwargs)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<32} {len(rendered):>9} renders {elapsed:7.2f}s {len(rendered) / elapsed:>12,.0f}/s"
+    )
+
+
+async def main(recipients: int, processes: int, chunk_size: int):
+    cache_dir = tempfile.mkdtemp(prefix="template-bench-")
+    template_id = uuid4()
+    parts = {
+        "subject": (f"{template_id}:1:subject", SUBJECT),
+        "body": (f"{template_id}:1:body", BODY),
+    }
+    batch = contexts(recipients)
+    try:
+        single = {"chunk_size": recipients + 1}
+        parallel = {"chunk_size": chunk_size, "processes": processes}
+
+        renderer = TemplateRenderer(cache_dir=cache_dir)
+        await timed(
+            "in-process, cold cache", renderer, parts, batch[:chunk_size], **single
+        )
+        await timed(
+            "in-process, warm cache", renderer, parts, batch[:chunk_size], **single
+        )
+        renderer.shutdown()
+
+        shutil.rmtree(cache_dir)
+        renderer = TemplateRenderer(cache_dir=cache_dir)
+        await timed("process pool, cold cache", renderer, parts, batch, **parallel)
+        await timed("process pool, warm cache", renderer, parts, batch, **parallel)
+        renderer.shutdown()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=1000000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.recipients, args.processes, args.chunk_size))
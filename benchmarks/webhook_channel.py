@@ -0,0 +1,116 @@
+"""
+Webhook channel throughput against the local webhook sink across many
+distinct hosts (127.0.x.y loopback addresses), and how much one slow host
+costs everyone else: with --slow-hosts, those hosts answer --slow-latency
+seconds late and the rest of the run should barely notice.
+
+    python -m benchmarks.webhook_channel --messages 50000 --hosts 1000
+    python -m benchmarks.webhook_channel --hosts 1000 --slow-hosts 1
+"""
+
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+from collections import Counter
+
+from src.channels.base import ChannelMessage
+from src.channels.webhook import WebhookChannel
+from src.channels.webhook_sink import WebhookSinkServer
+
+SIGNING_SECRET = "benchmark-secret"
+
+
+def host_address(index: int) -> str:
+    return f"127.0.{index // 250}.{index % 250 + 2}"
+
+
+async def timed_send(channel: WebhookChannel, message: ChannelMessage):
+    started = time.perf_counter()
+    result = await channel.send(message)
+    return result, time.perf_counter() - started
+
+
+async def main(args):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    hosts = [host_address(index) for index in range(args.hosts)]
+    slow_hosts = hosts[: args.slow_hosts]
+    # 0.0.0.0 so that every 127.0.x.y address reaches the sink
+    async with WebhookSinkServer(
+        "0.0.0.0",
+        args.port,
+        latency=args.latency,
+        slow_hosts=slow_hosts,
+        slow_latency=args.slow_latency,
+        signing_secret=SIGNING_SECRET,
+    ) as sink:
+        channel = WebhookChannel(
+            signing_secret=SIGNING_SECRET,
+            max_hosts=args.hosts,
+            max_concurrency_per_host=args.per_host,
+            queue_timeout=args.queue_timeout,
+            http2=False,
+        )
+        messages = [
+            ChannelMessage(
+                channel="webhook",
+                to=f"http://{hosts[index % len(hosts)]}:{sink.port}/hooks",
+                subject="Benchmark",
+                body="Hello from the notify hub benchmark",
+            )
+            for index in range(args.messages)
+        ]
+        outcomes = []
+        started = time.perf_counter()
+        for start in range(0, len(messages), args.batch_size):
+            outcomes.extend(
+                await asyncio.gather(
+                    *(
+                        timed_send(channel, message)
+                        for message in messages[start : start + args.batch_size]
+                    )
+                )
+            )
+        elapsed = time.perf_counter() - started
+        await channel.close()
+
+    errors = Counter(
+        result.error.split(" ")[0] + " " + result.error.split(" ")[-1]
+        for result, _ in outcomes
+        if not result.success
+    )
+    sent = sum(result.success for result, _ in outcomes)
+    latencies = [latency for result, latency in outcomes if result.success]
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    print(
+        f"hosts={args.hosts} slow={args.slow_hosts} sent={sent:,} "
+        f"connections={sink.connections_opened:,} elapsed={elapsed:.2f}s "
+        f"req/s={sent / elapsed:,.0f}"
+    )
+    print(
+        f"latency p50 {cuts[49] * 1e3:.1f} ms  p99 {cuts[98] * 1e3:.1f} ms  "
+        f"busy-host rejections {channel.host_busy:,}"
+    )
+    for error, count in errors.most_common(5):
+        print(f"  {count:>7,} x {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--hosts", type=int, default=1000)
+    parser.add_argument("--slow-hosts", type=int, default=0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.001,
+        help="simulated server-side delay per request",
+    )
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--per-host", type=int, default=8)
+    parser.add_argument("--queue-timeout", type=float, default=1.0)
+    asyncio.run(main(parser.parse_args()))
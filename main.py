@@ -1,23 +1,87 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from src.attachment_module.router import attachment_router
 from src.authentication.router import auth_router
+from src.channels.router import in_app_hub, in_app_router
+from src.core.config.env_data import Config
+from src.core.event.bus import event_bus
 from src.database.db import db_init
+from src.database.redis_client import get_redis
+from src.delivery_module.router import delivery_router
+from src.delivery_module.service import delivery_log_partitions
+from src.dispatch.router import dispatch_router
+from src.dispatch.service import status_stream_hub
+from src.event.event_handlers import register_event_handlers
+from src.metrics.instruments import MetricsMiddleware
+from src.metrics.router import metrics_router
+from src.metrics.service import metrics_exporter
+from src.receipt_module.router import receipt_router
+from src.receipt_module.service import receipt_buffer
 from src.recipient_module.router import recipient_router
+from src.segment_module.router import segment_router
+from src.suppression_module.router import suppression_router
+from src.template_module.router import template_router
+from src.template_module.service import template_renderer
 from src.user_module.router import user_module_router
+from src.utils.logger import CorrelationIdMiddleware, configure_logging
+
+configure_logging(
+    Config.LOG_LEVEL,
+    Config.LOG_FORMAT,
+    debug_sample_rate=Config.LOG_DEBUG_SAMPLE_RATE,
+    queue_size=Config.LOG_QUEUE_SIZE,
+)
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def db_connection(app: FastAPI):
-    print("Opening database connection")
+    logger.info("Opening database connection")
     await db_init()
+    event_bus.configure(
+        max_queue_size=Config.EVENT_BUS_QUEUE_SIZE,
+        batch_size=Config.EVENT_BUS_BATCH_SIZE,
+        batch_timeout=Config.EVENT_BUS_BATCH_TIMEOUT,
+        overflow_policy=Config.EVENT_BUS_OVERFLOW_POLICY,
+        redis=get_redis(),
+    )
+    register_event_handlers(event_bus)
+    await event_bus.start()
+    partition_maintenance = asyncio.create_task(
+        delivery_log_partitions.run(Config.DELIVERY_LOG_MAINTENANCE_INTERVAL)
+    )
+    receipt_flusher = asyncio.create_task(receipt_buffer.run())
+    metrics_writer = asyncio.create_task(metrics_exporter.run())
     yield
-    print("Closing database connection")
+    partition_maintenance.cancel()
+    metrics_writer.cancel()
+    # drains what is still buffered
+    receipt_flusher.cancel()
+    await asyncio.gather(receipt_flusher, return_exceptions=True)
+    await event_bus.stop()
+    await in_app_hub.stop()
+    await status_stream_hub.stop()
+    template_renderer.shutdown()
+    logger.info("Closing database connection")
 
 
 app = FastAPI(lifespan=db_connection)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
 
 app.include_router(user_module_router)
 app.include_router(auth_router)
 app.include_router(recipient_router)
+app.include_router(template_router)
+app.include_router(segment_router)
+app.include_router(suppression_router)
+app.include_router(in_app_router)
+app.include_router(dispatch_router)
+app.include_router(delivery_router)
+app.include_router(receipt_router)
+app.include_router(attachment_router)
+app.include_router(metrics_router)
@@ -7,8 +7,13 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlmodel import SQLModel
 
+from src.attachment_module.models import Attachment
 from src.core.config.env_data import Config
+from src.delivery_module.models import DeliveryLog
 from src.recipient_module.models import Recipient
+from src.segment_module.models import Segment, SegmentMember
+from src.suppression_module.models import Suppression
+from src.template_module.models import NotificationTemplate
 from src.user_module.model import Role, User
 
 database_url = Config.DATABASE_URL
@@ -0,0 +1,26 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlmodel import Column, Field, SQLModel, UniqueConstraint
+
+
+class Attachment(SQLModel, table=True):
+    """
+    An uploaded file. The content lives in the attachment storage under its
+    sha256, so an owner uploading the same file twice gets the same row and
+    owners uploading the same file share the blob.
+    """
+
+    __tablename__ = "attachments"
+    __table_args__ = (UniqueConstraint("created_by", "sha256"),)
+
+    uid: UUID = Field(
+        sa_column=Column(pg.UUID, primary_key=True, default=lambda: uuid4(), index=True)
+    )
+    sha256: str = Field(max_length=64, index=True)
+    filename: str = Field(max_length=255)
+    content_type: str = Field(max_length=255)
+    size: int = Field(sa_column=Column(pg.BIGINT, nullable=False))
+    created_by: UUID = Field(sa_column=Column(pg.UUID, index=True))
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
@@ -0,0 +1,148 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.authentication.auth import AdminRoleChecker, get_current_active_user
+from src.database.db import get_session
+
+from .schema import AttachmentResponse
+from .service import AttachmentService, attachment_storage
+from .storage import AttachmentTooLarge
+from .upload import MultipartFileReader
+
+admin_role = AdminRoleChecker()
+
+attachment_router = APIRouter(tags=["Attachment Management"], prefix="/attachments")
+
+
+async def _owned_attachment(
+    attachment_uid: str,
+    attachment_service: AttachmentService,
+    session: AsyncSession,
+    current_user,
+):
+    attachment = await attachment_service.get_attachment(attachment_uid, session)
+    if not attachment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Attachment Does not exist"
+        )
+    if attachment.created_by != current_user.uid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="You are not allowed to view this resource",
+        )
+    return attachment
+
+
+@attachment_router.post(
+    "/", response_model=AttachmentResponse, status_code=status.HTTP_201_CREATED
+)
+async def upload_attachment(
+    request: Request,
+    attachment_service: AttachmentService = Depends(AttachmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[AttachmentResponse]:
+    """
+    Upload a file as multipart/form-data in a field named file. The body is
+    streamed to disk as it arrives.
+    """
+    try:
+        reader = MultipartFileReader(
+            request.headers.get("content-type", ""), request.stream()
+        )
+        return await attachment_service.upload_attachment(
+            reader, created_by=current_user.uid, session=session
+        )
+    except AttachmentTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@attachment_router.get(
+    "/", response_model=List[AttachmentResponse], status_code=status.HTTP_200_OK
+)
+async def retrieve_all_attachments(
+    attachment_service: AttachmentService = Depends(AttachmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> List[AttachmentResponse]:
+    try:
+        return await attachment_service.retrieve_all_attachments(
+            created_by=current_user.uid, session=session
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@attachment_router.get(
+    "/{attachment_uid}",
+    response_model=AttachmentResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def retrieve_attachment(
+    attachment_uid: str,
+    attachment_service: AttachmentService = Depends(AttachmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[AttachmentResponse]:
+    try:
+        await _owned_attachment(
+            attachment_uid, attachment_service, session, current_user
+        )
+        return await attachment_service.retrieve_attachment(attachment_uid, session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@attachment_router.get("/{attachment_uid}/content", status_code=status.HTTP_200_OK)
+async def download_attachment(
+    attachment_uid: str,
+    attachment_service: AttachmentService = Depends(AttachmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> FileResponse:
+    """The file itself, sent from disk (zero-copy where the server supports it)"""
+    try:
+        attachment = await _owned_attachment(
+            attachment_uid, attachment_service, session, current_user
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FileResponse(
+        attachment_storage.path(attachment.sha256),
+        media_type=attachment.content_type,
+        filename=attachment.filename,
+    )
+
+
+@attachment_router.delete("/{attachment_uid}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_attachment(
+    attachment_uid: str,
+    attachment_service: AttachmentService = Depends(AttachmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+):
+    try:
+        await _owned_attachment(
+            attachment_uid, attachment_service, session, current_user
+        )
+        await attachment_service.delete_attachment(attachment_uid, session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
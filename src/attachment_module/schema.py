@@ -0,0 +1,14 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class AttachmentResponse(BaseModel):
+    uid: UUID
+    sha256: str
+    filename: str
+    content_type: str
+    size: int
+    created_by: UUID
+    created_at: datetime
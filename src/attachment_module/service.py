@@ -0,0 +1,143 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.config.env_data import Config
+
+from .models import Attachment
+from .schema import AttachmentResponse
+from .storage import AttachmentStorage
+from .upload import MultipartFileReader
+
+attachment_storage = AttachmentStorage(
+    Config.ATTACHMENT_DIR,
+    max_size=Config.ATTACHMENT_MAX_SIZE,
+    chunk_size=Config.ATTACHMENT_CHUNK_SIZE,
+)
+
+
+def _attachment_response(attachment: Attachment) -> AttachmentResponse:
+    return AttachmentResponse(
+        uid=attachment.uid,
+        sha256=attachment.sha256,
+        filename=attachment.filename,
+        content_type=attachment.content_type,
+        size=attachment.size,
+        created_by=attachment.created_by,
+        created_at=attachment.created_at,
+    )
+
+
+def attachment_metadata(attachment: Attachment) -> Dict[str, Any]:
+    """What the email channel needs of an attachment, kept in message metadata"""
+    return {
+        "sha256": attachment.sha256,
+        "filename": attachment.filename,
+        "content_type": attachment.content_type,
+    }
+
+
+class AttachmentService:
+    async def upload_attachment(
+        self, reader: MultipartFileReader, created_by: UUID, session: AsyncSession
+    ) -> AttachmentResponse:
+        """
+        Store an upload as it streams in. Uploading a file the owner already
+        has returns the existing attachment.
+
+        Raises:
+            AttachmentTooLarge: If the file is over ATTACHMENT_MAX_SIZE.
+            UploadError: If the body has no file field.
+        """
+        blob = await attachment_storage.save(reader.chunks())
+        try:
+            await session.execute(
+                pg.insert(Attachment)
+                .values(
+                    sha256=blob.sha256,
+                    filename=(reader.filename or blob.sha256)[:255],
+                    content_type=reader.content_type[:255],
+                    size=blob.size,
+                    created_by=created_by,
+                )
+                .on_conflict_do_nothing(index_elements=["created_by", "sha256"])
+            )
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            raise e
+        statement = select(Attachment).where(
+            Attachment.created_by == created_by, Attachment.sha256 == blob.sha256
+        )
+        result = await session.execute(statement)
+        return _attachment_response(result.scalars().one())
+
+    async def get_attachment(
+        self, attachment_uid: str, session: AsyncSession
+    ) -> Optional[Attachment]:
+        UUID(str(attachment_uid))
+        return await session.get(Attachment, attachment_uid)
+
+    async def retrieve_attachment(
+        self, attachment_uid: str, session: AsyncSession
+    ) -> Optional[AttachmentResponse]:
+        attachment = await self.get_attachment(attachment_uid, session)
+        if not attachment:
+            return None
+        return _attachment_response(attachment)
+
+    async def retrieve_all_attachments(
+        self, created_by: UUID, session: AsyncSession
+    ) -> List[AttachmentResponse]:
+        statement = (
+            select(Attachment)
+            .where(Attachment.created_by == created_by)
+            .order_by(Attachment.created_at)
+        )
+        result = await session.execute(statement)
+        return [_attachment_response(row) for row in result.scalars().all()]
+
+    async def delete_attachment(
+        self, attachment_uid: str, session: AsyncSession
+    ) -> Optional[bool]:
+        """Delete an attachment, and its file once no other owner has it"""
+        try:
+            attachment = await self.get_attachment(attachment_uid, session)
+            if not attachment:
+                return None
+            sha256 = attachment.sha256
+            await session.delete(attachment)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            raise e
+        statement = select(func.count()).where(Attachment.sha256 == sha256)
+        if not (await session.execute(statement)).scalar_one():
+            await asyncio.to_thread(attachment_storage.delete, sha256)
+        return True
+
+    async def resolve_attachments(
+        self, attachment_uids: Sequence[UUID], owner_uid: UUID, session: AsyncSession
+    ) -> List[Dict[str, Any]]:
+        """
+        Message metadata for the owner's attachments, in the order given.
+
+        Raises:
+            ValueError: If an attachment does not exist.
+        """
+        if not attachment_uids:
+            return []
+        statement = select(Attachment).where(
+            Attachment.uid.in_(attachment_uids), Attachment.created_by == owner_uid
+        )
+        result = await session.execute(statement)
+        found = {row.uid: row for row in result.scalars().all()}
+        missing = [str(uid) for uid in attachment_uids if uid not in found]
+        if missing:
+            raise ValueError(f"Attachment {missing[0]} does not exist")
+        return [attachment_metadata(found[uid]) for uid in attachment_uids]
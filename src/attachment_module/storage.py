@@ -0,0 +1,156 @@
+import asyncio
+import base64
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import AsyncIterable, Dict, NamedTuple
+
+# source bytes per base64 pass: whole 76 char lines of 57 bytes, and a
+# multiple of the page size so every pass can map its own window
+ENCODE_CHUNK_SIZE = 57 * 16384
+
+SHA256_PATTERN = re.compile("[0-9a-f]{64}")
+
+
+class AttachmentTooLarge(ValueError):
+    pass
+
+
+class StoredBlob(NamedTuple):
+    sha256: str
+    size: int
+
+
+class AttachmentStorage:
+    """
+    Content-addressed attachment files on local disk. Uploads are written
+    chunk by chunk to a temporary file while hashing, then renamed to
+    root/ab/cd/<sha256>, so identical uploads share one file and no upload
+    is ever held in memory. Next to each blob sits its base64 transfer
+    encoding, built once from a memory map of the blob, which outgoing
+    mails send to the SMTP socket with sendfile.
+    """
+
+    def __init__(self, root: str, max_size: int, chunk_size: int = 1 << 20):
+        self.root = Path(root)
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self._encoding: Dict[str, asyncio.Lock] = {}
+
+    def path(self, sha256: str) -> Path:
+        """
+        Raises:
+            ValueError: If sha256 is not a hex SHA-256 digest.
+        """
+        if not isinstance(sha256, str) or not SHA256_PATTERN.fullmatch(sha256):
+            raise ValueError(f"Not a SHA-256 digest: {sha256!r}")
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def encoded_path(self, sha256: str) -> Path:
+        return self.path(sha256).with_suffix(".b64")
+
+    def _temp_file(self):
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+
+    @staticmethod
+    def _write(file, digest, data: bytes):
+        digest.update(data)
+        file.write(data)
+
+    def _publish(self, temp_path: str, sha256: str):
+        """Move a finished upload into place, unless the blob exists already"""
+        path = self.path(sha256)
+        if path.exists():
+            os.unlink(temp_path)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, path)
+
+    async def save(self, chunks: AsyncIterable[bytes]) -> StoredBlob:
+        """
+        Stream an upload to disk.
+
+        Raises:
+            AttachmentTooLarge: If the upload passes max_size, nothing is kept.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        pending = bytearray()
+        file = await asyncio.to_thread(self._temp_file)
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_size:
+                    raise AttachmentTooLarge(
+                        f"Attachment is larger than {self.max_size} bytes"
+                    )
+                pending += chunk
+                # hashing and writing leave the event loop a chunk_size at a time
+                if len(pending) >= self.chunk_size:
+                    await asyncio.to_thread(self._write, file, digest, bytes(pending))
+                    pending.clear()
+            await asyncio.to_thread(self._write, file, digest, bytes(pending))
+            await asyncio.to_thread(file.close)
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
+        sha256 = digest.hexdigest()
+        await asyncio.to_thread(self._publish, file.name, sha256)
+        return StoredBlob(sha256, size)
+
+    def _encode(self, sha256: str) -> Path:
+        encoded = self.encoded_path(sha256)
+        if encoded.exists():
+            return encoded
+        target = self._temp_file()
+        try:
+            with open(self.path(sha256), "rb") as source, target:
+                size = os.fstat(source.fileno()).st_size
+                for start in range(0, size, ENCODE_CHUNK_SIZE):
+                    # a window at a time, so the mapped pages never add up
+                    # to the whole file in this process's RSS
+                    length = min(ENCODE_CHUNK_SIZE, size - start)
+                    with mmap.mmap(
+                        source.fileno(), length, access=mmap.ACCESS_READ, offset=start
+                    ) as view:
+                        lines = base64.encodebytes(view)
+                    if start + length == size:
+                        # the MIME boundary that follows brings the line break
+                        lines = lines[:-1]
+                    target.write(lines.replace(b"\n", b"\r\n"))
+            os.replace(target.name, encoded)
+        except BaseException:
+            os.unlink(target.name)
+            raise
+        return encoded
+
+    async def encoded(self, sha256: str) -> Path:
+        """
+        The blob in base64 with CRLF line breaks and no final one, ready to be
+        sent as a MIME part body; encoded on first use.
+
+        Raises:
+            ValueError: If sha256 is not a hex SHA-256 digest.
+            FileNotFoundError: If the blob does not exist.
+        """
+        encoded = self.encoded_path(sha256)
+        if encoded.exists():
+            return encoded
+        # one encoding per blob at a time, later callers find the file
+        async with self._encoding.setdefault(sha256, asyncio.Lock()):
+            encoded = await asyncio.to_thread(self._encode, sha256)
+        self._encoding.pop(sha256, None)
+        return encoded
+
+    def delete(self, sha256: str):
+        for path in (self.path(sha256), self.encoded_path(sha256)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
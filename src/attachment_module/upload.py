@@ -0,0 +1,107 @@
+from typing import AsyncIterable, AsyncIterator, List, Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+class UploadError(ValueError):
+    pass
+
+
+class MultipartFileReader:
+    """
+    Reads one file field out of a multipart/form-data body as it arrives,
+    handing its bytes on without spooling them like Request.form() does.
+    Other fields are skipped. filename and content_type are known once the
+    first chunk is out, or once the stream is exhausted for an empty file.
+    """
+
+    def __init__(
+        self,
+        content_type: str,
+        stream: AsyncIterable[bytes],
+        field: str = "file",
+    ):
+        _, params = parse_options_header(content_type)
+        try:
+            boundary = params[b"boundary"]
+        except KeyError:
+            raise UploadError("Missing boundary in multipart body")
+        self.stream = stream
+        self.field = field
+        self.filename: Optional[str] = None
+        self.content_type = "application/octet-stream"
+        self.found = False
+        self._headers: List[tuple] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._in_field = False
+        self._done = False
+        self._pending: List[bytes] = []
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+            },
+        )
+
+    def _on_part_begin(self):
+        self._headers = []
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_field:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._in_field:
+            self._in_field = False
+            self._done = True
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers.append((self._header_name.lower(), self._header_value))
+        self._header_name = self._header_value = b""
+
+    def _on_headers_finished(self):
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        if self.found or options.get(b"name", b"").decode() != self.field:
+            return
+        self.found = self._in_field = True
+        filename = options.get(b"filename")
+        if filename is not None:
+            self.filename = filename.decode(errors="replace")
+        if b"content-type" in headers:
+            self.content_type = headers[b"content-type"].decode(errors="replace")
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """
+        The file field's bytes, in the pieces they arrived in.
+
+        Raises:
+            UploadError: If the body has no such field or is cut short.
+        """
+        async for data in self.stream:
+            if self._done:
+                # the rest of the body is other fields, leave it unread
+                break
+            self._parser.write(data)
+            pending, self._pending = self._pending, []
+            for piece in pending:
+                yield piece
+        if not self._done:
+            self._parser.finalize()
+        if not self.found:
+            raise UploadError(f"No {self.field} field in the upload")
+        if not self._done:
+            raise UploadError("The upload ended before the file did")
@@ -7,6 +7,7 @@ import redis.asyncio as aioredis
 from passlib.context import CryptContext
 
 from src.core.config.env_data import Config
+from src.metrics.instruments import redis_call_duration
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -150,6 +151,7 @@ async def is_token_blacklisted(jti: str) -> bool:
     Returns:
         True if the token is blacklisted, False otherwise
     """
-    redis = await redis_connection()
-    is_blacklisted = await redis.get(jti)
+    with redis_call_duration.labels("is_token_blacklisted").time():
+        redis = await redis_connection()
+        is_blacklisted = await redis.get(jti)
     return is_blacklisted is not None
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from src.dispatch.rate_limit import RateLimiter
+
+from .resilience import ProviderGuard, ProviderUnavailable
+
+
+class ChannelMessage(BaseModel):
+    channel: str
+    to: str
+    body: str
+    subject: Optional[str] = None
+    html: Optional[str] = None
+    recipient_uid: Optional[UUID] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    # sha256, filename and content_type of each attachment, set by the server
+    attachments: List[Dict[str, Any]] = Field(default_factory=list)
+    # the notification's uid, stable across retries
+    uid: Optional[UUID] = None
+
+
+class DeliveryResult(BaseModel):
+    success: bool
+    retryable: bool = False
+    error: Optional[str] = None
+    provider_message_id: Optional[str] = None
+
+
+class ChannelError(Exception):
+    """Raised by channel adapters when a provider rejects or fails a send"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class ChannelAdapter(ABC):
+    """
+    Base class for the delivery channels (email, sms, webhook, ...).
+
+    Adapters must be safe to share between coroutines of the same process.
+    """
+
+    name: str = "channel"
+    rate_limiter: Optional[RateLimiter] = None
+    guard: Optional[ProviderGuard] = None
+
+    @abstractmethod
+    async def send(self, message: ChannelMessage) -> DeliveryResult: ...
+
+    def provider_key(
+        self, message: ChannelMessage  # pylint: disable=unused-argument
+    ) -> str:
+        """The provider a message goes through, for the circuit breakers"""
+        return self.name
+
+    async def deliver(self, message: ChannelMessage) -> DeliveryResult:
+        """
+        Send a message once the provider rate limit allows it, through the
+        provider's circuit breaker and concurrency limit when guarded
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        if self.guard is None:
+            return await self.send(message)
+        try:
+            permit = await self.guard.acquire(self.provider_key(message))
+        except ProviderUnavailable as e:
+            if self.rate_limiter is not None:
+                self.rate_limiter.refund()
+            return DeliveryResult(success=False, retryable=True, error=str(e))
+        started = time.monotonic()
+        healthy = False
+        try:
+            result = await self.send(message)
+            # permanent rejections are about the message, not the provider
+            healthy = result.success or not result.retryable
+            return result
+        finally:
+            permit.release(healthy, time.monotonic() - started)
+
+    async def send_many(
+        self, messages: Sequence[ChannelMessage]
+    ) -> List[DeliveryResult]:
+        """Send a batch of messages concurrently, in the order given"""
+        return list(
+            await asyncio.gather(*(self.deliver(message) for message in messages))
+        )
+
+    async def close(self):
+        return None
@@ -0,0 +1,451 @@
+import asyncio
+import base64
+import logging
+import re
+import ssl
+import time
+from collections import deque
+from email.charset import QP, Charset
+from email.header import Header
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.policy import compat32
+from email.utils import make_msgid
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import uuid4
+
+from src.attachment_module.storage import AttachmentStorage
+
+from .base import ChannelAdapter, ChannelError, ChannelMessage, DeliveryResult
+
+logger = logging.getLogger(__name__)
+
+UTF8_QP = Charset("utf-8")
+UTF8_QP.body_encoding = QP
+SMTP_COMPAT32 = compat32.clone(linesep="\r\n")
+
+# a message is its bytes, or for mails with attachments a list of byte
+# segments and files holding attachment bodies ready to send as they are
+MessageData = Union[bytes, List[Union[bytes, Path]]]
+
+FILE_COPY_CHUNK_SIZE = 1 << 20
+
+
+class SMTPResponseError(ChannelError):
+    def __init__(self, code: int, text: str):
+        # 4xx replies are transient, 5xx are permanent
+        super().__init__(f"{code} {text}", retryable=400 <= code < 500)
+        self.code = code
+
+
+class SMTPConnection:
+    """
+    A single persistent SMTP session able to send many messages, pipelining
+    the envelope commands when the server advertises PIPELINING.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        start_tls: bool = False,
+        timeout: float = 30.0,
+        local_hostname: str = "notifyhub.local",
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self.local_hostname = local_hostname
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.extensions: Dict[str, str] = {}
+        self.messages_sent = 0
+        self.last_used = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def _read_reply(self) -> Tuple[int, str]:
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionError("SMTP server closed the connection")
+            lines.append(line[4:].decode(errors="replace").rstrip())
+            if line[3:4] != b"-":
+                return int(line[:3]), "\n".join(lines)
+
+    async def _command(self, command: str, expect: Tuple[int, ...] = (250,)) -> str:
+        self.writer.write(command.encode() + b"\r\n")
+        await self.writer.drain()
+        code, text = await self._read_reply()
+        if code not in expect:
+            raise SMTPResponseError(code, text)
+        return text
+
+    async def _ehlo(self):
+        text = await self._command(f"EHLO {self.local_hostname}")
+        self.extensions = {}
+        for line in text.splitlines()[1:]:
+            keyword, _, params = line.partition(" ")
+            self.extensions[keyword.upper()] = params
+
+    async def connect(self):
+        context = ssl.create_default_context() if self.use_tls else None
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context), self.timeout
+        )
+        code, text = await self._read_reply()
+        if code != 220:
+            raise SMTPResponseError(code, text)
+        await self._ehlo()
+        if self.start_tls and not self.use_tls:
+            if "STARTTLS" not in self.extensions:
+                raise ChannelError("SMTP server does not support STARTTLS", False)
+            await self._command("STARTTLS", expect=(220,))
+            await self.writer.start_tls(ssl.create_default_context())
+            await self._ehlo()
+        if self.username:
+            credentials = f"\0{self.username}\0{self.password or ''}".encode()
+            await self._command(
+                f"AUTH PLAIN {base64.b64encode(credentials).decode()}", expect=(235,)
+            )
+        self.last_used = time.monotonic()
+
+    async def noop(self) -> bool:
+        """Check the session is still alive"""
+        try:
+            await self._command("NOOP")
+            return True
+        except (OSError, asyncio.TimeoutError, ChannelError):
+            return False
+
+    async def _send_file(self, path: Path):
+        """Send a file down the session, with sendfile where the loop can"""
+        loop = asyncio.get_running_loop()
+        with open(path, "rb") as file:
+            try:
+                await loop.sendfile(self.writer.transport, file)
+                return
+            except (NotImplementedError, AttributeError):
+                # uvloop has no sendfile for its transports
+                pass
+            while True:
+                chunk = await asyncio.to_thread(file.read, FILE_COPY_CHUNK_SIZE)
+                if not chunk:
+                    return
+                self.writer.write(chunk)
+                await self.writer.drain()
+
+    async def _send_data(self, data: MessageData):
+        if isinstance(data, bytes):
+            self.writer.write(_dot_stuff(data) + b".\r\n")
+            await self.writer.drain()
+            return
+        for index, segment in enumerate(data):
+            if isinstance(segment, Path):
+                # base64 bodies have no lines starting with a dot to stuff
+                await self.writer.drain()
+                await self._send_file(segment)
+            else:
+                self.writer.write(_dot_stuff(segment, terminate=index == len(data) - 1))
+        self.writer.write(b".\r\n")
+        await self.writer.drain()
+
+    async def send_message(
+        self, mail_from: str, recipients: Sequence[str], data: MessageData
+    ):
+        """
+        Run one mail transaction on this session.
+
+        Raises:
+            SMTPResponseError: If the server rejects the transaction, the
+                session is reset and stays usable.
+        """
+        envelope = [f"MAIL FROM:<{mail_from}>"] + [
+            f"RCPT TO:<{rcpt}>" for rcpt in recipients
+        ]
+        try:
+            if "PIPELINING" in self.extensions:
+                # MAIL, RCPT and DATA go out in a single write, replies are read in order
+                self.writer.write(
+                    "".join(
+                        f"{command}\r\n" for command in envelope + ["DATA"]
+                    ).encode()
+                )
+                await self.writer.drain()
+                replies = [await self._read_reply() for _ in range(len(envelope) + 1)]
+                for code, text in replies[:-1]:
+                    if code not in (250, 251):
+                        if replies[-1][0] == 354:
+                            # the server still accepted DATA, abort it with an empty body
+                            await self._command(".", expect=(250, 554, 503))
+                        raise SMTPResponseError(code, text)
+                if replies[-1][0] != 354:
+                    raise SMTPResponseError(*replies[-1])
+            else:
+                for command in envelope:
+                    await self._command(command, expect=(250, 251))
+                await self._command("DATA", expect=(354,))
+            await self._send_data(data)
+            code, text = await self._read_reply()
+            if code != 250:
+                raise SMTPResponseError(code, text)
+        except SMTPResponseError:
+            await self._command("RSET")
+            raise
+        finally:
+            self.last_used = time.monotonic()
+        self.messages_sent += 1
+        return text
+
+    async def close(self):
+        if not self.connected:
+            return
+        try:
+            self.writer.write(b"QUIT\r\n")
+            await self.writer.drain()
+            self.writer.close()
+            await self.writer.wait_closed()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.writer = None
+
+
+def _dot_stuff(data: bytes, terminate: bool = True) -> bytes:
+    data = data.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+    if data.startswith(b"."):
+        data = b"." + data
+    data = data.replace(b"\r\n.", b"\r\n..")
+    if terminate and not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return data
+
+
+class SMTPConnectionPool:
+    """
+    Pool of keep-alive SMTP sessions to one host, capped at max_connections.
+
+    Sessions are recycled after max_messages_per_connection messages, probed
+    with NOOP when they have been idle longer than keepalive_interval and
+    dropped after idle_timeout.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_connections: int = 10,
+        max_messages_per_connection: int = 100,
+        keepalive_interval: float = 15.0,
+        idle_timeout: float = 60.0,
+        **connection_options,
+    ):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.max_messages_per_connection = max_messages_per_connection
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.connection_options = connection_options
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: Deque[SMTPConnection] = deque()
+        self.opened = 0
+
+    async def _new_connection(self) -> SMTPConnection:
+        connection = SMTPConnection(self.host, self.port, **self.connection_options)
+        await connection.connect()
+        self.opened += 1
+        return connection
+
+    async def acquire(self) -> SMTPConnection:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                idle_for = time.monotonic() - connection.last_used
+                if not connection.connected or idle_for > self.idle_timeout:
+                    await connection.close()
+                    continue
+                if idle_for > self.keepalive_interval and not await connection.noop():
+                    await connection.close()
+                    continue
+                return connection
+            return await self._new_connection()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, connection: SMTPConnection, discard: bool = False):
+        try:
+            if (
+                discard
+                or not connection.connected
+                or connection.messages_sent >= self.max_messages_per_connection
+            ):
+                await connection.close()
+            else:
+                self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    async def send(
+        self, mail_from: str, recipients: Sequence[str], data: MessageData
+    ) -> str:
+        """
+        Send a message on a pooled session, reconnecting once if a reused
+        session turns out to be dead.
+        """
+        for attempt in range(2):
+            connection = await self.acquire()
+            reused = connection.messages_sent > 0
+            try:
+                reply = await connection.send_message(mail_from, recipients, data)
+            except SMTPResponseError:
+                await self.release(connection)
+                raise
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                await self.release(connection, discard=True)
+                if attempt or not reused:
+                    raise ChannelError(f"SMTP connection failed: {e}") from e
+                continue
+            await self.release(connection)
+            return reply
+
+    async def close(self):
+        while self._idle:
+            await self._idle.pop().close()
+
+
+class EmailChannel(ChannelAdapter):
+    """
+    Email channel sending through pooled SMTP sessions to the configured
+    relay, always from the configured sender; messages can't pick another
+    relay or sender, so it's never an open relay. The message's
+    attachments are read from the attachment storage; their
+    encoded bodies go from disk to the socket without passing through the
+    message bytes.
+    """
+
+    name = "email"
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        max_connections_per_host: int = 10,
+        max_messages_per_connection: int = 100,
+        attachments: Optional[AttachmentStorage] = None,
+        **connection_options,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.sender_domain = sender.rpartition("@")[2] or None
+        self.attachments = attachments
+        self.pool = SMTPConnectionPool(
+            host,
+            port,
+            max_connections=max_connections_per_host,
+            max_messages_per_connection=max_messages_per_connection,
+            **connection_options,
+        )
+
+    @staticmethod
+    def _attachment_part(attachment: Dict[str, Any], placeholder: str) -> MIMEBase:
+        content_type = attachment.get("content_type") or "application/octet-stream"
+        maintype, _, subtype = content_type.split(";")[0].strip().partition("/")
+        part = MIMEBase(maintype or "application", subtype or "octet-stream")
+        part["Content-Transfer-Encoding"] = "base64"
+        filename = attachment.get("filename") or attachment["sha256"]
+        part.add_header(
+            "Content-Disposition",
+            "attachment",
+            filename=filename if filename.isascii() else ("utf-8", "", filename),
+        )
+        part.set_payload(placeholder)
+        return part
+
+    def build_message(
+        self, message: ChannelMessage, attachments: Sequence[Path] = ()
+    ) -> Tuple[str, MessageData]:
+        """
+        The message id and data of a mail. attachments are the encoded
+        bodies of the message's attachments, in order; the data
+        is then segments with those files in place of the part bodies.
+        """
+        # the compat32 MIME classes are several times faster to build than
+        # EmailMessage, whose header registry dominates per-message cost
+        html = message.html
+        if html:
+            email = MIMEMultipart("alternative")
+            email.attach(MIMEText(message.body, "plain", UTF8_QP))
+            email.attach(MIMEText(html, "html", UTF8_QP))
+        else:
+            email = MIMEText(message.body, "plain", UTF8_QP)
+        placeholders: Dict[bytes, Path] = {}
+        if attachments:
+            body, email = email, MIMEMultipart("mixed")
+            email.attach(body)
+            for attachment, path in zip(message.attachments, attachments):
+                placeholder = f"attachment-{uuid4().hex}"
+                email.attach(self._attachment_part(attachment, placeholder))
+                placeholders[placeholder.encode()] = path
+        message_id = make_msgid(domain=self.sender_domain)
+        email["Message-ID"] = message_id
+        email["From"] = self.sender
+        email["To"] = message.to
+        subject = message.subject or ""
+        email["Subject"] = subject if subject.isascii() else Header(subject, UTF8_QP)
+        data = email.as_bytes(policy=SMTP_COMPAT32)
+        if not placeholders:
+            return message_id, data
+        pattern = b"(" + b"|".join(placeholders) + b")"
+        return message_id, [
+            placeholders.get(segment, segment) for segment in re.split(pattern, data)
+        ]
+
+    async def _encoded_attachments(self, message: ChannelMessage) -> List[Path]:
+        attachments = message.attachments
+        if not attachments:
+            return []
+        if self.attachments is None:
+            raise ChannelError("Attachments are not configured", retryable=False)
+        encoded = []
+        for attachment in attachments:
+            try:
+                encoded.append(await self.attachments.encoded(attachment["sha256"]))
+            except FileNotFoundError as e:
+                raise ChannelError(
+                    f"Attachment {attachment['sha256']} is missing", retryable=False
+                ) from e
+            except ValueError as e:
+                raise ChannelError(str(e), retryable=False) from e
+        return encoded
+
+    def provider_key(self, message: ChannelMessage) -> str:
+        return f"{self.name}:{self.host}:{self.port}"
+
+    async def send(self, message: ChannelMessage) -> DeliveryResult:
+        try:
+            attachments = await self._encoded_attachments(message)
+            message_id, data = self.build_message(message, attachments)
+            await self.pool.send(self.sender, [message.to], data)
+        except ChannelError as e:
+            return DeliveryResult(success=False, retryable=e.retryable, error=str(e))
+        return DeliveryResult(success=True, provider_message_id=message_id)
+
+    async def close(self):
+        await self.pool.close()
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Set
+
+import redis.asyncio as aioredis
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .base import ChannelAdapter, ChannelMessage, DeliveryResult
+
+logger = logging.getLogger(__name__)
+
+IN_APP_CHANNEL_PREFIX = "in_app:user"
+
+# close code sent to sockets that can't keep up with their messages
+SLOW_CONSUMER_CLOSE_CODE = 4008
+GOING_AWAY_CLOSE_CODE = 1001
+
+
+def user_channel(user_uid: str) -> str:
+    return f"{IN_APP_CHANNEL_PREFIX}:{user_uid}"
+
+
+class Connection:
+    """
+    One user socket. Messages go through a bounded send buffer drained by
+    the connection's own task, so a slow client never blocks the fan-out to
+    the others; when its buffer is full it gets evicted instead.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_uid: str,
+        buffer_size: int = 256,
+        send_timeout: float = 5.0,
+    ):
+        self.websocket = websocket
+        self.user_uid = user_uid
+        self.send_timeout = send_timeout
+        self.buffer: "asyncio.Queue[str]" = asyncio.Queue(maxsize=buffer_size)
+        self.close_code: Optional[int] = None
+        self.close_reason = ""
+        self._sender: Optional[asyncio.Task] = None
+
+    @property
+    def evicted(self) -> bool:
+        return self.close_code == SLOW_CONSUMER_CLOSE_CODE
+
+    def offer(self, payload: str) -> bool:
+        """Buffer a message, False when the buffer is full"""
+        try:
+            self.buffer.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self, code: int = GOING_AWAY_CLOSE_CODE, reason: str = ""):
+        """Stop sending and close the socket with code"""
+        if self.close_code is None:
+            self.close_code, self.close_reason = code, reason
+        if self._sender is not None:
+            self._sender.cancel()
+
+    def evict(self):
+        self.close(SLOW_CONSUMER_CLOSE_CODE, "slow consumer")
+
+    async def _send(self):
+        while True:
+            payload = await self.buffer.get()
+            try:
+                await asyncio.wait_for(
+                    self.websocket.send_text(payload), self.send_timeout
+                )
+            except asyncio.TimeoutError:
+                self.evict()
+                return
+
+    async def _receive(self):
+        # clients don't send anything we act on, but reading is how a
+        # disconnect is noticed
+        try:
+            while True:
+                await self.websocket.receive_text()
+        except WebSocketDisconnect:
+            return
+
+    async def run(self):
+        """Serve the socket until the client leaves or it is closed"""
+        self._sender = asyncio.create_task(self._send())
+        receiver = asyncio.create_task(self._receive())
+        try:
+            await asyncio.wait(
+                {self._sender, receiver}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            self._sender.cancel()
+            receiver.cancel()
+            await asyncio.gather(self._sender, receiver, return_exceptions=True)
+        if self.close_code is not None:
+            try:
+                await asyncio.wait_for(
+                    self.websocket.close(
+                        code=self.close_code, reason=self.close_reason
+                    ),
+                    1.0,
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+
+
+class ConnectionHub:
+    """
+    The in-app sockets of this process, by user. The hub subscribes to a
+    user's Redis channel while it holds at least one of their sockets, so a
+    message published on any node reaches only the nodes that need it, and
+    each node serializes nothing: the published payload is sent as is.
+    """
+
+    def __init__(
+        self, redis: aioredis.Redis, buffer_size: int = 256, send_timeout: float = 5.0
+    ):
+        self.redis = redis
+        self.buffer_size = buffer_size
+        self.send_timeout = send_timeout
+        self.connections: Dict[str, Set[Connection]] = {}
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._stopping = False
+        self.delivered = 0
+        self.evicted = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self.connections),
+            "connections": sum(len(c) for c in self.connections.values()),
+            "delivered": self.delivered,
+            "evicted": self.evicted,
+        }
+
+    async def register(self, websocket: WebSocket, user_uid: str) -> Connection:
+        connection = Connection(
+            websocket, user_uid, self.buffer_size, self.send_timeout
+        )
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            connections = self.connections.setdefault(user_uid, set())
+            connections.add(connection)
+            if len(connections) == 1:
+                await self._pubsub.subscribe(user_channel(user_uid))
+            if self._reader is None:
+                self._reader = asyncio.create_task(self._read())
+        return connection
+
+    async def unregister(self, connection: Connection):
+        async with self._lock:
+            connections = self.connections.get(connection.user_uid)
+            if connections is None:
+                return
+            connections.discard(connection)
+            if not connections:
+                del self.connections[connection.user_uid]
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(user_channel(connection.user_uid))
+
+    def dispatch(self, user_uid: str, payload: str):
+        """Buffer a message on every local socket of the user"""
+        for connection in self.connections.get(user_uid, ()):
+            if connection.offer(payload):
+                self.delivered += 1
+            elif not connection.evicted:
+                self.evicted += 1
+                logger.info("Evicting slow in-app consumer of user %s", user_uid)
+                connection.evict()
+
+    async def _read(self):
+        prefix = len(IN_APP_CHANNEL_PREFIX) + 1
+        # redis-py can swallow a cancel that lands mid-read, so the loop
+        # also checks the flag
+        while not self._stopping:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("In-app pub/sub read failed")
+                await asyncio.sleep(1.0)
+                continue
+            if message and message["type"] == "message":
+                self.dispatch(message["channel"][prefix:], message["data"])
+
+    async def stop(self):
+        self._stopping = True
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        for connections in list(self.connections.values()):
+            for connection in list(connections):
+                connection.close(GOING_AWAY_CLOSE_CODE, "server shutdown")
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+
+
+class InAppChannel(ChannelAdapter):
+    """
+    Delivers to the in-app sockets of a user, wherever they are connected.
+    The address (ChannelMessage.to) is the user uid. Users without an open
+    socket miss the message; PUBLISH does not store anything.
+    """
+
+    name = "in_app"
+
+    def __init__(self, redis: aioredis.Redis):
+        self.redis = redis
+
+    @staticmethod
+    def payload(message: ChannelMessage) -> str:
+        return json.dumps(
+            {
+                "subject": message.subject,
+                "body": message.body,
+                "recipient_uid": message.recipient_uid,
+                "metadata": message.metadata,
+                "sent_at": time.time(),
+            },
+            default=str,
+        )
+
+    async def send(self, message: ChannelMessage) -> DeliveryResult:
+        try:
+            await self.redis.publish(user_channel(message.to), self.payload(message))
+        except aioredis.RedisError as e:
+            return DeliveryResult(success=False, retryable=True, error=str(e))
+        return DeliveryResult(success=True)
+
+    async def send_many(
+        self, messages: Sequence[ChannelMessage]
+    ) -> List[DeliveryResult]:
+        """One pipelined round trip of PUBLISH commands for the whole batch"""
+        if self.rate_limiter is not None:
+            return await super().send_many(messages)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for message in messages:
+                    pipe.publish(user_channel(message.to), self.payload(message))
+                await pipe.execute()
+        except aioredis.RedisError as e:
+            return [
+                DeliveryResult(success=False, retryable=True, error=str(e))
+                for _ in messages
+            ]
+        return [DeliveryResult(success=True) for _ in messages]
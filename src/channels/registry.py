@@ -0,0 +1,90 @@
+from typing import Dict
+
+from src.attachment_module.service import attachment_storage
+from src.core.config.env_data import Config
+from src.database.redis_client import get_redis
+from src.dispatch.rate_limit import RateLimiter
+
+from .base import ChannelAdapter
+from .email_channel import EmailChannel
+from .in_app import InAppChannel
+from .resilience import ProviderGuard
+from .sms_routing import SmsRoutingTable
+from .webhook import WebhookChannel
+
+_channels: Dict[str, ChannelAdapter] = {}
+
+sms_routing_table = SmsRoutingTable.from_config(
+    Config.SMS_ROUTES, Config.SMS_DEFAULT_ROUTE
+)
+
+
+def build_guard() -> ProviderGuard:
+    return ProviderGuard(
+        error_rate=Config.CIRCUIT_BREAKER_ERROR_RATE,
+        min_requests=Config.CIRCUIT_BREAKER_MIN_REQUESTS,
+        window=Config.CIRCUIT_BREAKER_WINDOW,
+        open_timeout=Config.CIRCUIT_BREAKER_OPEN_TIMEOUT,
+        half_open_calls=Config.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+        initial_concurrency=Config.PROVIDER_INITIAL_CONCURRENCY,
+        min_concurrency=Config.PROVIDER_MIN_CONCURRENCY,
+        max_concurrency=Config.PROVIDER_MAX_CONCURRENCY,
+        latency_tolerance=Config.PROVIDER_LATENCY_TOLERANCE,
+        queue_timeout=Config.PROVIDER_QUEUE_TIMEOUT,
+    )
+
+
+def build_channels() -> Dict[str, ChannelAdapter]:
+    """Build the channel adapters configured in the environment"""
+    channels = {
+        EmailChannel.name: EmailChannel(
+            host=Config.SMTP_HOST,
+            port=Config.SMTP_PORT,
+            sender=Config.SMTP_SENDER,
+            max_connections_per_host=Config.SMTP_MAX_CONNECTIONS_PER_HOST,
+            max_messages_per_connection=Config.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            attachments=attachment_storage,
+            username=Config.SMTP_USERNAME,
+            password=Config.SMTP_PASSWORD,
+            use_tls=Config.SMTP_USE_TLS,
+            start_tls=Config.SMTP_START_TLS,
+        ),
+        InAppChannel.name: InAppChannel(get_redis()),
+        WebhookChannel.name: WebhookChannel(
+            signing_secret=Config.WEBHOOK_SIGNING_SECRET,
+            max_concurrency_per_host=Config.WEBHOOK_MAX_CONCURRENCY_PER_HOST,
+            max_hosts=Config.WEBHOOK_MAX_HOSTS,
+            timeout=Config.WEBHOOK_TIMEOUT,
+            queue_timeout=Config.WEBHOOK_HOST_QUEUE_TIMEOUT,
+            http2=Config.WEBHOOK_HTTP2,
+        ),
+    }
+    for name, rate in Config.CHANNEL_RATE_LIMITS.items():
+        if name in channels:
+            channels[name].rate_limiter = RateLimiter(get_redis(), name, rate)
+    for name in Config.GUARDED_CHANNELS:
+        if name in channels:
+            channels[name].guard = build_guard()
+    return channels
+
+
+def get_channel(name: str) -> ChannelAdapter:
+    """
+    Get the process-wide adapter for a channel, creating the adapters on first use
+    Args:
+        name: The channel name, e.g. "email"
+    Returns:
+        The channel adapter
+    """
+    if not _channels:
+        _channels.update(build_channels())
+    try:
+        return _channels[name]
+    except KeyError as e:
+        raise ValueError(f"Unknown channel: {name}") from e
+
+
+async def close_channels():
+    for channel in _channels.values():
+        await channel.close()
+    _channels.clear()
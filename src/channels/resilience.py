@@ -0,0 +1,276 @@
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, List, Optional
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of calling a provider whose circuit is open or that is saturated"""
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a rolling window of outcomes, split into buckets
+    so old outcomes age out a bucket at a time.
+
+    Closed, it trips open once at least min_requests calls in the window
+    failed at error_rate or more. Open, it refuses every call for
+    open_timeout seconds, then goes half-open and lets half_open_calls
+    trial calls through: all of them succeeding closes it, any failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        error_rate: float = 0.5,
+        min_requests: int = 20,
+        window: float = 10.0,
+        buckets: int = 10,
+        open_timeout: float = 30.0,
+        half_open_calls: int = 5,
+    ):
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.bucket_width = window / buckets
+        self.open_timeout = open_timeout
+        self.half_open_calls = half_open_calls
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        # [bucket start, successes, failures]
+        self._buckets: Deque[List[float]] = deque(maxlen=buckets)
+        self._trials = 0
+        self._trial_successes = 0
+
+    def _bucket(self, now: float) -> List[float]:
+        start = now - now % self.bucket_width
+        if not self._buckets or self._buckets[-1][0] != start:
+            self._buckets.append([start, 0, 0])
+        return self._buckets[-1]
+
+    def counts(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        oldest = now - self.bucket_width * self._buckets.maxlen
+        successes = failures = 0
+        for start, bucket_successes, bucket_failures in self._buckets:
+            if start > oldest:
+                successes += bucket_successes
+                failures += bucket_failures
+        return successes, failures
+
+    def _open(self, now: float):
+        self.state = CircuitState.OPEN
+        self.opened_at = now
+        self.times_opened += 1
+
+    def allow(self) -> bool:
+        """Whether a call may go through now; counts it as a trial when half-open"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == CircuitState.OPEN:
+            if now - self.opened_at < self.open_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._trials = self._trial_successes = 0
+        if self._trials >= self.half_open_calls:
+            return False
+        self._trials += 1
+        return True
+
+    def cancel_trial(self):
+        """Give back a half-open trial that never reached the provider"""
+        if self.state == CircuitState.HALF_OPEN and self._trials:
+            self._trials -= 1
+
+    def record(self, success: bool):
+        now = time.monotonic()
+        if self.state == CircuitState.HALF_OPEN:
+            if not success:
+                self._open(now)
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self.state = CircuitState.CLOSED
+                self._buckets.clear()
+            return
+        if self.state == CircuitState.OPEN:
+            # a call let through before the circuit opened
+            return
+        self._bucket(now)[1 if success else 2] += 1
+        successes, failures = self.counts(now)
+        total = successes + failures
+        if total >= self.min_requests and failures / total >= self.error_rate:
+            self._open(now)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by AIMD on observed latency. The limit grows
+    by about one per limit calls completed within latency_tolerance times
+    the baseline latency, and is multiplied by backoff (at most once per
+    baseline round trip) when a call is slower than that or fails. The
+    baseline follows the fastest latency seen, drifting slowly upwards so
+    it recovers from a one-off fast outlier.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.5,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a slot, False when none freed up within timeout"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the caller got cancelled
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, latency: float, success: bool = True):
+        self.in_flight -= 1
+        now = time.monotonic()
+        if success:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                self.baseline += (latency - self.baseline) * 0.01
+        congested = not success or latency > self.baseline * self.latency_tolerance
+        if not congested:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        elif now - self._last_decrease > (self.baseline or 0.0):
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._last_decrease = now
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class ProviderPermit:
+    def __init__(self, breaker: CircuitBreaker, limiter: AdaptiveLimiter):
+        self.breaker = breaker
+        self.limiter = limiter
+
+    def release(self, healthy: bool, latency: float):
+        self.breaker.record(healthy)
+        self.limiter.release(latency, healthy)
+
+
+class ProviderGuard:
+    """
+    A circuit breaker and an adaptive concurrency limit per provider key
+    (a provider, a relay host, a webhook host...). A degraded provider gets
+    fewer and fewer concurrent calls and then none at all, its messages fail
+    fast as retryable, and workers spend their time on the healthy ones.
+    """
+
+    def __init__(
+        self,
+        error_rate: float = 0.5,
+        min_requests: int = 20,
+        window: float = 10.0,
+        open_timeout: float = 30.0,
+        half_open_calls: int = 5,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        latency_tolerance: float = 2.0,
+        queue_timeout: float = 1.0,
+    ):
+        self.breaker_options = dict(
+            error_rate=error_rate,
+            min_requests=min_requests,
+            window=window,
+            open_timeout=open_timeout,
+            half_open_calls=half_open_calls,
+        )
+        self.limiter_options = dict(
+            initial=initial_concurrency,
+            min_limit=min_concurrency,
+            max_limit=max_concurrency,
+            latency_tolerance=latency_tolerance,
+        )
+        self.queue_timeout = queue_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.limiters: Dict[str, AdaptiveLimiter] = {}
+        self.rejected = 0
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(**self.breaker_options)
+        return breaker
+
+    def limiter(self, key: str) -> AdaptiveLimiter:
+        limiter = self.limiters.get(key)
+        if limiter is None:
+            limiter = self.limiters[key] = AdaptiveLimiter(**self.limiter_options)
+        return limiter
+
+    async def acquire(self, key: str) -> ProviderPermit:
+        """
+        Raises:
+            ProviderUnavailable: If the key's circuit is open or no
+                concurrency slot freed up within queue_timeout.
+        """
+        breaker = self.breaker(key)
+        if not breaker.allow():
+            self.rejected += 1
+            raise ProviderUnavailable(f"Circuit open for {key}")
+        limiter = self.limiter(key)
+        if not await limiter.acquire(self.queue_timeout):
+            breaker.cancel_trial()
+            self.rejected += 1
+            raise ProviderUnavailable(f"{key} is at its concurrency limit")
+        return ProviderPermit(breaker, limiter)
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            key: {
+                "state": breaker.state.value,
+                "times_opened": breaker.times_opened,
+                "concurrency_limit": int(self.limiters[key].limit),
+                "in_flight": self.limiters[key].in_flight,
+            }
+            for key, breaker in self.breakers.items()
+            if key in self.limiters
+        }
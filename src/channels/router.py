@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, status
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.authentication.auth import token_manager_func
+from src.core.config.env_data import Config
+from src.database.redis_client import get_redis
+
+from .in_app import ConnectionHub
+
+in_app_hub = ConnectionHub(
+    get_redis(),
+    buffer_size=Config.IN_APP_SEND_BUFFER,
+    send_timeout=Config.IN_APP_SEND_TIMEOUT,
+)
+
+in_app_router = APIRouter(tags=["In-App Notifications"])
+
+
+def _bearer_token(websocket: WebSocket) -> Optional[str]:
+    """Token from the Authorization header, or ?token= for browser clients"""
+    scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials
+    return websocket.query_params.get("token")
+
+
+@in_app_router.websocket("/ws/notifications")
+async def in_app_notifications(websocket: WebSocket):
+    """Stream the current user's in-app notifications"""
+    token = _bearer_token(websocket)
+    try:
+        if not token:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated"
+            )
+        token_payload = await token_manager_func(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        )
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+        return
+    await websocket.accept()
+    connection = await in_app_hub.register(websocket, token_payload.get("sub"))
+    try:
+        await connection.run()
+    finally:
+        await in_app_hub.unregister(connection)
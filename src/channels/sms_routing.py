@@ -0,0 +1,43 @@
+from typing import Dict, Mapping, Optional
+
+from pydantic import BaseModel
+
+from src.utils.prefix_trie import PrefixTrie
+
+
+class SmsRoute(BaseModel):
+    provider: str
+    tier: str = "standard"
+
+
+class SmsRoutingTable:
+    """
+    Which provider and price tier an SMS goes out through, by the longest
+    matching prefix of the E.164 number: a country code ("44"), or a
+    carrier range within it ("447"). Recipient numbers are normalized when
+    they are written, so a send only walks the number's digits through the
+    trie, no parsing.
+    """
+
+    def __init__(
+        self, routes: Mapping[str, SmsRoute], default: Optional[SmsRoute] = None
+    ):
+        self.trie: PrefixTrie[SmsRoute] = PrefixTrie(
+            (prefix.lstrip("+"), route) for prefix, route in routes.items()
+        )
+        self.default = default
+
+    @classmethod
+    def from_config(
+        cls,
+        routes: Mapping[str, Dict[str, str]],
+        default: Optional[Dict[str, str]] = None,
+    ) -> "SmsRoutingTable":
+        return cls(
+            {prefix: SmsRoute(**route) for prefix, route in routes.items()},
+            SmsRoute(**default) if default else None,
+        )
+
+    def route(self, number: str) -> Optional[SmsRoute]:
+        """The route for an E.164 number, or the default route"""
+        return self.trie.get(number[1:] if number[:1] == "+" else number, self.default)
@@ -0,0 +1,117 @@
+"""
+Local SMTP sink: accepts and discards mail, for benchmarks and local runs.
+
+    python -m src.channels.smtp_sink --port 2525
+"""
+
+import argparse
+import asyncio
+import random
+from typing import Optional
+
+
+class SMTPSinkServer:
+    """
+    Minimal ESMTP server that accepts every message (or rejects a fraction of
+    them with a transient error when fail_rate is set) and only counts them.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fail_rate: float = 0.0,
+        latency: float = 0.0,
+    ):
+        self.host = host
+        self.port = port
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.messages_received = 0
+        self.messages_rejected = 0
+        self.sessions_opened = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "SMTPSinkServer":
+        self.server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=2**20
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    @staticmethod
+    async def _read_data(reader: asyncio.StreamReader):
+        """Discard a message body, however far past the buffer limit it goes"""
+        while True:
+            try:
+                await reader.readuntil(b"\r\n.\r\n")
+                return
+            except asyncio.LimitOverrunError as e:
+                await reader.readexactly(e.consumed)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.sessions_opened += 1
+        writer.write(b"220 notifyhub sink ESMTP\r\n")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                verb = line[:4].upper()
+                if verb == b"EHLO":
+                    writer.write(
+                        b"250-notifyhub\r\n250-PIPELINING\r\n"
+                        b"250-8BITMIME\r\n250 SIZE 35882577\r\n"
+                    )
+                elif verb == b"HELO":
+                    writer.write(b"250 notifyhub\r\n")
+                elif verb in (b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                    writer.write(b"250 OK\r\n")
+                elif verb == b"DATA":
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    await writer.drain()
+                    await self._read_data(reader)
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    if self.fail_rate and random.random() < self.fail_rate:
+                        self.messages_rejected += 1
+                        writer.write(b"451 Temporary failure\r\n")
+                    else:
+                        self.messages_received += 1
+                        writer.write(b"250 Queued\r\n")
+                elif verb == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    break
+                else:
+                    writer.write(b"502 Command not implemented\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int):
+    sink = await SMTPSinkServer(host, port).start()
+    print(f"SMTP sink listening on {host}:{sink.port}")
+    async with sink.server:
+        await sink.server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import hmac
+import importlib.util
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
+
+import httpx
+
+from .base import ChannelAdapter, ChannelMessage, DeliveryResult
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-NotifyHub-Signature"
+TIMESTAMP_HEADER = "X-NotifyHub-Timestamp"
+DELIVERY_ID_HEADER = "X-NotifyHub-Delivery"
+
+# statuses worth another attempt; any other 4xx is the endpoint refusing
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429}
+
+# httpx negotiates HTTP/2 through ALPN only when the h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def sign_payload(secret: str, timestamp: str, body: bytes) -> str:
+    """
+    HMAC-SHA256 of "<timestamp>.<body>". Receivers recompute it with the
+    shared secret and reject stale timestamps to stop replays.
+    """
+    digest = hmac.new(
+        secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256
+    ).hexdigest()
+    return f"v1={digest}"
+
+
+def verify_signature(secret: str, timestamp: str, body: bytes, signature: str) -> bool:
+    return hmac.compare_digest(sign_payload(secret, timestamp, body), signature)
+
+
+class HostPoolTransport(httpx.AsyncBaseTransport):
+    """
+    One small keep-alive pool per destination host behind a single client.
+    httpcore scans every connection of a pool for each request it assigns,
+    which goes quadratic with thousands of hosts in one pool; per-host pools
+    keep the scan to the host's own few connections. Idle pools beyond
+    max_hosts are closed, least recently used first.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 8,
+        max_keepalive_per_host: int = 8,
+        max_hosts: int = 2000,
+        http2: bool = False,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+        )
+        self.max_hosts = max_hosts
+        self.http2 = http2
+        # loading the CA bundle takes tens of ms, so every pool shares one
+        self.ssl_context = httpx.create_ssl_context()
+        self.pools: "OrderedDict[Tuple[str, str, int], httpx.AsyncHTTPTransport]" = (
+            OrderedDict()
+        )
+        self.in_flight: Dict[Tuple[str, str, int], int] = {}
+
+    async def _evict(self):
+        for key in list(self.pools):
+            if len(self.pools) <= self.max_hosts:
+                return
+            if not self.in_flight.get(key):
+                await self.pools.pop(key).aclose()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = (request.url.scheme, request.url.host, request.url.port or 0)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = httpx.AsyncHTTPTransport(
+                verify=self.ssl_context, limits=self.limits, http2=self.http2
+            )
+            self.pools[key] = pool
+            await self._evict()
+        self.pools.move_to_end(key)
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+        try:
+            return await pool.handle_async_request(request)
+        finally:
+            self.in_flight[key] -= 1
+            if not self.in_flight[key]:
+                del self.in_flight[key]
+
+    async def aclose(self):
+        for pool in self.pools.values():
+            await pool.aclose()
+        self.pools.clear()
+
+
+class WebhookChannel(ChannelAdapter):
+    """
+    Webhook channel POSTing signed JSON to the URL in ChannelMessage.to.
+
+    All requests share one httpx.AsyncClient whose transport keeps a small
+    keep-alive pool per host (multiplexed over HTTP/2 where the endpoint
+    supports it). Every destination host also gets its own concurrency
+    limit: requests to a host that is already at its limit wait at most
+    queue_timeout and then fail as retryable, so one slow endpoint ties up
+    neither connections nor the dispatcher's consumers. Without a signing
+    secret every webhook fails permanently rather than going out unsigned
+    or signed with a guessable key.
+    """
+
+    name = "webhook"
+
+    def __init__(
+        self,
+        signing_secret: Optional[str],
+        max_concurrency_per_host: int = 8,
+        max_hosts: int = 2000,
+        timeout: float = 10.0,
+        queue_timeout: float = 1.0,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if not signing_secret:
+            logger.warning("WEBHOOK_SIGNING_SECRET is not set, webhooks are refused")
+        self.signing_secret = signing_secret
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.queue_timeout = queue_timeout
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2 is not installed, webhooks use HTTP/1.1 only")
+            http2 = False
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            follow_redirects=False,
+            transport=transport
+            or HostPoolTransport(
+                max_connections_per_host=max_concurrency_per_host,
+                max_keepalive_per_host=max_concurrency_per_host,
+                max_hosts=max_hosts,
+                http2=http2,
+            ),
+            headers={"User-Agent": "notifyhub-webhooks/1.0"},
+        )
+        self.host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.host_busy = 0
+
+    def slots_for(self, host: str) -> asyncio.Semaphore:
+        slots = self.host_slots.get(host)
+        if slots is None:
+            slots = asyncio.Semaphore(self.max_concurrency_per_host)
+            self.host_slots[host] = slots
+        return slots
+
+    def build_request(self, message: ChannelMessage) -> httpx.Request:
+        delivery_id = str(message.uid or uuid4())
+        body = json.dumps(
+            {
+                "id": delivery_id,
+                "subject": message.subject,
+                "body": message.body,
+                "recipient_uid": message.recipient_uid,
+                "metadata": message.metadata,
+            },
+            default=str,
+        ).encode()
+        timestamp = str(int(time.time()))
+        return self.client.build_request(
+            "POST",
+            message.to,
+            content=body,
+            headers={
+                "Content-Type": "application/json",
+                DELIVERY_ID_HEADER: delivery_id,
+                TIMESTAMP_HEADER: timestamp,
+                SIGNATURE_HEADER: sign_payload(self.signing_secret, timestamp, body),
+            },
+        )
+
+    def provider_key(self, message: ChannelMessage) -> str:
+        try:
+            return f"{self.name}:{httpx.URL(message.to).host}"
+        except httpx.InvalidURL:
+            return self.name
+
+    async def send(self, message: ChannelMessage) -> DeliveryResult:
+        if not self.signing_secret:
+            return DeliveryResult(
+                success=False,
+                retryable=False,
+                error="Webhook signing secret is not configured",
+            )
+        try:
+            request = self.build_request(message)
+        except httpx.InvalidURL as e:
+            return DeliveryResult(success=False, retryable=False, error=str(e))
+        if request.url.scheme not in ("http", "https"):
+            return DeliveryResult(
+                success=False, retryable=False, error=f"Not a webhook URL: {message.to}"
+            )
+        host = request.url.host
+        slots = self.slots_for(host)
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.host_busy += 1
+            return DeliveryResult(
+                success=False, retryable=True, error=f"Webhook host {host} is busy"
+            )
+        try:
+            response = await self.client.send(request)
+            await response.aclose()
+        except httpx.HTTPError as e:
+            return DeliveryResult(
+                success=False, retryable=True, error=f"{type(e).__name__}: {e}"
+            )
+        finally:
+            slots.release()
+        if response.is_success:
+            return DeliveryResult(
+                success=True,
+                provider_message_id=request.headers[DELIVERY_ID_HEADER],
+            )
+        return DeliveryResult(
+            success=False,
+            retryable=(
+                response.status_code >= 500
+                or response.status_code in RETRYABLE_STATUS_CODES
+            ),
+            error=f"Webhook endpoint answered {response.status_code}",
+        )
+
+    async def close(self):
+        await self.client.aclose()
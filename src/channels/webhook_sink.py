@@ -0,0 +1,136 @@
+"""
+Local webhook sink: an HTTP/1.1 keep-alive server that accepts and discards
+webhook POSTs, for benchmarks and local runs. Every loopback address reaches
+it when bound to 0.0.0.0, so 127.0.x.y URLs stand in for distinct customer
+hosts.
+
+    python -m src.channels.webhook_sink --port 8808
+"""
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from typing import Iterable, Optional
+
+from .webhook import SIGNATURE_HEADER, TIMESTAMP_HEADER, verify_signature
+
+OK_RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n"
+UNAVAILABLE_RESPONSE = b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n\r\n"
+UNAUTHORIZED_RESPONSE = b"HTTP/1.1 401 Unauthorized\r\nContent-Length: 0\r\n\r\n"
+
+
+class WebhookSinkServer:
+    """
+    Minimal webhook receiver counting requests per host. Requests to
+    slow_hosts take slow_latency seconds, a fail_rate fraction gets a 503,
+    every request to failing_hosts too, and with a signing_secret bad
+    signatures get a 401. The host sets can be changed while it runs to
+    inject faults.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        slow_hosts: Iterable[str] = (),
+        slow_latency: float = 1.0,
+        failing_hosts: Iterable[str] = (),
+        signing_secret: Optional[str] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.slow_hosts = set(slow_hosts)
+        self.slow_latency = slow_latency
+        self.failing_hosts = set(failing_hosts)
+        self.signing_secret = signing_secret
+        self.requests_by_host: Counter = Counter()
+        self.requests_received = 0
+        self.requests_rejected = 0
+        self.connections_opened = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "WebhookSinkServer":
+        self.server = await asyncio.start_server(
+            self._handle, self.host, self.port, backlog=4096
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def _response(self, host: str, headers: dict, body: bytes) -> bytes:
+        if host in self.failing_hosts or (
+            self.fail_rate and random.random() < self.fail_rate
+        ):
+            self.requests_rejected += 1
+            return UNAVAILABLE_RESPONSE
+        if self.signing_secret and not verify_signature(
+            self.signing_secret,
+            headers.get(TIMESTAMP_HEADER.lower(), ""),
+            body,
+            headers.get(SIGNATURE_HEADER.lower(), ""),
+        ):
+            self.requests_rejected += 1
+            return UNAUTHORIZED_RESPONSE
+        self.requests_received += 1
+        return OK_RESPONSE
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections_opened += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                host = headers.get("host", "")
+                host = host.rpartition(":")[0] or host
+                self.requests_by_host[host] += 1
+                if host in self.slow_hosts:
+                    await asyncio.sleep(self.slow_latency)
+                elif self.latency:
+                    await asyncio.sleep(self.latency)
+                writer.write(self._response(host, headers, body))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (
+            ConnectionError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+        ):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int):
+    sink = await WebhookSinkServer(host, port).start()
+    print(f"Webhook sink listening on {host}:{sink.port}")
+    async with sink.server:
+        await sink.server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
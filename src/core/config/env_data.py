@@ -1,3 +1,6 @@
+from datetime import time
+from typing import Dict, List, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +12,174 @@ class ENV(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_MINUTES: int
     REDIS_URL: str
+    # log every SQL statement, through the sqlalchemy.engine logger
+    DATABASE_ECHO: bool = False
+
+    # Logging, written by a background thread. LOG_FORMAT is json or text;
+    # LOG_DEBUG_SAMPLE_RATE is the share of requests whose DEBUG lines are kept
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Metrics, served at /metrics in the Prometheus text format. Every process
+    # (API and dispatch workers) writes its metrics to METRICS_DIR each
+    # METRICS_EXPORT_INTERVAL seconds and /metrics adds them up; clear the
+    # directory on deploys. None to report the serving process only.
+    # With METRICS_TOKEN set, scrapers send it as a bearer token.
+    METRICS_DIR: Optional[str] = "/tmp/notify_hub/metrics"
+    METRICS_EXPORT_INTERVAL: float = 5.0
+    METRICS_TOKEN: Optional[str] = None
+
+    # Event bus
+    EVENT_BUS_QUEUE_SIZE: int = 10000
+    EVENT_BUS_BATCH_SIZE: int = 100
+    EVENT_BUS_BATCH_TIMEOUT: float = 0.01
+    EVENT_BUS_OVERFLOW_POLICY: str = "block"
+
+    # Email channel
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_USE_TLS: bool = False
+    SMTP_START_TLS: bool = False
+    SMTP_SENDER: str = "no-reply@notifyhub.local"
+    SMTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+
+    # Email attachments, stored on local disk by content hash
+    ATTACHMENT_DIR: str = "/tmp/notify_hub/attachments"
+    ATTACHMENT_MAX_SIZE: int = 100 * 1024 * 1024
+    ATTACHMENT_CHUNK_SIZE: int = 1024 * 1024
+
+    # Phone numbers and SMS routing. Numbers written without a country code
+    # take DEFAULT_PHONE_COUNTRY_CODE, e.g. "44"; without it they are refused.
+    # SMS_ROUTES maps number prefixes to a route, the longest prefix wins,
+    # e.g. {"44": {"provider": "acme"}, "447": {"provider": "acme", "tier": "mobile"}}
+    DEFAULT_PHONE_COUNTRY_CODE: Optional[str] = None
+    SMS_ROUTES: Dict[str, Dict[str, str]] = {}
+    SMS_DEFAULT_ROUTE: Optional[Dict[str, str]] = None
+
+    # Webhooks
+    # no default: webhooks are refused until a secret is set
+    WEBHOOK_SIGNING_SECRET: Optional[str] = None
+    WEBHOOK_MAX_CONCURRENCY_PER_HOST: int = 8
+    WEBHOOK_MAX_HOSTS: int = 2000
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_HOST_QUEUE_TIMEOUT: float = 1.0
+    WEBHOOK_HTTP2: bool = True
+
+    # Provider circuit breakers and adaptive concurrency
+    GUARDED_CHANNELS: List[str] = ["email", "webhook"]
+    CIRCUIT_BREAKER_ERROR_RATE: float = 0.5
+    CIRCUIT_BREAKER_MIN_REQUESTS: int = 20
+    CIRCUIT_BREAKER_WINDOW: float = 10.0
+    CIRCUIT_BREAKER_OPEN_TIMEOUT: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 5
+    PROVIDER_INITIAL_CONCURRENCY: int = 8
+    PROVIDER_MIN_CONCURRENCY: int = 1
+    PROVIDER_MAX_CONCURRENCY: int = 64
+    PROVIDER_LATENCY_TOLERANCE: float = 2.0
+    PROVIDER_QUEUE_TIMEOUT: float = 1.0
+
+    # Templates
+    TEMPLATE_CACHE_DIR: str = "/tmp/notify_hub/template_cache"
+    TEMPLATE_CACHE_SIZE: int = 1000
+    TEMPLATE_RENDER_PROCESSES: int = 0
+    TEMPLATE_RENDER_CHUNK_SIZE: int = 5000
+
+    # Provider rate limits in messages/sec, e.g. {"email": 100}
+    CHANNEL_RATE_LIMITS: Dict[str, float] = {}
+
+    # Retries
+    RETRY_BASE_DELAY: float = 5.0
+    RETRY_MAX_DELAY: float = 3600.0
+    RETRY_MAX_ATTEMPTS: int = 5
+    RETRY_MAX_ATTEMPTS_PER_CHANNEL: Dict[str, int] = {}
+
+    # Send idempotency
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_LOCAL_CACHE_SIZE: int = 100000
+
+    # Digests
+    DIGEST_WINDOW: float = 300.0
+    DIGEST_MAX_ITEMS: int = 50
+    DIGEST_MAX_BUFFERED_ITEMS: int = 100000
+
+    # Dispatch lanes
+    DISPATCH_LANE_WEIGHTS: Dict[str, float] = {
+        "transactional": 6,
+        "normal": 3,
+        "bulk": 1,
+    }
+    DISPATCH_CONSUMERS: int = 8
+    DISPATCH_RESERVED_CONSUMERS: Dict[str, int] = {"transactional": 2}
+    DISPATCH_BATCH_SIZE: int = 100
+    # Shards of the dispatch queue by recipient, 0 for one shared queue.
+    # Each shard has a single consumer, so a recipient's notifications go
+    # out in order. Drain the queue before changing it.
+    DISPATCH_SHARDS: int = 0
+    DISPATCH_SHARD_LEASE_TTL: float = 15.0
+    DISPATCH_SHARD_REBALANCE_INTERVAL: float = 2.0
+    DISPATCH_SHARD_VNODES: int = 64
+
+    # Dispatch workers (python -m src.worker). DISPATCH_CONSUMERS,
+    # DISPATCH_BATCH_SIZE and the channel limits apply to each process.
+    WORKER_PROCESSES: int = 0  # 0 for one per CPU
+    WORKER_UVLOOP: bool = True
+    WORKER_DRAIN_TIMEOUT: float = 30.0
+    WORKER_HEARTBEAT_INTERVAL: float = 5.0
+    WORKER_HEARTBEAT_TTL: float = 15.0
+    WORKER_RESTART_BACKOFF_MAX: float = 30.0
+
+    # Send-time planning of broadcasts, in each recipient's local time
+    DEFAULT_RECIPIENT_TIMEZONE: str = "UTC"
+    QUIET_HOURS_START: time = time(21, 0)
+    QUIET_HOURS_END: time = time(8, 0)
+
+    # Broadcast fan-out
+    FANOUT_CHUNK_SIZE: int = 5000
+    # Store broadcast content once by hash instead of in every queue item
+    PAYLOAD_STORE_ENABLED: bool = True
+    PAYLOAD_COMPRESSION: str = "gzip"  # none, gzip or zstd
+    PAYLOAD_COMPRESS_MIN_SIZE: int = 256
+    PAYLOAD_TTL: int = 604800
+    PAYLOAD_CACHE_SIZE: int = 1024
+
+    # Suppression list
+    SUPPRESSION_FILTER_CAPACITY: int = 1000000
+    SUPPRESSION_FILTER_ERROR_RATE: float = 0.001
+    SUPPRESSION_REFRESH_INTERVAL: float = 5.0
+    # seqs read again on every catch-up, for rows committed out of seq order
+    SUPPRESSION_REFRESH_OVERLAP: int = 1000
+    SUPPRESSION_REBUILD_INTERVAL: float = 3600.0
+
+    # In-app notifications
+    IN_APP_SEND_BUFFER: int = 256
+    IN_APP_SEND_TIMEOUT: float = 5.0
+
+    # Delivery status streams
+    STATUS_STREAM_INTERVAL: float = 1.0
+    STATUS_STREAM_HEARTBEAT: float = 15.0
+    STATUS_TTL: int = 86400
+
+    # Delivery log
+    DELIVERY_LOG_FLUSH_INTERVAL: float = 0.25
+    DELIVERY_LOG_BATCH_SIZE: int = 5000
+    DELIVERY_LOG_MAX_BUFFERED: int = 200000
+    DELIVERY_LOG_PREMAKE_DAYS: int = 3
+    DELIVERY_LOG_RETENTION_DAYS: int = 30
+    DELIVERY_LOG_MAINTENANCE_INTERVAL: float = 3600.0
+
+    # Delivery receipts
+    RECEIPT_PROVIDER_TOKENS: Dict[str, str] = {}
+    RECEIPT_FLUSH_INTERVAL: float = 0.1
+    RECEIPT_BATCH_SIZE: int = 5000
+    RECEIPT_MAX_BUFFERED: int = 200000
+    RECEIPT_LOOKBACK_DAYS: int = 3
+    RECEIPT_UNMATCHED_RETRIES: int = 5
+    RECEIPT_UNMATCHED_RETRY_DELAY: float = 1.0
 
     model_config: SettingsConfigDict = {
         "env_file": ".env",
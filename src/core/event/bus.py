@@ -0,0 +1,346 @@
+import asyncio
+import logging
+from enum import Enum
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Type, Union
+
+import redis.asyncio as aioredis
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from src.utils.logger import correlation_scope
+
+from .events import Event
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[List[Event]], Awaitable[None]]
+
+PENDING_EVENTS_KEY = "pending_events"
+
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"
+    DROP = "drop"
+    SPILL = "spill"
+
+
+class Subscription:
+    """
+    A single subscriber: a bounded queue drained by one consumer task that
+    hands events to the handler in batches.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        event_type: Type[Event],
+        handler: EventHandler,
+        max_queue_size: int,
+        batch_size: int,
+        batch_timeout: float,
+        overflow_policy: OverflowPolicy,
+    ):
+        self.name = name
+        self.event_type = event_type
+        self.handler = handler
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.overflow_policy = overflow_policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.spill_key = f"event_bus:spill:{name}"
+        self.spilled = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.task: Optional[asyncio.Task] = None
+
+    async def _next_batch(self) -> List[Event]:
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _deliver(self, batch: List[Event]):
+        # a batch from one request logs under its id, a mixed one under none
+        requests = {event.correlation_id for event in batch}
+        try:
+            with correlation_scope(requests.pop() if len(requests) == 1 else None):
+                await self.handler(batch)
+            self.delivered += len(batch)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception(
+                "Event handler %s failed on %d events", self.name, len(batch)
+            )
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+    async def _refill_from_spill(self, redis: aioredis.Redis):
+        if not self.spilled:
+            return
+        room = self.queue.maxsize - self.queue.qsize()
+        if room <= 0:
+            return
+        raw_events = await redis.lpop(self.spill_key, room)
+        if not raw_events:
+            self.spilled = 0
+            return
+        self.spilled = max(self.spilled - len(raw_events), 0)
+        for index, raw in enumerate(raw_events):
+            try:
+                self.queue.put_nowait(Event.from_json(raw))
+            except asyncio.QueueFull:
+                # publishers took the room while we were reading, keep the order
+                leftover = raw_events[index:]
+                await redis.lpush(self.spill_key, *reversed(leftover))
+                self.spilled += len(leftover)
+                return
+
+    async def run(self, redis: Optional[aioredis.Redis]):
+        spills = redis is not None and self.overflow_policy is OverflowPolicy.SPILL
+        if spills:
+            # pick up events spilled by a previous process
+            self.spilled = await redis.llen(self.spill_key)
+            await self._refill_from_spill(redis)
+        while True:
+            batch = await self._next_batch()
+            await self._deliver(batch)
+            if spills:
+                await self._refill_from_spill(redis)
+
+
+class EventBus:
+    """
+    In-process async publish/subscribe bus.
+
+    Every subscriber gets its own bounded queue so a slow handler only slows
+    down itself; what happens when that queue is full is decided by the
+    subscriber's overflow policy:
+
+    - block: the publisher waits for room (back-pressure on the request)
+    - drop: the event is discarded and counted
+    - spill: the event is pushed to a Redis list and fed back later
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        batch_timeout: float = 0.01,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        redis: Optional[aioredis.Redis] = None,
+    ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.redis = redis
+        self.subscriptions: List[Subscription] = []
+        self._routes: Dict[Type[Event], List[Subscription]] = {}
+        self._background: set = set()
+        self.running = False
+
+    def configure(self, **settings):
+        """Override bus defaults before start, e.g. from the ENV settings"""
+        if self.running:
+            raise RuntimeError("Cannot configure a running event bus")
+        for setting, value in settings.items():
+            if not hasattr(self, setting):
+                raise AttributeError(f"Unknown event bus setting: {setting}")
+            setattr(self, setting, value)
+        self.overflow_policy = OverflowPolicy(self.overflow_policy)
+
+    def subscribe(
+        self,
+        event_type: Type[Event],
+        handler: EventHandler,
+        name: Optional[str] = None,
+        max_queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_timeout: Optional[float] = None,
+        overflow_policy: Optional[Union[OverflowPolicy, str]] = None,
+    ) -> Subscription:
+        """
+        Register a batch handler for an event type (and its subclasses).
+
+        Args:
+            event_type: The event class to listen for
+            handler: Coroutine called with a list of events
+            name: Unique subscriber name, defaults to the handler name
+            max_queue_size, batch_size, batch_timeout, overflow_policy:
+                Per-subscriber overrides of the bus defaults
+        Returns:
+            The created subscription
+        """
+        policy = OverflowPolicy(overflow_policy or self.overflow_policy)
+        if policy is OverflowPolicy.SPILL and self.redis is None:
+            raise ValueError("The spill overflow policy needs a Redis client")
+        subscription = Subscription(
+            name=name or handler.__qualname__,
+            event_type=event_type,
+            handler=handler,
+            max_queue_size=max_queue_size or self.max_queue_size,
+            batch_size=batch_size or self.batch_size,
+            batch_timeout=(
+                self.batch_timeout if batch_timeout is None else batch_timeout
+            ),
+            overflow_policy=policy,
+        )
+        self.subscriptions.append(subscription)
+        self._routes.clear()
+        if self.running:
+            self._start_subscription(subscription)
+        return subscription
+
+    def _subscriptions_for(self, event_type: Type[Event]) -> List[Subscription]:
+        subscriptions = self._routes.get(event_type)
+        if subscriptions is None:
+            subscriptions = [
+                subscription
+                for subscription in self.subscriptions
+                if issubclass(event_type, subscription.event_type)
+            ]
+            self._routes[event_type] = subscriptions
+        return subscriptions
+
+    async def _spill(self, subscription: Subscription, event: Event):
+        await self.redis.rpush(subscription.spill_key, event.to_json())
+        subscription.spilled += 1
+
+    async def publish(self, event: Event):
+        """Publish an event, applying each subscriber's overflow policy"""
+        for subscription in self._subscriptions_for(type(event)):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                if subscription.overflow_policy is OverflowPolicy.BLOCK:
+                    await subscription.queue.put(event)
+                elif subscription.overflow_policy is OverflowPolicy.SPILL:
+                    await self._spill(subscription, event)
+                else:
+                    subscription.dropped += 1
+
+    async def publish_many(self, events: Sequence[Event]):
+        for event in events:
+            await self.publish(event)
+
+    def publish_nowait(self, event: Event):
+        """
+        Publish from synchronous code. Subscribers with room get the event
+        immediately; blocked or spilled deliveries continue in a background task.
+        """
+        pending = []
+        for subscription in self._subscriptions_for(type(event)):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                if subscription.overflow_policy is OverflowPolicy.DROP:
+                    subscription.dropped += 1
+                else:
+                    pending.append(subscription)
+        if pending:
+            task = asyncio.get_running_loop().create_task(
+                self._publish_to(pending, event)
+            )
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _publish_to(self, subscriptions: List[Subscription], event: Event):
+        for subscription in subscriptions:
+            if subscription.overflow_policy is OverflowPolicy.SPILL:
+                await self._spill(subscription, event)
+            else:
+                await subscription.queue.put(event)
+
+    def _start_subscription(self, subscription: Subscription):
+        subscription.task = asyncio.get_running_loop().create_task(
+            subscription.run(self.redis), name=f"event-bus:{subscription.name}"
+        )
+
+    async def start(self):
+        if self.running:
+            return
+        self.running = True
+        for subscription in self.subscriptions:
+            self._start_subscription(subscription)
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """Stop the consumers, giving them up to drain_timeout seconds to drain"""
+        if not self.running:
+            return
+        self.running = False
+        if self._background:
+            await asyncio.wait(self._background, timeout=drain_timeout)
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(s.queue.join() for s in self.subscriptions)),
+                drain_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Event bus stopped before all queues were drained")
+        for subscription in self.subscriptions:
+            if subscription.task:
+                subscription.task.cancel()
+        await asyncio.gather(
+            *(s.task for s in self.subscriptions if s.task), return_exceptions=True
+        )
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            subscription.name: {
+                "queued": subscription.queue.qsize(),
+                "delivered": subscription.delivered,
+                "dropped": subscription.dropped,
+                "spilled": subscription.spilled,
+            }
+            for subscription in self.subscriptions
+        }
+
+
+event_bus = EventBus()
+
+
+def emit_after_commit(
+    session, event: Union[Event, Callable[[], Event]], bus: EventBus = event_bus
+):
+    """
+    Queue an event to be published once the session's transaction commits.
+    Events are discarded if the transaction rolls back.
+
+    Args:
+        session: An AsyncSession or Session
+        event: The event, or a callable building it after commit (useful when
+            it needs database generated values such as primary keys)
+        bus: The bus to publish on
+    """
+    sync_session = getattr(session, "sync_session", session)
+    sync_session.info.setdefault(PENDING_EVENTS_KEY, []).append((bus, event))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session):
+    pending = session.info.pop(PENDING_EVENTS_KEY, None)
+    if not pending:
+        return
+    for bus, event in pending:
+        if not isinstance(event, Event):
+            event = event()
+        if bus.running:
+            bus.publish_nowait(event)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session):
+    session.info.pop(PENDING_EVENTS_KEY, None)
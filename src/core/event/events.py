@@ -0,0 +1,53 @@
+import json
+from datetime import datetime, timezone
+from typing import ClassVar, Dict, Optional, Type
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field
+
+from src.utils.logger import get_correlation_id
+
+# event name -> event class, used to rebuild events spilled to Redis
+event_registry: Dict[str, Type["Event"]] = {}
+
+
+class Event(BaseModel):
+    """
+    Base class for every domain event published on the event bus.
+
+    Subclasses are registered by name so they can be serialized to Redis and
+    rebuilt on the way back.
+    """
+
+    name: ClassVar[str] = "event"
+
+    event_id: UUID = Field(default_factory=uuid4)
+    occurred_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # the request that caused the event, for the handlers' logs
+    correlation_id: Optional[str] = Field(default_factory=get_correlation_id)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        event_registry[cls.name] = cls
+
+    def to_json(self) -> str:
+        return json.dumps({"name": self.name, "data": self.model_dump(mode="json")})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Event":
+        payload = json.loads(raw)
+        return event_registry[payload["name"]].model_validate(payload["data"])
+
+
+class UserCreated(Event):
+    name: ClassVar[str] = "user.created"
+
+    user_uid: UUID
+    email: str
+
+
+class RecipientCreated(Event):
+    name: ClassVar[str] = "recipient.created"
+
+    recipient_uid: UUID
+    created_by: Optional[UUID]
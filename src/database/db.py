@@ -1,11 +1,19 @@
-from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
-                                    async_sessionmaker)
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlmodel import SQLModel, create_engine
 
 from src.core.config.env_data import Config
+from src.metrics.instruments import InstrumentedPool, instrument_engine
 
-# create async engine
-async_engine = AsyncEngine(create_engine(url=Config.DATABASE_URL, echo=True))
+# create async engine; echo=True would write to stdout from the event loop,
+# the engine logger goes through the logging queue instead
+async_engine = AsyncEngine(
+    create_engine(url=Config.DATABASE_URL, poolclass=InstrumentedPool)
+)
+instrument_engine(async_engine.sync_engine)
+if Config.DATABASE_ECHO:
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
 
 
 # database connection initialization
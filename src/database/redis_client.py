@@ -0,0 +1,27 @@
+import redis.asyncio as aioredis
+
+from src.core.config.env_data import Config
+
+# shared connection pool, created once per process
+redis_pool = aioredis.ConnectionPool.from_url(Config.REDIS_URL, decode_responses=True)
+
+# for binary values (compressed payloads), returned as bytes
+binary_redis_pool = aioredis.ConnectionPool.from_url(Config.REDIS_URL)
+
+
+def get_redis() -> aioredis.Redis:
+    """
+    Get a Redis client backed by the shared process-wide connection pool
+    Returns:
+        Redis client object
+    """
+    return aioredis.Redis(connection_pool=redis_pool)
+
+
+def get_binary_redis() -> aioredis.Redis:
+    """
+    Get a Redis client that returns bytes, backed by its own process-wide pool
+    Returns:
+        Redis client object
+    """
+    return aioredis.Redis(connection_pool=binary_redis_pool)
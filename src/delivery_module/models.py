@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlmodel import Column, Field, Index, SQLModel
+
+
+class DeliveryLog(SQLModel, table=True):
+    """
+    One row per delivery status change of a notification. Rows are only ever
+    inserted, never updated: the latest row of a notification is its status.
+    The table is range partitioned by day on created_at, so expiring old
+    deliveries is dropping a partition rather than deleting rows.
+    """
+
+    __tablename__ = "delivery_log"
+    __table_args__ = (
+        Index("ix_delivery_log_notification_uid", "notification_uid"),
+        Index("ix_delivery_log_broadcast_uid", "broadcast_uid"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # the partition key has to be part of the primary key
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, primary_key=True))
+    notification_uid: UUID = Field(sa_column=Column(pg.UUID, primary_key=True))
+    status: str = Field(sa_column=Column(pg.VARCHAR(20), primary_key=True))
+    broadcast_uid: Optional[UUID] = Field(sa_column=Column(pg.UUID, nullable=True))
+    recipient_uid: Optional[UUID] = Field(sa_column=Column(pg.UUID, nullable=True))
+    owner_uid: Optional[UUID] = Field(sa_column=Column(pg.UUID, nullable=True))
+    channel: str = Field(max_length=30)
+    address: str = Field(max_length=320)
+    attempts: int = Field(default=0)
+    error: Optional[str] = Field(sa_column=Column(pg.TEXT, nullable=True))
+    # the digest a coalesced notification went out in
+    digest_uid: Optional[UUID] = Field(sa_column=Column(pg.UUID, nullable=True))
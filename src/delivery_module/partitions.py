@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import DeliveryLog
+
+logger = logging.getLogger(__name__)
+
+PARTITIONS_STATEMENT = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    """
+)
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class DeliveryLogPartitions:
+    """
+    Keeps one delivery_log partition per day: partitions for the next
+    premake_days are created ahead of time and partitions older than
+    retention_days are dropped.
+    """
+
+    table = DeliveryLog.__tablename__
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        premake_days: int = 3,
+        retention_days: int = 30,
+    ):
+        self.session_factory = session_factory
+        self.premake_days = premake_days
+        self.retention_days = retention_days
+
+    @classmethod
+    def partition_name(cls, day: date) -> str:
+        return f"{cls.table}_{day:%Y%m%d}"
+
+    @classmethod
+    def partition_day(cls, name: str) -> Optional[date]:
+        try:
+            return datetime.strptime(name[len(cls.table) + 1 :], "%Y%m%d").date()
+        except ValueError:
+            return None
+
+    async def partitions(self) -> List[str]:
+        async with self.session_factory() as session:
+            result = await session.execute(PARTITIONS_STATEMENT, {"table": self.table})
+            return sorted(result.scalars().all())
+
+    async def ensure(self, days: Iterable[date]) -> List[str]:
+        """
+        Create the partitions of days that don't exist yet.
+        Returns:
+            The names of the partitions created
+        """
+        existing = set(await self.partitions())
+        created = []
+        async with self.session_factory() as session:
+            try:
+                for day in sorted(set(days)):
+                    name = self.partition_name(day)
+                    if name in existing:
+                        continue
+                    await session.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS {name} "
+                            f"PARTITION OF {self.table} FOR VALUES "
+                            f"FROM ('{day.isoformat()}') "
+                            f"TO ('{(day + timedelta(days=1)).isoformat()}')"
+                        )
+                    )
+                    created.append(name)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                raise e
+        if created:
+            logger.info("Created delivery log partitions %s", ", ".join(created))
+        return created
+
+    async def drop_expired(self, today: Optional[date] = None) -> List[str]:
+        """
+        Drop the partitions entirely older than the retention period.
+        Returns:
+            The names of the partitions dropped
+        """
+        cutoff = (today or utc_today()) - timedelta(days=self.retention_days)
+        expired = [
+            name
+            for name in await self.partitions()
+            if (self.partition_day(name) or cutoff) < cutoff
+        ]
+        async with self.session_factory() as session:
+            try:
+                for name in expired:
+                    await session.execute(
+                        text(f"ALTER TABLE {self.table} DETACH PARTITION {name}")
+                    )
+                    await session.execute(text(f"DROP TABLE {name}"))
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                raise e
+        if expired:
+            logger.info("Dropped delivery log partitions %s", ", ".join(expired))
+        return expired
+
+    async def maintain(self, today: Optional[date] = None):
+        today = today or utc_today()
+        # yesterday too, for rows stamped just before midnight and written late
+        await self.ensure(
+            today + timedelta(days=offset)
+            for offset in range(-1, self.premake_days + 1)
+        )
+        await self.drop_expired(today)
+
+    async def run(self, interval: float = 3600.0):
+        """Maintain the partitions every interval seconds until cancelled"""
+        while True:
+            try:
+                await self.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Delivery log partition maintenance failed")
+            await asyncio.sleep(interval)
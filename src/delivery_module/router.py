@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.authentication.auth import AdminRoleChecker, get_current_active_user
+from src.database.db import get_session
+
+from .schema import DeliveryLogResponse
+from .service import DeliveryLogService
+
+admin_role = AdminRoleChecker()
+
+delivery_router = APIRouter(tags=["Delivery Log"], prefix="/deliveries")
+
+
+@delivery_router.get(
+    "/", response_model=List[DeliveryLogResponse], status_code=status.HTTP_200_OK
+)
+async def retrieve_deliveries(
+    notification_uid: Optional[UUID] = None,
+    broadcast_uid: Optional[UUID] = None,
+    since: Optional[datetime] = Query(None, description="UTC, defaults to a day ago"),
+    before: Optional[datetime] = Query(
+        None, description="UTC, created_at of the last row of the previous page"
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    delivery_service: DeliveryLogService = Depends(DeliveryLogService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> List[DeliveryLogResponse]:
+    try:
+        return await delivery_service.retrieve_deliveries(
+            owner_uid=current_user.uid,
+            session=session,
+            notification_uid=notification_uid,
+            broadcast_uid=broadcast_uid,
+            since=since,
+            before=before,
+            limit=limit,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
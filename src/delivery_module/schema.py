@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class DeliveryLogResponse(BaseModel):
+    notification_uid: UUID
+    broadcast_uid: Optional[UUID]
+    recipient_uid: Optional[UUID]
+    channel: str
+    address: str
+    status: str
+    attempts: int
+    error: Optional[str]
+    digest_uid: Optional[UUID] = None
+    created_at: datetime
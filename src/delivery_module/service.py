@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.config.env_data import Config
+from src.database.db import async_session
+
+from .models import DeliveryLog
+from .partitions import DeliveryLogPartitions
+from .schema import DeliveryLogResponse
+from .writer import DeliveryLogWriter, utc_now
+
+delivery_log_partitions = DeliveryLogPartitions(
+    async_session,
+    premake_days=Config.DELIVERY_LOG_PREMAKE_DAYS,
+    retention_days=Config.DELIVERY_LOG_RETENTION_DAYS,
+)
+
+delivery_log_writer = DeliveryLogWriter(
+    async_session,
+    flush_interval=Config.DELIVERY_LOG_FLUSH_INTERVAL,
+    batch_size=Config.DELIVERY_LOG_BATCH_SIZE,
+    max_buffered=Config.DELIVERY_LOG_MAX_BUFFERED,
+    partitions=delivery_log_partitions,
+)
+
+
+def _delivery_log_response(entry: DeliveryLog) -> DeliveryLogResponse:
+    return DeliveryLogResponse(
+        notification_uid=entry.notification_uid,
+        broadcast_uid=entry.broadcast_uid,
+        recipient_uid=entry.recipient_uid,
+        channel=entry.channel,
+        address=entry.address,
+        status=entry.status,
+        attempts=entry.attempts,
+        error=entry.error,
+        digest_uid=entry.digest_uid,
+        created_at=entry.created_at,
+    )
+
+
+class DeliveryLogService:
+    async def retrieve_deliveries(
+        self,
+        owner_uid: UUID,
+        session: AsyncSession,
+        notification_uid: Optional[UUID] = None,
+        broadcast_uid: Optional[UUID] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[DeliveryLogResponse]:
+        """
+        Status changes of the owner's notifications, newest first. Bounding
+        created_at lets Postgres skip the partitions outside [since, before);
+        since defaults to a day ago.
+        """
+        since = since or utc_now() - timedelta(days=1)
+        statement = (
+            select(DeliveryLog)
+            .where(DeliveryLog.owner_uid == owner_uid, DeliveryLog.created_at >= since)
+            .order_by(DeliveryLog.created_at.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            statement = statement.where(DeliveryLog.created_at < before)
+        if notification_uid is not None:
+            statement = statement.where(
+                DeliveryLog.notification_uid == notification_uid
+            )
+        if broadcast_uid is not None:
+            statement = statement.where(DeliveryLog.broadcast_uid == broadcast_uid)
+        result = await session.execute(statement)
+        return [_delivery_log_response(entry) for entry in result.scalars().all()]
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import asyncpg
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.dispatch.schema import DispatchItem
+from src.dispatch.status import DeliveryStatus
+
+from .models import DeliveryLog
+from .partitions import DeliveryLogPartitions
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_LOG_COLUMNS = (
+    "created_at",
+    "notification_uid",
+    "status",
+    "broadcast_uid",
+    "recipient_uid",
+    "owner_uid",
+    "channel",
+    "address",
+    "attempts",
+    "error",
+    "digest_uid",
+)
+
+DeliveryLogRow = Tuple[Any, ...]
+
+# Errors about the rows rather than the database: asyncpg's own from COPY,
+# SQLAlchemy's from the INSERT, ValueError when a value can't be encoded
+REJECTED_ERRORS = (
+    asyncpg.DataError,
+    asyncpg.IntegrityConstraintViolationError,
+    DataError,
+    IntegrityError,
+    ValueError,
+)
+
+
+def _text(value: Optional[str], max_length: Optional[int] = None) -> Optional[str]:
+    # Postgres text can't hold NUL
+    if value is None:
+        return None
+    return value.replace("\x00", "")[:max_length]
+
+
+def utc_now() -> datetime:
+    # the log's timestamps are naive UTC, partitions are cut at UTC midnight
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class DeliveryLogWriter:
+    """
+    Write-behind buffer for the delivery log. Status changes are appended in
+    memory and written in bulk every flush_interval seconds, or as soon as
+    batch_size rows are waiting: with COPY on asyncpg, a batched INSERT
+    otherwise. Rows that fail to write are kept for the next flush, up to
+    max_buffered; past that the oldest are dropped. A batch the database
+    rejects for its data is split until the offending rows are found and
+    dropped, so one bad row can't hold up the log.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        flush_interval: float = 0.25,
+        batch_size: int = 5000,
+        max_buffered: int = 200000,
+        partitions: Optional[DeliveryLogPartitions] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffered = max_buffered
+        self.partitions = partitions
+        self.buffer: List[DeliveryLogRow] = []
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flushes = 0
+
+    @staticmethod
+    def row(
+        item: DispatchItem, status: DeliveryStatus, created_at: datetime
+    ) -> DeliveryLogRow:
+        # fitted to the columns, so a long address or error isn't rejected
+        return (
+            created_at,
+            item.uid,
+            status.value,
+            item.broadcast_uid,
+            item.recipient_uid,
+            item.owner_uid,
+            _text(item.channel, 30),
+            _text(item.to, 320),
+            min(max(item.attempts, 0), 2**31 - 1),
+            _text(item.last_error),
+            item.digest_uid,
+        )
+
+    def record(self, changes: Sequence[Tuple[DispatchItem, DeliveryStatus]]):
+        """Buffer status changes; never waits on the database"""
+        created_at = utc_now()
+        self.buffer.extend(
+            self.row(item, status, created_at) for item, status in changes
+        )
+        self._trim()
+        if len(self.buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _trim(self):
+        overflow = len(self.buffer) - self.max_buffered
+        if overflow > 0:
+            del self.buffer[:overflow]
+            self.dropped += overflow
+            logger.warning("Delivery log buffer full, dropped %d rows", overflow)
+
+    async def _write(self, rows: List[DeliveryLogRow]):
+        async with self.session_factory() as session:
+            try:
+                connection = await session.connection()
+                raw = await connection.get_raw_connection()
+                driver = raw.driver_connection
+                if hasattr(driver, "copy_records_to_table"):
+                    await driver.copy_records_to_table(
+                        DeliveryLog.__tablename__,
+                        records=rows,
+                        columns=DELIVERY_LOG_COLUMNS,
+                    )
+                else:
+                    await session.execute(
+                        insert(DeliveryLog),
+                        [dict(zip(DELIVERY_LOG_COLUMNS, row)) for row in rows],
+                    )
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                raise e
+
+    async def _write_batch(self, rows: List[DeliveryLogRow]):
+        try:
+            await self._write(rows)
+        except Exception as e:
+            if self.partitions is None or "no partition" not in str(e):
+                raise
+            # a day without a partition yet, e.g. maintenance hasn't run
+            await self.partitions.ensure(row[0].date() for row in rows)
+            await self._write(rows)
+
+    async def _write_isolating(self, rows: List[DeliveryLogRow]) -> int:
+        try:
+            await self._write_batch(rows)
+            return len(rows)
+        except REJECTED_ERRORS:
+            if len(rows) == 1:
+                self.rejected += 1
+                logger.exception(
+                    "Dropping delivery log row %s, the database rejects it", rows[0]
+                )
+                return 0
+        # halve the batch until the rows the database rejects are alone
+        middle = len(rows) // 2
+        head = await self._write_isolating(rows[:middle])
+        return head + await self._write_isolating(rows[middle:])
+
+    async def flush(self) -> int:
+        """
+        Write everything buffered.
+        Returns:
+            The number of rows written
+        """
+        async with self._lock:
+            rows, self.buffer = self.buffer, []
+            written = done = 0
+            try:
+                for start in range(0, len(rows), self.batch_size):
+                    batch = rows[start : start + self.batch_size]
+                    written += await self._write_isolating(batch)
+                    done += len(batch)
+            except Exception:
+                logger.exception(
+                    "Writing %d delivery log rows failed", len(rows) - done
+                )
+            finally:
+                # unwritten rows go back in front of anything recorded since
+                self.buffer[:0] = rows[done:]
+                self._trim()
+                self.written += written
+                self.flushes += 1
+            return written
+
+    async def run(self):
+        """Flush every flush_interval seconds until cancelled, then drain"""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                if self.buffer:
+                    await self.flush()
+        except asyncio.CancelledError:
+            if self.buffer:
+                await self.flush()
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self.buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+        }
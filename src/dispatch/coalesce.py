@@ -0,0 +1,221 @@
+import asyncio
+import heapq
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import redis.asyncio as aioredis
+
+from src.template_module.renderer import TemplateParts, TemplateRenderer
+
+from .schema import CoalescedItem, DispatchItem
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SPILL_KEY_PREFIX = "dispatch:digest"
+
+DEFAULT_DIGEST_SUBJECT = "You have {{ count }} new notifications"
+DEFAULT_DIGEST_BODY = """{% for item in items %}{% if item.subject %}{{ item.subject }}
+{% endif %}{{ item.body }}
+{% if not loop.last %}
+{% endif %}{% endfor %}"""
+
+BufferKey = Tuple[str, str]
+
+
+class DigestBuffer:
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.items: List[DispatchItem] = []
+        self.spilled = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.items) + self.spilled
+
+
+class Coalescer:
+    """
+    Buffers notifications per (recipient, channel) and sends one digest per
+    buffer when its window expires or it reaches max_items.
+
+    When more than max_buffered_items are held in memory, the largest buffers
+    are spilled to Redis lists and read back at flush time.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Sequence[DispatchItem]], Awaitable[object]],
+        renderer: TemplateRenderer,
+        window: float = 60.0,
+        max_items: int = 50,
+        max_buffered_items: int = 100000,
+        redis: Optional[aioredis.Redis] = None,
+        digest_parts: Optional[TemplateParts] = None,
+    ):
+        self.flush = flush
+        self.renderer = renderer
+        self.window = window
+        self.max_items = max_items
+        self.max_buffered_items = max_buffered_items
+        self.redis = redis
+        self.digest_parts = digest_parts or {
+            "subject": ("digest:default:subject", DEFAULT_DIGEST_SUBJECT),
+            "body": ("digest:default:body", DEFAULT_DIGEST_BODY),
+        }
+        self.buffers: Dict[BufferKey, DigestBuffer] = {}
+        self._deadlines: List[Tuple[float, BufferKey]] = []
+        self.buffered_in_memory = 0
+        self.events_in = 0
+        self.messages_out = 0
+
+    @staticmethod
+    def buffer_key(item: DispatchItem) -> BufferKey:
+        return (str(item.recipient_uid or item.to), item.channel)
+
+    @property
+    def compression_ratio(self) -> float:
+        """Events in per message out"""
+        return self.events_in / self.messages_out if self.messages_out else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "events_in": self.events_in,
+            "messages_out": self.messages_out,
+            "compression_ratio": self.compression_ratio,
+            "open_buffers": len(self.buffers),
+            "buffered_in_memory": self.buffered_in_memory,
+        }
+
+    async def add(self, items: Sequence[DispatchItem]):
+        full = []
+        for item in items:
+            key = self.buffer_key(item)
+            buffer = self.buffers.get(key)
+            if buffer is None:
+                buffer = DigestBuffer(time.monotonic() + self.window)
+                self.buffers[key] = buffer
+                heapq.heappush(self._deadlines, (buffer.deadline, key))
+            buffer.items.append(item)
+            self.buffered_in_memory += 1
+            self.events_in += 1
+            if buffer.size >= self.max_items:
+                full.append(key)
+        for key in full:
+            await self._flush_buffer(key)
+        if self.buffered_in_memory > self.max_buffered_items:
+            await self._spill()
+
+    async def _spill(self):
+        if self.redis is None:
+            # nowhere to spill, flush the oldest buffers early instead
+            while self.buffered_in_memory > self.max_buffered_items and self._deadlines:
+                await self._flush_buffer(heapq.heappop(self._deadlines)[1])
+            return
+        target = self.max_buffered_items // 2
+        largest = sorted(self.buffers.items(), key=lambda entry: -len(entry[1].items))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, buffer in largest:
+                if self.buffered_in_memory <= target:
+                    break
+                if not buffer.items:
+                    continue
+                pipe.rpush(
+                    self._spill_key(key), *(i.model_dump_json() for i in buffer.items)
+                )
+                pipe.expire(self._spill_key(key), int(self.window * 2) + 60)
+                buffer.spilled += len(buffer.items)
+                self.buffered_in_memory -= len(buffer.items)
+                buffer.items = []
+            await pipe.execute()
+
+    @staticmethod
+    def _spill_key(key: BufferKey) -> str:
+        return f"{DIGEST_SPILL_KEY_PREFIX}:{key[0]}:{key[1]}"
+
+    async def _collect(
+        self, key: BufferKey, buffer: DigestBuffer
+    ) -> List[DispatchItem]:
+        items = buffer.items
+        if buffer.spilled:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.lrange(self._spill_key(key), 0, -1)
+                pipe.delete(self._spill_key(key))
+                raw_items, _ = await pipe.execute()
+            items = [DispatchItem.model_validate_json(raw) for raw in raw_items] + items
+        return items
+
+    def build_digest(self, items: List[DispatchItem]) -> DispatchItem:
+        """
+        The item queued for the buffered items, not flagged as a digest any
+        more so the dispatcher sends it rather than buffering it again
+        """
+        if len(items) == 1:
+            return items[0].model_copy(update={"digest": False})
+        first = items[0]
+        rendered = self.renderer.render(
+            self.digest_parts,
+            {
+                "count": len(items),
+                "channel": first.channel,
+                "items": [{"subject": i.subject, "body": i.body} for i in items],
+            },
+        )
+        return DispatchItem(
+            channel=first.channel,
+            to=first.to,
+            subject=rendered.get("subject"),
+            body=rendered["body"],
+            recipient_uid=first.recipient_uid,
+            owner_uid=first.owner_uid,
+            priority=first.priority,
+            metadata=first.metadata,
+            attachments=first.attachments,
+            digest=False,
+            # the items' own status, and broadcast counts, come from these
+            digest_of=[
+                CoalescedItem(uid=i.uid, broadcast_uid=i.broadcast_uid) for i in items
+            ],
+        )
+
+    async def _flush_buffer(self, key: BufferKey):
+        buffer = self.buffers.pop(key, None)
+        if buffer is None:
+            return
+        self.buffered_in_memory -= len(buffer.items)
+        items = await self._collect(key, buffer)
+        if not items:
+            return
+        await self.flush([self.build_digest(items)])
+        self.messages_out += 1
+
+    async def flush_due(self) -> int:
+        """Flush every buffer whose window has expired"""
+        now = time.monotonic()
+        flushed = 0
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, key = heapq.heappop(self._deadlines)
+            buffer = self.buffers.get(key)
+            # skip heap entries left behind by buffers flushed on size
+            if buffer is not None and buffer.deadline == deadline:
+                await self._flush_buffer(key)
+                flushed += 1
+        return flushed
+
+    async def flush_all(self):
+        for key in list(self.buffers):
+            await self._flush_buffer(key)
+        self._deadlines.clear()
+
+    async def run(self, tick: Optional[float] = None):
+        """Flush expired windows until cancelled, then flush what is left"""
+        tick = tick or min(max(self.window / 10, 0.05), 1.0)
+        try:
+            while True:
+                try:
+                    await self.flush_due()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception("Digest flush failed")
+                await asyncio.sleep(tick)
+        finally:
+            await self.flush_all()
@@ -0,0 +1,269 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from src.channels.base import ChannelAdapter, DeliveryResult
+from src.delivery_module.writer import DeliveryLogWriter
+
+from .coalesce import Coalescer
+from .payloads import PayloadStore
+from .queue import DispatchQueue
+from .retry import RetryScheduler
+from .schema import DispatchItem, Lane
+from .status import DeliveryStatus, StatusPublisher
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchOutcome:
+    """
+    What became of a batch. held are retryable failures the caller keeps
+    back itself rather than handing them to the retry scheduler.
+    """
+
+    def __init__(self):
+        self.results: List[DeliveryResult] = []
+        self.sent: List[DispatchItem] = []
+        self.retry: List[DispatchItem] = []
+        self.retry_errors: List[Optional[str]] = []
+        self.held: List[DispatchItem] = []
+        self.dead: List[DispatchItem] = []
+        self.dead_errors: List[Optional[str]] = []
+
+
+class Dispatcher:
+    """
+    Pulls items off the dispatch queue and hands them to the channel adapters.
+    Retryable failures go to the retry scheduler, permanent ones straight to
+    the dead-letter store. Items flagged for a digest are handed to the
+    coalescer, which queues the merged digest later. Content kept in the
+    payload store is filled in first. Status changes go to the status
+    streams and the delivery log write-behind buffer.
+    """
+
+    def __init__(
+        self,
+        queue: DispatchQueue,
+        retry_scheduler: RetryScheduler,
+        get_channel: Callable[[str], ChannelAdapter],
+        coalescer: Optional[Coalescer] = None,
+        status_publisher: Optional[StatusPublisher] = None,
+        delivery_log: Optional[DeliveryLogWriter] = None,
+        payloads: Optional[PayloadStore] = None,
+    ):
+        self.queue = queue
+        self.retry_scheduler = retry_scheduler
+        self.get_channel = get_channel
+        self.coalescer = coalescer
+        self.status_publisher = status_publisher
+        self.delivery_log = delivery_log
+        self.payloads = payloads
+        self.sent = 0
+        self.failed = 0
+
+    async def send(
+        self,
+        items: Sequence[DispatchItem],
+        unsent: Optional[Dict[UUID, DispatchItem]] = None,
+    ) -> DispatchOutcome:
+        """
+        Hand items to their channels (digest items to the coalescer). Items
+        sent or coalesced are taken out of unsent when given, so a failure
+        part way only puts the rest back.
+        """
+        if unsent is None:
+            unsent = {}
+        outcome = DispatchOutcome()
+        # items with their payload filled in, by uid; the outcome keeps the
+        # items themselves, which carry only the reference
+        contents: Dict[UUID, DispatchItem] = {}
+        if self.payloads is not None:
+            contents = await self.payloads.resolve(items)
+            resolved = []
+            for item in items:
+                if item.payload_ref and item.uid not in contents:
+                    item.attempts += 1
+                    item.last_error = "Message payload expired"
+                    outcome.dead.append(item)
+                    outcome.dead_errors.append(item.last_error)
+                else:
+                    resolved.append(item)
+            items = resolved
+        if self.coalescer is not None:
+            digest = [item for item in items if item.digest]
+            if digest:
+                await self.coalescer.add(
+                    [contents.get(item.uid, item) for item in digest]
+                )
+                for item in digest:
+                    unsent.pop(item.uid, None)
+                items = [item for item in items if not item.digest]
+        by_channel: Dict[str, List[DispatchItem]] = defaultdict(list)
+        for item in items:
+            by_channel[item.channel].append(item)
+
+        for channel_name, channel_items in by_channel.items():
+            try:
+                channel = self.get_channel(channel_name)
+            except ValueError as e:
+                outcome.dead.extend(channel_items)
+                outcome.dead_errors.extend([str(e)] * len(channel_items))
+                continue
+            channel_results = await channel.send_many(
+                [contents.get(item.uid, item).to_message() for item in channel_items]
+            )
+            for item, result in zip(channel_items, channel_results):
+                if result.success:
+                    self.sent += 1
+                    outcome.sent.append(item)
+                    unsent.pop(item.uid, None)
+                    continue
+                self.failed += 1
+                if result.retryable:
+                    outcome.retry.append(item)
+                    outcome.retry_errors.append(result.error)
+                else:
+                    item.attempts += 1
+                    item.last_error = result.error
+                    outcome.dead.append(item)
+                    outcome.dead_errors.append(result.error)
+            outcome.results.extend(channel_results)
+        return outcome
+
+    async def record(
+        self,
+        outcome: DispatchOutcome,
+        unsent: Optional[Dict[UUID, DispatchItem]] = None,
+    ):
+        """
+        Schedule retries, dead-letter failures and publish the status
+        changes. Failures are taken out of unsent, when given, once they
+        are scheduled or parked.
+        """
+        if unsent is None:
+            unsent = {}
+        if outcome.retry:
+            await self.retry_scheduler.schedule(outcome.retry, outcome.retry_errors)
+            for item in outcome.retry:
+                unsent.pop(item.uid, None)
+        if outcome.dead:
+            await self.retry_scheduler.dead_letters.park(
+                outcome.dead, outcome.dead_errors
+            )
+            for item in outcome.dead:
+                unsent.pop(item.uid, None)
+        if self.status_publisher is not None or self.delivery_log is not None:
+            changes = self._status_changes(
+                outcome.sent, outcome.retry + outcome.held, outcome.dead
+            )
+            if self.delivery_log is not None:
+                self.delivery_log.record(changes)
+            if self.status_publisher is not None:
+                await self.status_publisher.publish(changes)
+
+    async def process(
+        self,
+        items: Sequence[DispatchItem],
+        unsent: Optional[Dict[UUID, DispatchItem]] = None,
+    ) -> List[DeliveryResult]:
+        outcome = await self.send(items, unsent)
+        await self.record(outcome, unsent)
+        return outcome.results
+
+    def _status_changes(
+        self,
+        sent: List[DispatchItem],
+        retry: List[DispatchItem],
+        dead: List[DispatchItem],
+    ) -> List[Tuple[DispatchItem, DeliveryStatus]]:
+        policy = self.retry_scheduler.policy
+        changes = [(item, DeliveryStatus.SENT) for item in sent]
+        changes.extend((item, DeliveryStatus.FAILED) for item in dead)
+        # the scheduler dead-letters retries that ran out of attempts
+        changes.extend(
+            (
+                item,
+                (
+                    DeliveryStatus.FAILED
+                    if item.attempts >= policy.attempts_for(item.channel)
+                    else DeliveryStatus.RETRYING
+                ),
+            )
+            for item in retry
+        )
+        # a digest's status is also that of every item coalesced into it
+        changes.extend(
+            (
+                item.model_copy(
+                    update={
+                        "uid": part.uid,
+                        "broadcast_uid": part.broadcast_uid,
+                        "digest_of": [],
+                        "digest_uid": item.uid,
+                    }
+                ),
+                status,
+            )
+            for item, status in list(changes)
+            for part in item.digest_of
+        )
+        return changes
+
+    async def run(
+        self,
+        batch_size: int = 100,
+        lanes: Optional[Sequence[Lane]] = None,
+        stop: Optional[asyncio.Event] = None,
+    ):
+        """
+        Process queue batches until cancelled or stop is set, optionally only
+        from some lanes. Stopping lets the batch in hand finish.
+        """
+        while stop is None or not stop.is_set():
+            items = await self.queue.dequeue(batch_size, lanes=lanes)
+            if items:
+                # items neither sent, coalesced, scheduled nor parked yet
+                unsent = {item.uid: item for item in items}
+                try:
+                    await self.process(items, unsent)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception("Dispatch of %d items failed", len(items))
+                    # the rest went out already, retrying them would repeat them
+                    retry = list(unsent.values())
+                    if retry:
+                        await self.retry_scheduler.schedule(
+                            retry, ["dispatch error"] * len(retry)
+                        )
+
+    async def run_consumers(
+        self,
+        consumers: int,
+        reserved: Optional[Dict[Lane, int]] = None,
+        batch_size: int = 100,
+        stop: Optional[asyncio.Event] = None,
+    ):
+        """
+        Run concurrent consumers until cancelled or stop is set. reserved
+        consumers only serve their lane, so e.g. transactional traffic always
+        has free capacity no matter how much bulk work is queued; the rest
+        serve every lane. The delivery log buffer is flushed alongside and
+        drained once the consumers are done.
+        """
+        lanes_per_consumer: List[Optional[List[Lane]]] = []
+        for lane, count in (reserved or {}).items():
+            lanes_per_consumer.extend([[Lane(lane)]] * count)
+        shared = max(consumers - len(lanes_per_consumer), 1)
+        lanes_per_consumer.extend([None] * shared)
+        flusher = None
+        if self.delivery_log is not None:
+            flusher = asyncio.create_task(self.delivery_log.run())
+        try:
+            await asyncio.gather(
+                *(self.run(batch_size, lanes, stop) for lanes in lanes_per_consumer)
+            )
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+                await asyncio.gather(flusher, return_exceptions=True)
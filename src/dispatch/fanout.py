@@ -0,0 +1,270 @@
+import asyncio
+import logging
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.recipient_module.models import Recipient
+from src.segment_module.models import SegmentMember
+from src.suppression_module.filter import SuppressionFilter
+
+from .payloads import PayloadStore
+from .queue import DispatchQueue
+from .schema import BroadcastSchema, DispatchItem
+from .status import DeliveryStatus, StatusPublisher
+
+logger = logging.getLogger(__name__)
+
+# recipient field holding the address for each channel
+CHANNEL_ADDRESS_FIELDS = {"email": "email", "sms": "phone_number"}
+
+AudienceRow = Tuple[UUID, str]
+
+
+def _address_column(channel: str):
+    address_field = CHANNEL_ADDRESS_FIELDS.get(channel)
+    if not address_field:
+        raise ValueError(f"Channel {channel} has no recipient address field")
+    return getattr(Recipient, address_field)
+
+
+def _in_audience(
+    statement,
+    owner_uid: UUID,
+    channel: str,
+    segment_uid: Optional[UUID] = None,
+    timezones: Optional[Sequence[Optional[str]]] = None,
+):
+    """Restrict a statement over recipients to a broadcast's audience"""
+    statement = statement.where(
+        Recipient.created_by == owner_uid, _address_column(channel).is_not(None)
+    )
+    if segment_uid is not None:
+        statement = statement.join(
+            SegmentMember, SegmentMember.recipient_uid == Recipient.uid
+        ).where(SegmentMember.segment_uid == segment_uid)
+    if timezones is not None:
+        named = [name for name in timezones if name is not None]
+        condition = Recipient.timezone.in_(named)
+        if len(named) < len(timezones):
+            condition = or_(condition, Recipient.timezone.is_(None))
+        statement = statement.where(condition)
+    return statement
+
+
+async def stream_audience(
+    session: AsyncSession,
+    owner_uid: UUID,
+    channel: str,
+    chunk_size: int = 5000,
+    segment_uid: Optional[UUID] = None,
+    timezones: Optional[Sequence[Optional[str]]] = None,
+    after: Optional[UUID] = None,
+) -> AsyncIterator[Sequence[AudienceRow]]:
+    """
+    Yield (recipient uid, address) chunks for every recipient of owner_uid,
+    or only the members of segment_uid, reachable on channel, and in one of
+    timezones when given (None standing for no timezone). Rows come from a
+    server-side cursor so only one chunk is held in memory no matter how
+    large the audience is. They are in uid order, starting past after when
+    given, so an interrupted fan-out can pick up where it stopped.
+
+    Raises:
+        ValueError: If recipients have no address field for the channel.
+    """
+    # plain columns rather than ORM objects, so rows never pile up in the
+    # session's identity map
+    statement = _in_audience(
+        select(Recipient.uid, _address_column(channel)),
+        owner_uid,
+        channel,
+        segment_uid,
+        timezones,
+    )
+    if after is not None:
+        statement = statement.where(Recipient.uid > after)
+    statement = statement.order_by(Recipient.uid).execution_options(
+        yield_per=chunk_size
+    )
+    result = await session.stream(statement)
+    async for rows in result.partitions(chunk_size):
+        yield rows
+
+
+async def audience_timezones(
+    session: AsyncSession,
+    owner_uid: UUID,
+    channel: str,
+    segment_uid: Optional[UUID] = None,
+) -> Dict[Optional[str], int]:
+    """Number of recipients in a broadcast's audience per timezone"""
+    statement = _in_audience(
+        select(Recipient.timezone, func.count()), owner_uid, channel, segment_uid
+    ).group_by(Recipient.timezone)
+    result = await session.execute(statement)
+    return dict(result.all())
+
+
+class AudienceFanout:
+    """
+    Expands a broadcast into one dispatch item per recipient, streaming the
+    audience from the database into batched queue pushes. The push of one
+    chunk overlaps the fetch of the next, and at most two chunks are alive
+    at a time, so memory stays flat and the first sends start right away.
+    Suppressed addresses are dropped chunk by chunk before the push. With a
+    payload store the broadcast's content is stored once and the items only
+    reference it.
+    """
+
+    def __init__(
+        self,
+        queue: DispatchQueue,
+        chunk_size: int = 5000,
+        suppression: Optional[SuppressionFilter] = None,
+        status_publisher: Optional[StatusPublisher] = None,
+        payloads: Optional[PayloadStore] = None,
+    ):
+        self.queue = queue
+        self.chunk_size = chunk_size
+        self.suppression = suppression
+        self.status_publisher = status_publisher
+        self.payloads = payloads
+
+    async def _enqueue(self, items: List[DispatchItem]) -> int:
+        # published first so a fast dispatcher's update can't be overtaken
+        if self.status_publisher is not None:
+            await self.status_publisher.publish(
+                [(item, DeliveryStatus.QUEUED) for item in items]
+            )
+        return await self.queue.enqueue(items)
+
+    async def _enqueue_chunk(
+        self,
+        items: List[DispatchItem],
+        last_uid: UUID,
+        checkpoint: Optional[Callable[[UUID], Awaitable[None]]],
+    ) -> int:
+        queued = await self._enqueue(items) if items else 0
+        if checkpoint is not None:
+            await checkpoint(last_uid)
+        return queued
+
+    @staticmethod
+    def build_items(
+        broadcast: BroadcastSchema,
+        broadcast_uid: UUID,
+        owner_uid: UUID,
+        rows: Sequence[AudienceRow],
+        payload_ref: Optional[str] = None,
+        attachments: Sequence[Dict[str, Any]] = (),
+    ) -> List[DispatchItem]:
+        body, subject, html = broadcast.body, broadcast.subject, broadcast.html
+        metadata, attachments = broadcast.metadata, list(attachments)
+        if payload_ref:
+            # the content lives in the payload store
+            body, subject, html, metadata, attachments = "", None, None, {}, []
+        return [
+            DispatchItem(
+                channel=broadcast.channel,
+                to=to,
+                body=body,
+                subject=subject,
+                html=html,
+                recipient_uid=recipient_uid,
+                owner_uid=owner_uid,
+                broadcast_uid=broadcast_uid,
+                priority=broadcast.priority,
+                digest=broadcast.digest,
+                metadata=metadata,
+                attachments=attachments,
+                payload_ref=payload_ref,
+            )
+            for recipient_uid, to in rows
+        ]
+
+    async def fan_out(
+        self,
+        broadcast: BroadcastSchema,
+        owner_uid: UUID,
+        session: AsyncSession,
+        broadcast_uid: Optional[UUID] = None,
+        timezones: Optional[Sequence[Optional[str]]] = None,
+        attachments: Sequence[Dict[str, Any]] = (),
+        after: Optional[UUID] = None,
+        checkpoint: Optional[Callable[[UUID], Awaitable[None]]] = None,
+    ) -> int:
+        """
+        Queue the broadcast for every recipient of owner_uid, or the members
+        of its segment; only those in timezones when given. attachments are
+        the broadcast's, already resolved for the owner. Recipients up to
+        after were queued by an earlier run; checkpoint is handed the last
+        recipient uid of every chunk once the chunk is queued.
+        Returns:
+            The number of notifications queued
+        """
+        broadcast_uid = broadcast_uid or uuid4()
+        queued = suppressed = 0
+        payload_ref = None
+        if self.payloads is not None:
+            payload_ref = await self.payloads.put(
+                {
+                    "body": broadcast.body,
+                    "subject": broadcast.subject,
+                    "html": broadcast.html,
+                    "metadata": broadcast.metadata,
+                    "attachments": list(attachments),
+                }
+            )
+        pending: Optional[asyncio.Task] = None
+        try:
+            async for rows in stream_audience(
+                session,
+                owner_uid,
+                broadcast.channel,
+                self.chunk_size,
+                segment_uid=broadcast.segment_uid,
+                timezones=timezones,
+                after=after,
+            ):
+                last_uid = rows[-1][0]
+                if self.suppression is not None:
+                    skip = await self.suppression.suppressed(
+                        owner_uid, broadcast.channel, [to for _, to in rows]
+                    )
+                    if skip:
+                        rows = [row for row in rows if row[1] not in skip]
+                        suppressed += len(skip)
+                items = self.build_items(
+                    broadcast, broadcast_uid, owner_uid, rows, payload_ref, attachments
+                )
+                if pending is not None:
+                    queued += await pending
+                pending = asyncio.create_task(
+                    self._enqueue_chunk(items, last_uid, checkpoint)
+                )
+            if pending is not None:
+                queued += await pending
+                pending = None
+        finally:
+            if pending is not None:
+                pending.cancel()
+        logger.info(
+            "Broadcast %s queued %d notifications, %d suppressed",
+            broadcast_uid,
+            queued,
+            suppressed,
+        )
+        return queued
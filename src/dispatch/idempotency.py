@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+import redis.asyncio as aioredis
+
+IDEMPOTENCY_KEY_PREFIX = "idempotency"
+
+
+class LocalKeyCache:
+    """Bounded LRU of recently claimed keys with their expiry time"""
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._keys: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def contains(self, key: str, now: float) -> bool:
+        expires = self._keys.get(key)
+        if expires is None:
+            return False
+        if expires <= now:
+            del self._keys[key]
+            return False
+        self._keys.move_to_end(key)
+        return True
+
+    def add(self, key: str, expires: float):
+        self._keys[key] = expires
+        self._keys.move_to_end(key)
+        if len(self._keys) > self.max_size:
+            self._keys.popitem(last=False)
+
+    def discard(self, key: str):
+        self._keys.pop(key, None)
+
+
+class IdempotencyGuard:
+    """
+    Claims dedup keys so a notification is only enqueued once per key.
+
+    The claim is an atomic Redis SET NX with a TTL, shared by every producer.
+    Keys this process already claimed (or saw as duplicates) are remembered in
+    a local LRU, so hot duplicates are rejected without a Redis round trip.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        ttl: int = 86400,
+        local_cache_size: int = 100000,
+        local_duplicate_ttl: int = 60,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        # a duplicate's Redis key may have been set long ago, so it is only
+        # trusted locally for a short while
+        self.local_duplicate_ttl = min(local_duplicate_ttl, ttl)
+        self.local = LocalKeyCache(local_cache_size)
+        self.local_hits = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def key(scope: str, dedup_key: str) -> str:
+        return f"{IDEMPOTENCY_KEY_PREFIX}:{scope}:{dedup_key}"
+
+    async def claim(self, keys: Sequence[str]) -> List[bool]:
+        """
+        Try to claim each key.
+        Args:
+            keys: Full idempotency keys, see IdempotencyGuard.key
+        Returns:
+            True for every key claimed now, False for duplicates
+        """
+        now = time.monotonic()
+        claimed = [False] * len(keys)
+        pending, seen = [], set()
+        for index, key in enumerate(keys):
+            if key in seen or self.local.contains(key, now):
+                self.local_hits += 1
+                continue
+            seen.add(key)
+            pending.append(index)
+        if pending:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for index in pending:
+                    pipe.set(keys[index], 1, nx=True, ex=self.ttl)
+                results = await pipe.execute()
+            for index, result in zip(pending, results):
+                claimed[index] = bool(result)
+                ttl = self.ttl if claimed[index] else self.local_duplicate_ttl
+                self.local.add(keys[index], now + ttl)
+        self.duplicates += claimed.count(False)
+        return claimed
+
+    async def claim_value(self, key: str, value: str) -> Optional[str]:
+        """
+        Claim a key holding value, e.g. the uid of what the key created, so
+        repeats can be answered with it. Bypasses the local cache.
+        Returns:
+            None when claimed now, else the value of the earlier claim
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, value, nx=True, ex=self.ttl)
+            pipe.get(key)
+            claimed, stored = await pipe.execute()
+        if claimed:
+            return None
+        self.duplicates += 1
+        return stored
+
+    async def release(self, keys: Sequence[str]):
+        """Forget claims, e.g. when the enqueue that followed them failed"""
+        if not keys:
+            return
+        for key in keys:
+            self.local.discard(key)
+        await self.redis.delete(*keys)
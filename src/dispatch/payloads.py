@@ -0,0 +1,167 @@
+import gzip
+import hashlib
+import importlib.util
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from .schema import DispatchItem
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_KEY_PREFIX = "dispatch:payload"
+
+# zstd compresses better and faster than gzip, when zstandard is installed
+ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+
+# first byte of a stored payload, naming its codec
+CODEC_TAGS = {"none": b"n", "gzip": b"g", "zstd": b"z"}
+
+Payload = Dict[str, Any]
+
+
+def payload_ref(payload: Payload) -> str:
+    """Content hash of a payload, the same whatever it is compressed with"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class PayloadCodec:
+    """Compresses payloads above min_size with gzip or zstd"""
+
+    def __init__(self, compression: str = "gzip", min_size: int = 256, level: int = 6):
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard is not installed, payloads use gzip")
+            compression = "gzip"
+        if compression not in CODEC_TAGS:
+            raise ValueError(f"Unknown payload compression: {compression}")
+        self.compression = compression
+        self.min_size = min_size
+        self.level = level
+        self._zstd_compressor = self._zstd_decompressor = None
+        if ZSTD_AVAILABLE:
+            import zstandard  # pylint: disable=import-error
+
+            self._zstd_compressor = zstandard.ZstdCompressor(level=level)
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, payload: Payload) -> bytes:
+        raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+        codec = self.compression if len(raw) >= self.min_size else "none"
+        if codec == "gzip":
+            raw = gzip.compress(raw, compresslevel=self.level, mtime=0)
+        elif codec == "zstd":
+            raw = self._zstd_compressor.compress(raw)
+        return CODEC_TAGS[codec] + raw
+
+    def decode(self, data: bytes) -> Payload:
+        tag, raw = data[:1], data[1:]
+        if tag == CODEC_TAGS["gzip"]:
+            raw = gzip.decompress(raw)
+        elif tag == CODEC_TAGS["zstd"]:
+            if self._zstd_decompressor is None:
+                raise ValueError("Payload is zstd compressed but zstandard is missing")
+            raw = self._zstd_decompressor.decompress(raw)
+        return json.loads(raw)
+
+
+class PayloadStore:
+    """
+    Message content (subject, body, metadata) shared by many queued items,
+    stored once in Redis under its content hash. A broadcast's queue items
+    then carry only the hash next to their per-recipient fields, so a
+    million-recipient campaign stores its body once instead of a million
+    times. Dispatchers resolve the hash through a local LRU, so a campaign's
+    payload crosses the network about once per worker.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        ttl: int = 604800,
+        codec: Optional[PayloadCodec] = None,
+        cache_size: int = 1024,
+    ):
+        # raw bytes: payloads are compressed
+        self.redis = redis
+        self.ttl = ttl
+        self.codec = codec or PayloadCodec()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Payload]" = OrderedDict()
+        self.stored_bytes = 0
+
+    @staticmethod
+    def key(ref: str) -> str:
+        return f"{PAYLOAD_KEY_PREFIX}:{ref}"
+
+    def _remember(self, ref: str, payload: Payload):
+        self._cache[ref] = payload
+        self._cache.move_to_end(ref)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def put(self, payload: Payload) -> str:
+        """
+        Store a payload, or extend the life of an identical one.
+        Returns:
+            The payload reference for DispatchItem.payload_ref
+        """
+        ref = payload_ref(payload)
+        data = self.codec.encode(payload)
+        await self.redis.set(self.key(ref), data, ex=self.ttl)
+        self.stored_bytes += len(data)
+        self._remember(ref, payload)
+        return ref
+
+    async def get_many(self, refs: Sequence[str]) -> Dict[str, Payload]:
+        """The payloads found for refs; expired ones are left out"""
+        found: Dict[str, Payload] = {}
+        missing = []
+        for ref in dict.fromkeys(refs):
+            payload = self._cache.get(ref)
+            if payload is None:
+                missing.append(ref)
+            else:
+                self._cache.move_to_end(ref)
+                found[ref] = payload
+        if missing:
+            raw = await self.redis.mget([self.key(ref) for ref in missing])
+            for ref, data in zip(missing, raw):
+                if data is not None:
+                    found[ref] = self.codec.decode(data)
+                    self._remember(ref, found[ref])
+        return found
+
+    async def resolve(self, items: Sequence[DispatchItem]) -> Dict[UUID, DispatchItem]:
+        """
+        Copies of the items holding a payload reference with their content
+        filled in; item metadata wins over payload metadata. The items
+        themselves keep only the reference, so retries and dead letters
+        don't carry the content.
+        Returns:
+            The copies by item uid; an item with a reference but no copy had
+            its payload expire
+        """
+        refs = [item.payload_ref for item in items if item.payload_ref]
+        if not refs:
+            return {}
+        payloads = await self.get_many(refs)
+        resolved: Dict[UUID, DispatchItem] = {}
+        for item in items:
+            payload = payloads.get(item.payload_ref) if item.payload_ref else None
+            if payload is None:
+                continue
+            resolved[item.uid] = item.model_copy(
+                update={
+                    "body": payload["body"],
+                    "subject": payload.get("subject"),
+                    "html": payload.get("html"),
+                    "metadata": {**payload.get("metadata", {}), **item.metadata},
+                    "attachments": payload.get("attachments", item.attachments),
+                }
+            )
+        return resolved
@@ -0,0 +1,138 @@
+from typing import Dict, List, Optional, Sequence
+
+import redis.asyncio as aioredis
+
+from .schema import LANES, DispatchItem, Lane
+
+DISPATCH_QUEUE_KEY = "dispatch:queue"
+
+DEFAULT_LANE_WEIGHTS = {Lane.TRANSACTIONAL: 6, Lane.NORMAL: 3, Lane.BULK: 1}
+
+
+class DispatchQueue:
+    """
+    Dispatch queue split into priority lanes, one Redis list per lane.
+
+    dequeue() shares each batch between lanes by weight (deficit round robin),
+    so bulk traffic keeps moving but can never take more than its share while
+    higher lanes have work. Capacity a lane doesn't use goes to the others.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        prefix: str = DISPATCH_QUEUE_KEY,
+        weights: Optional[Dict[Lane, float]] = None,
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.weights = {
+            Lane(lane): w for lane, w in (weights or DEFAULT_LANE_WEIGHTS).items()
+        }
+        self._credit = {lane: 0.0 for lane in LANES}
+
+    def key(self, lane: Lane) -> str:
+        return f"{self.prefix}:{Lane(lane).value}"
+
+    def key_for(self, item: DispatchItem) -> str:
+        return self.key(item.priority)
+
+    async def enqueue(self, items: Sequence[DispatchItem]) -> int:
+        if not items:
+            return 0
+        by_lane: Dict[Lane, List[str]] = {}
+        for item in items:
+            by_lane.setdefault(item.priority, []).append(item.dump())
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane, payloads in by_lane.items():
+                pipe.lpush(self.key(lane), *payloads)
+            await pipe.execute()
+        return len(items)
+
+    async def requeue(self, items: Sequence[DispatchItem]) -> int:
+        """Put items back at the head of their lanes, to be popped in the given order"""
+        if not items:
+            return 0
+        by_lane: Dict[Lane, List[str]] = {}
+        for item in items:
+            by_lane.setdefault(item.priority, []).append(item.dump())
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane, payloads in by_lane.items():
+                # items are popped from the right end
+                pipe.rpush(self.key(lane), *reversed(payloads))
+            await pipe.execute()
+        return len(items)
+
+    def _quotas(self, max_items: int, lanes: Sequence[Lane]) -> Dict[Lane, int]:
+        weights = {lane: self.weights.get(lane, 1) for lane in lanes}
+        total = sum(weights.values()) or 1
+        quotas = {}
+        for lane in lanes:
+            self._credit[lane] += max_items * weights[lane] / total
+            quotas[lane] = int(self._credit[lane])
+        return quotas
+
+    async def _pop(self, counts: Dict[Lane, int]) -> Dict[Lane, List[str]]:
+        lanes = [lane for lane, count in counts.items() if count > 0]
+        if not lanes:
+            return {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane in lanes:
+                pipe.rpop(self.key(lane), counts[lane])
+            results = await pipe.execute()
+        return {lane: popped or [] for lane, popped in zip(lanes, results)}
+
+    async def dequeue(
+        self,
+        max_items: int = 100,
+        timeout: float = 1,
+        lanes: Optional[Sequence[Lane]] = None,
+    ) -> List[DispatchItem]:
+        """
+        Pop up to max_items across lanes, blocking up to timeout seconds when
+        every lane is empty.
+        Args:
+            max_items: Batch size
+            timeout: Seconds to block when there is no work
+            lanes: Restrict to these lanes, e.g. for consumers reserved to a lane
+        """
+        lanes = [Lane(lane) for lane in (lanes or LANES)]
+        quotas = self._quotas(max_items, lanes)
+        raw_items: List[str] = []
+        drained = set()
+        for lane, popped in (await self._pop(quotas)).items():
+            self._credit[lane] -= len(popped)
+            if len(popped) < quotas[lane]:
+                # an empty lane doesn't bank credit (deficit round robin)
+                self._credit[lane] = 0.0
+                drained.add(lane)
+            raw_items.extend(popped)
+
+        remaining = max_items - len(raw_items)
+        for lane in lanes:
+            if remaining <= 0:
+                break
+            if lane in drained:
+                continue
+            popped = (await self._pop({lane: remaining})).get(lane, [])
+            raw_items.extend(popped)
+            remaining -= len(popped)
+
+        if not raw_items:
+            popped = await self.redis.brpop(
+                [self.key(lane) for lane in lanes], timeout=timeout
+            )
+            if not popped:
+                return []
+            raw_items = [popped[1]]
+        return [DispatchItem.model_validate_json(raw) for raw in raw_items]
+
+    async def depths(self) -> Dict[Lane, int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane in LANES:
+                pipe.llen(self.key(lane))
+            results = await pipe.execute()
+        return dict(zip(LANES, results))
+
+    async def depth(self) -> int:
+        return sum((await self.depths()).values())
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+# Token bucket shared by every worker. Redis' clock is used so workers with
+# skewed clocks still agree on the refill. Returns the granted token count and,
+# when fewer tokens than requested were available, the wait in ms for the next one.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+if now > ts then
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+end
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+local wait_ms = 0
+if granted < requested then
+    wait_ms = math.ceil((1 - tokens) / rate * 1000)
+end
+return {granted, wait_ms}
+"""
+
+
+class RateLimiter:
+    """
+    Distributed token-bucket rate limiter for one provider account.
+
+    Instead of a Redis round trip per message, each worker leases a small
+    batch of tokens and hands them out locally. Leased tokens not used within
+    lease_ttl seconds are forfeited, so the aggregate rate across all workers
+    never exceeds the bucket rate, while the lease keeps Redis traffic at
+    about one call per lease_size messages.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: float,
+        burst: Optional[float] = None,
+        lease_size: Optional[int] = None,
+        lease_ttl: float = 0.25,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.redis = redis
+        self.key = f"rate_limit:{key}"
+        self.rate = rate
+        # a bucket of less than one token never grants any
+        self.burst = max(burst or rate, 1)
+        # by default a lease is 100ms worth of the whole quota, never more
+        # than the bucket holds
+        self.lease_size = min(max(1, int(lease_size or rate // 10)), int(self.burst))
+        self.lease_ttl = lease_ttl
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self._tokens = 0
+        self._lease_expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _lease(self, requested: int) -> int:
+        granted, wait_ms = await self._script(
+            keys=[self.key], args=[self.rate, self.burst, requested]
+        )
+        granted = int(granted)
+        if granted:
+            self._tokens = granted
+            self._lease_expires = time.monotonic() + self.lease_ttl
+        return int(wait_ms)
+
+    def _check(self, tokens: int):
+        if tokens > self.burst:
+            raise ValueError(
+                f"Cannot acquire {tokens} tokens, the bucket holds {self.burst}"
+            )
+
+    def _take_local(self, tokens: int) -> bool:
+        if self._tokens >= tokens and time.monotonic() < self._lease_expires:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: int = 1):
+        """
+        Wait until tokens can be spent against the provider quota
+        Raises:
+            ValueError: If tokens is more than the bucket holds.
+        """
+        self._check(tokens)
+        if self._take_local(tokens):
+            return
+        async with self._lock:
+            while not self._take_local(tokens):
+                self._tokens = 0
+                wait_ms = await self._lease(max(tokens, self.lease_size))
+                if self._tokens < tokens:
+                    await asyncio.sleep(max(wait_ms, 1) / 1000)
+
+    async def try_acquire(self, tokens: int = 1) -> bool:
+        """
+        Spend tokens if available right now, without waiting
+        Raises:
+            ValueError: If tokens is more than the bucket holds.
+        """
+        self._check(tokens)
+        if self._take_local(tokens):
+            return True
+        async with self._lock:
+            if self._take_local(tokens):
+                return True
+            self._tokens = 0
+            await self._lease(max(tokens, self.lease_size))
+            return self._take_local(tokens)
+
+    def refund(self, tokens: int = 1):
+        """
+        Give back tokens acquired for a message that wasn't sent after all.
+        They return to the current lease; once it has expired they are
+        forfeited like any other unused leased token.
+        """
+        if time.monotonic() < self._lease_expires:
+            self._tokens += tokens
@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from .queue import DispatchQueue
+from .schema import LANES, DeadLetter, DispatchItem, Lane
+
+logger = logging.getLogger(__name__)
+
+RETRY_QUEUE_KEY = "dispatch:retry"
+DEAD_LETTER_KEY = "dispatch:dead_letter"
+DEAD_LETTER_INDEX_KEY = "dispatch:dead_letter:index"
+
+# Move up to ARGV[2] items due at ARGV[1] from the delay ZSET to the dispatch
+# queue in one step, so concurrent promoters never promote an item twice.
+PROMOTE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+    redis.call('LPUSH', KEYS[2], unpack(due))
+end
+return #due
+"""
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the n-th retry waits a random
+    delay between 0 and min(max_delay, base_delay * multiplier ** n).
+    """
+
+    def __init__(
+        self,
+        base_delay: float = 5.0,
+        max_delay: float = 3600.0,
+        multiplier: float = 2.0,
+        max_attempts: int = 5,
+        max_attempts_per_channel: Optional[Dict[str, int]] = None,
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_attempts = max_attempts
+        self.max_attempts_per_channel = max_attempts_per_channel or {}
+
+    def attempts_for(self, channel: str) -> int:
+        return self.max_attempts_per_channel.get(channel, self.max_attempts)
+
+    def delay(self, attempts: int) -> float:
+        ceiling = min(
+            self.max_delay, self.base_delay * self.multiplier ** (attempts - 1)
+        )
+        return random.uniform(0, ceiling)
+
+
+class DeadLetterStore:
+    """
+    Deliveries that ran out of attempts, kept in a Redis hash by item uid with
+    ZSET indexes by failure time for listing: one of all dead letters and one
+    per owner, so an owner's page is read from their own index.
+    """
+
+    def __init__(self, redis: aioredis.Redis):
+        self.redis = redis
+
+    @staticmethod
+    def owner_index_key(owner_uid: UUID) -> str:
+        return f"{DEAD_LETTER_INDEX_KEY}:{owner_uid}"
+
+    async def park(
+        self, items: Sequence[DispatchItem], errors: Sequence[Optional[str]]
+    ):
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for item, error in zip(items, errors):
+                key = str(item.uid)
+                pipe.hset(
+                    DEAD_LETTER_KEY,
+                    key,
+                    DeadLetter(item=item, error=error).model_dump_json(),
+                )
+                pipe.zadd(DEAD_LETTER_INDEX_KEY, {key: now})
+                if item.owner_uid is not None:
+                    pipe.zadd(self.owner_index_key(item.owner_uid), {key: now})
+            await pipe.execute()
+
+    async def count(self, owner_uid: Optional[UUID] = None) -> int:
+        if owner_uid is not None:
+            return await self.redis.zcard(self.owner_index_key(owner_uid))
+        return await self.redis.zcard(DEAD_LETTER_INDEX_KEY)
+
+    async def list(
+        self, offset: int = 0, limit: int = 100, owner_uid: Optional[UUID] = None
+    ) -> List[DeadLetter]:
+        """Most recent dead letters first, of one owner when owner_uid is given"""
+        index = (
+            DEAD_LETTER_INDEX_KEY
+            if owner_uid is None
+            else self.owner_index_key(owner_uid)
+        )
+        uids = await self.redis.zrevrange(index, offset, offset + limit - 1)
+        if not uids:
+            return []
+        raw_letters = await self.redis.hmget(DEAD_LETTER_KEY, uids)
+        return [DeadLetter.model_validate_json(raw) for raw in raw_letters if raw]
+
+    async def get(self, uid: UUID) -> Optional[DeadLetter]:
+        raw = await self.redis.hget(DEAD_LETTER_KEY, str(uid))
+        if not raw:
+            return None
+        return DeadLetter.model_validate_json(raw)
+
+    def _unpark(self, pipe, items: Sequence[DispatchItem]):
+        keys = [str(item.uid) for item in items]
+        pipe.hdel(DEAD_LETTER_KEY, *keys)
+        pipe.zrem(DEAD_LETTER_INDEX_KEY, *keys)
+        for item in items:
+            if item.owner_uid is not None:
+                pipe.zrem(self.owner_index_key(item.owner_uid), str(item.uid))
+
+    async def _items(self, uids: Sequence[UUID]) -> List[DispatchItem]:
+        if not uids:
+            return []
+        raw_letters = await self.redis.hmget(
+            DEAD_LETTER_KEY, [str(uid) for uid in uids]
+        )
+        return [DeadLetter.model_validate_json(raw).item for raw in raw_letters if raw]
+
+    async def remove(self, uids: Sequence[UUID]):
+        items = await self._items(uids)
+        if not items:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._unpark(pipe, items)
+            await pipe.execute()
+
+    async def replay(
+        self,
+        uids: Sequence[UUID],
+        queue: DispatchQueue,
+        owner_uid: Optional[UUID] = None,
+    ) -> int:
+        """
+        Put dead letters back on the dispatch queue with a fresh attempt
+        budget; only those of owner_uid when given
+        """
+        items = await self._items(uids)
+        if owner_uid is not None:
+            items = [item for item in items if item.owner_uid == owner_uid]
+        if not items:
+            return 0
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._unpark(pipe, items)
+            for item in items:
+                item.attempts = 0
+                pipe.lpush(queue.key_for(item), item.model_dump_json())
+            await pipe.execute()
+        return len(items)
+
+
+class RetryScheduler:
+    """
+    Delay queue for failed deliveries: a Redis ZSET per lane scored by the
+    time of the next attempt. A promoter moves due items back to their lane
+    of the dispatch queue in batches (through enqueue() for a sharded
+    queue, which routes them to their shard); items out of attempts go to
+    the dead-letter store.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        queue: DispatchQueue,
+        policy: Optional[RetryPolicy] = None,
+        prefix: str = RETRY_QUEUE_KEY,
+    ):
+        self.redis = redis
+        self.queue = queue
+        self.policy = policy or RetryPolicy()
+        self.prefix = prefix
+        self.dead_letters = DeadLetterStore(redis)
+        self._promote = redis.register_script(PROMOTE_DUE_SCRIPT)
+
+    async def schedule(
+        self, items: Sequence[DispatchItem], errors: Sequence[Optional[str]]
+    ) -> int:
+        """
+        Schedule failed items for another attempt, or dead-letter them.
+        Returns:
+            The number of items scheduled for retry
+        """
+        now = time.time()
+        retries: Dict[Lane, Dict[str, float]] = {}
+        exhausted, exhausted_errors = [], []
+        for item, error in zip(items, errors):
+            item.attempts += 1
+            item.last_error = error
+            if item.attempts >= self.policy.attempts_for(item.channel):
+                exhausted.append(item)
+                exhausted_errors.append(error)
+            else:
+                retries.setdefault(item.priority, {})[item.model_dump_json()] = (
+                    now + self.policy.delay(item.attempts)
+                )
+        for lane, lane_retries in retries.items():
+            await self.redis.zadd(self.key(lane), lane_retries)
+        if exhausted:
+            await self.dead_letters.park(exhausted, exhausted_errors)
+        return sum(len(lane_retries) for lane_retries in retries.values())
+
+    def key(self, lane: Lane) -> str:
+        return f"{self.prefix}:{Lane(lane).value}"
+
+    async def _promote_routed(self, lane: Lane, now: float, batch_size: int) -> int:
+        """
+        Promote to a queue that routes items itself (the sharded queue): the
+        due items are read under WATCH and removed and pushed to their shards
+        in one MULTI, so nothing is lost between the two, and a promoter
+        racing this one makes it start over rather than promote them twice.
+        """
+        key = self.key(lane)
+
+        async def promote(pipe) -> int:
+            due = await pipe.zrangebyscore(key, "-inf", now, start=0, num=batch_size)
+            pipe.multi()
+            if not due:
+                return 0
+            by_key: Dict[str, List[str]] = {}
+            for raw in due:
+                item = DispatchItem.model_validate_json(raw)
+                by_key.setdefault(self.queue.key_for(item), []).append(raw)
+            pipe.zrem(key, *due)
+            for queue_key, payloads in by_key.items():
+                pipe.lpush(queue_key, *payloads)
+            return len(due)
+
+        return await self.redis.transaction(promote, key, value_from_callable=True)
+
+    async def promote_due(self, batch_size: int = 500) -> int:
+        """Promote up to batch_size due items per lane"""
+        now = time.time()
+        promoted = 0
+        for lane in LANES:
+            if isinstance(self.queue, DispatchQueue):
+                promoted += int(
+                    await self._promote(
+                        keys=[self.key(lane), self.queue.key(lane)],
+                        args=[now, batch_size],
+                    )
+                )
+                continue
+            promoted += await self._promote_routed(lane, now, batch_size)
+        return promoted
+
+    async def next_due_in(self) -> Optional[float]:
+        """Seconds until the earliest scheduled retry, None when nothing is scheduled"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane in LANES:
+                pipe.zrange(self.key(lane), 0, 0, withscores=True)
+            results = await pipe.execute()
+        scores = [earliest[0][1] for earliest in results if earliest]
+        if not scores:
+            return None
+        return max(min(scores) - time.time(), 0.0)
+
+    async def depths(self) -> Dict[Lane, int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane in LANES:
+                pipe.zcard(self.key(lane))
+            results = await pipe.execute()
+        return dict(zip(LANES, results))
+
+    async def run(self, batch_size: int = 500, max_interval: float = 1.0):
+        """
+        Promote due retries until cancelled. Full batches are followed by an
+        immediate next batch; otherwise it sleeps until the next item is due,
+        at most max_interval, so idle workers don't poll Redis in a hot loop.
+        """
+        while True:
+            try:
+                promoted = await self.promote_due(batch_size)
+                if promoted >= batch_size:
+                    continue
+                due_in = await self.next_due_in()
+            except aioredis.RedisError:
+                logger.exception("Retry promotion failed")
+                due_in = max_interval
+            await asyncio.sleep(
+                min(due_in if due_in is not None else max_interval, max_interval)
+            )
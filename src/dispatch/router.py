@@ -0,0 +1,183 @@
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.authentication.auth import AdminRoleChecker, get_current_active_user
+from src.database.db import get_session
+
+from .schema import (
+    BroadcastResponse,
+    BroadcastSchema,
+    DeadLetterReplayResponse,
+    DeadLetterReplaySchema,
+    DeadLetterResponse,
+    NotificationBatchResponse,
+    NotificationBatchSchema,
+)
+from .service import DeadLetterService, DispatchService, StatusStreamService
+
+# admin_user parameters only guard their endpoint
+# pylint: disable=unused-argument
+
+admin_role = AdminRoleChecker()
+
+dispatch_router = APIRouter(tags=["Dispatch"], prefix="/dispatch")
+
+
+@dispatch_router.post(
+    "/notifications",
+    response_model=NotificationBatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def send_notifications(
+    notification_payload: NotificationBatchSchema,
+    dispatch_service: DispatchService = Depends(DispatchService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> NotificationBatchResponse:
+    try:
+        return await dispatch_service.enqueue_notifications(
+            notification_batch=notification_payload,
+            owner_uid=current_user.uid,
+            session=session,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+
+@dispatch_router.post(
+    "/broadcasts",
+    response_model=BroadcastResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def send_broadcast(
+    broadcast_payload: BroadcastSchema,
+    dispatch_service: DispatchService = Depends(DispatchService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> BroadcastResponse:
+    """Notify the user's recipients or one segment; the workers fan it out"""
+    try:
+        broadcast = await dispatch_service.claim_broadcast(
+            broadcast=broadcast_payload, owner_uid=current_user.uid, session=session
+        )
+        if not broadcast.duplicate:
+            await dispatch_service.submit_broadcast(
+                broadcast_payload, current_user.uid, broadcast.broadcast_uid
+            )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+    return broadcast
+
+
+@dispatch_router.get(
+    "/dead-letters",
+    response_model=List[DeadLetterResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def retrieve_dead_letters(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    dead_letter_service: DeadLetterService = Depends(DeadLetterService),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> List[DeadLetterResponse]:
+    try:
+        return await dead_letter_service.retrieve_dead_letters(
+            owner_uid=current_user.uid, offset=offset, limit=limit
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+
+@dispatch_router.get(
+    "/dead-letters/{uid}",
+    response_model=DeadLetterResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def retrieve_dead_letter(
+    uid: UUID,
+    dead_letter_service: DeadLetterService = Depends(DeadLetterService),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[DeadLetterResponse]:
+    dead_letter = await dead_letter_service.retrieve_dead_letter(
+        uid=uid, owner_uid=current_user.uid
+    )
+    if not dead_letter:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Dead letter does not exist"
+        )
+    return dead_letter
+
+
+@dispatch_router.post(
+    "/dead-letters/replay",
+    response_model=DeadLetterReplayResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def replay_dead_letters(
+    replay_payload: DeadLetterReplaySchema,
+    dead_letter_service: DeadLetterService = Depends(DeadLetterService),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> DeadLetterReplayResponse:
+    try:
+        replayed = await dead_letter_service.replay_dead_letters(
+            uids=replay_payload.uids, owner_uid=current_user.uid
+        )
+        return DeadLetterReplayResponse(replayed=replayed)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+
+async def _status_stream(
+    kind: str, uid: UUID, status_service: StatusStreamService, current_user
+) -> StreamingResponse:
+    events = await status_service.status_events(
+        kind=kind, uid=uid, owner_uid=current_user.uid
+    )
+    if events is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"{kind} status not found"
+        )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@dispatch_router.get("/notifications/{uid}/status/stream")
+async def stream_notification_status(
+    uid: UUID,
+    status_service: StatusStreamService = Depends(StatusStreamService),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> StreamingResponse:
+    """Server-sent events with the delivery status of one notification"""
+    return await _status_stream("notification", uid, status_service, current_user)
+
+
+@dispatch_router.get("/broadcasts/{uid}/status/stream")
+async def stream_broadcast_status(
+    uid: UUID,
+    status_service: StatusStreamService = Depends(StatusStreamService),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> StreamingResponse:
+    """Server-sent events with queued/sent/retrying/failed counts of a broadcast"""
+    return await _status_stream("broadcast", uid, status_service, current_user)
@@ -0,0 +1,224 @@
+from datetime import datetime, time, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field, model_validator
+
+from src.channels.base import ChannelMessage
+
+
+class Lane(str, Enum):
+    """Priority lanes of the dispatch queue, highest priority first"""
+
+    TRANSACTIONAL = "transactional"
+    NORMAL = "normal"
+    BULK = "bulk"
+
+
+LANES = (Lane.TRANSACTIONAL, Lane.NORMAL, Lane.BULK)
+
+
+class CoalescedItem(BaseModel):
+    """A notification folded into a digest, which reports its status"""
+
+    uid: UUID
+    broadcast_uid: Optional[UUID] = None
+
+
+class DispatchItem(BaseModel):
+    """
+    A single message waiting in the dispatch queue. Items sharing their
+    content (a broadcast) leave body and subject empty and point to the
+    content in the payload store through payload_ref instead. A digest
+    lists the items coalesced into it in digest_of.
+    """
+
+    uid: UUID = Field(default_factory=uuid4)
+    channel: str
+    to: str
+    body: str
+    subject: Optional[str] = None
+    html: Optional[str] = None
+    recipient_uid: Optional[UUID] = None
+    owner_uid: Optional[UUID] = None
+    broadcast_uid: Optional[UUID] = None
+    priority: Lane = Lane.NORMAL
+    dedup_key: Optional[str] = None
+    digest: bool = False
+    attempts: int = 0
+    last_error: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    # resolved by the server from the owner's uploads, see attachment_metadata
+    attachments: List[Dict[str, Any]] = Field(default_factory=list)
+    payload_ref: Optional[str] = None
+    digest_of: List[CoalescedItem] = Field(default_factory=list)
+    # set on the status changes of a coalesced item, see Dispatcher
+    digest_uid: Optional[UUID] = None
+    enqueued_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def dump(self) -> str:
+        """Compact JSON for the queue, leaving out fields at their default"""
+        return self.model_dump_json(exclude_defaults=True)
+
+    def to_message(self) -> ChannelMessage:
+        return ChannelMessage(
+            channel=self.channel,
+            to=self.to,
+            body=self.body,
+            subject=self.subject,
+            html=self.html,
+            recipient_uid=self.recipient_uid,
+            metadata=self.metadata,
+            attachments=self.attachments,
+            uid=self.uid,
+        )
+
+
+class DeadLetter(BaseModel):
+    item: DispatchItem
+    error: Optional[str]
+    failed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class DeadLetterResponse(BaseModel):
+    uid: UUID
+    channel: str
+    to: str
+    attempts: int
+    error: Optional[str]
+    failed_at: datetime
+
+
+class DeadLetterReplaySchema(BaseModel):
+    uids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+    class Config:
+        extra = "forbid"
+
+
+class DeadLetterReplayResponse(BaseModel):
+    replayed: int
+
+
+# Metadata keys the server sets or used to read, never taken from a client
+RESERVED_METADATA_KEYS = frozenset(
+    {
+        "attachments",
+        "broadcast_uid",
+        "digest_of",
+        "from",
+        "html",
+        "smtp_host",
+        "smtp_port",
+    }
+)
+
+
+def _validate_content(schema):
+    if schema.attachments and schema.channel != "email":
+        raise ValueError("Attachments can only be sent by email")
+    if schema.html is not None and schema.channel != "email":
+        raise ValueError("html can only be sent by email")
+    reserved = sorted(RESERVED_METADATA_KEYS.intersection(schema.metadata))
+    if reserved:
+        raise ValueError(f"Reserved metadata keys: {', '.join(reserved)}")
+    return schema
+
+
+class NotificationSchema(BaseModel):
+    channel: str = Field(..., min_length=2, max_length=30, description="channel name")
+    recipient_uid: Optional[UUID] = Field(None, description="recipient to notify")
+    to: Optional[str] = Field(None, max_length=320, description="explicit address")
+    subject: Optional[str] = Field(None, max_length=500)
+    body: str = Field(..., min_length=1)
+    html: Optional[str] = Field(
+        None, description="HTML alternative of the body, email only"
+    )
+    dedup_key: Optional[str] = Field(
+        None,
+        max_length=200,
+        description="idempotency key, repeated sends with the same key are ignored",
+    )
+    priority: Lane = Field(
+        Lane.NORMAL, description="transactional, normal or bulk lane"
+    )
+    digest: bool = Field(
+        False, description="coalesce with the recipient's other notifications"
+    )
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    attachments: List[UUID] = Field(
+        default_factory=list, max_length=10, description="uploaded attachments"
+    )
+
+    @model_validator(mode="after")
+    def validate_destination(self):
+        if not self.recipient_uid and not self.to:
+            raise ValueError("Either recipient_uid or to is required")
+        return self
+
+    @model_validator(mode="after")
+    def validate_content(self):
+        return _validate_content(self)
+
+    class Config:
+        extra = "forbid"
+
+
+class NotificationBatchSchema(BaseModel):
+    notifications: List[NotificationSchema] = Field(..., min_length=1, max_length=1000)
+
+    class Config:
+        extra = "forbid"
+
+
+class BroadcastSchema(BaseModel):
+    channel: str = Field(..., min_length=2, max_length=30, description="channel name")
+    segment_uid: Optional[UUID] = Field(
+        None, description="only notify this segment's members"
+    )
+    subject: Optional[str] = Field(None, max_length=500)
+    body: str = Field(..., min_length=1)
+    html: Optional[str] = Field(
+        None, description="HTML alternative of the body, email only"
+    )
+    dedup_key: Optional[str] = Field(
+        None,
+        max_length=200,
+        description="idempotency key, repeated broadcasts with the same key are ignored",
+    )
+    priority: Lane = Field(Lane.BULK, description="transactional, normal or bulk lane")
+    digest: bool = Field(
+        False, description="coalesce with the recipient's other notifications"
+    )
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    attachments: List[UUID] = Field(
+        default_factory=list, max_length=10, description="uploaded attachments"
+    )
+    local_send_time: Optional[time] = Field(
+        None, description="deliver at this time of day in each recipient's timezone"
+    )
+    respect_quiet_hours: bool = Field(
+        False, description="hold back deliveries during recipients' quiet hours"
+    )
+
+    @model_validator(mode="after")
+    def validate_content(self):
+        return _validate_content(self)
+
+    class Config:
+        extra = "forbid"
+
+
+class BroadcastResponse(BaseModel):
+    broadcast_uid: UUID
+    duplicate: bool = False
+
+
+class NotificationBatchResponse(BaseModel):
+    accepted: List[UUID]
+    duplicates: List[str]
+    suppressed: List[UUID] = Field(
+        default_factory=list,
+        description="uids of notifications to suppressed addresses",
+    )
@@ -0,0 +1,473 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Union
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.attachment_module.service import AttachmentService
+from src.channels.registry import get_channel
+from src.core.config.env_data import Config
+from src.database.db import async_session
+from src.database.redis_client import get_binary_redis, get_redis
+from src.delivery_module.service import delivery_log_writer
+from src.recipient_module.models import Recipient
+from src.schedular.cron_job import BroadcastScheduler, FanoutCursor, ScheduledBroadcast
+from src.schedular.planner import QuietHours, SendTimePlanner
+from src.segment_module.models import Segment
+from src.suppression_module.service import suppression_filter
+from src.template_module.service import template_renderer
+
+from .coalesce import Coalescer
+from .dispatcher import Dispatcher
+from .fanout import CHANNEL_ADDRESS_FIELDS, AudienceFanout, audience_timezones
+from .idempotency import IdempotencyGuard
+from .payloads import PayloadCodec, PayloadStore
+from .queue import DispatchQueue
+from .retry import RetryPolicy, RetryScheduler
+from .schema import (
+    BroadcastResponse,
+    BroadcastSchema,
+    DeadLetter,
+    DeadLetterResponse,
+    DispatchItem,
+    NotificationBatchResponse,
+    NotificationBatchSchema,
+)
+from .sharding import ShardCoordinator, ShardedDispatchQueue, ShardWorker
+from .status import (
+    TERMINAL_STATUSES,
+    DeliveryStatus,
+    StatusPublisher,
+    StatusStreamHub,
+    status_topic,
+)
+
+logger = logging.getLogger(__name__)
+
+dispatch_queue: Union[DispatchQueue, ShardedDispatchQueue] = (
+    ShardedDispatchQueue(
+        get_redis(), Config.DISPATCH_SHARDS, weights=Config.DISPATCH_LANE_WEIGHTS
+    )
+    if Config.DISPATCH_SHARDS
+    else DispatchQueue(get_redis(), weights=Config.DISPATCH_LANE_WEIGHTS)
+)
+
+idempotency_guard = IdempotencyGuard(
+    get_redis(),
+    ttl=Config.IDEMPOTENCY_TTL,
+    local_cache_size=Config.IDEMPOTENCY_LOCAL_CACHE_SIZE,
+)
+
+retry_scheduler = RetryScheduler(
+    get_redis(),
+    dispatch_queue,
+    policy=RetryPolicy(
+        base_delay=Config.RETRY_BASE_DELAY,
+        max_delay=Config.RETRY_MAX_DELAY,
+        max_attempts=Config.RETRY_MAX_ATTEMPTS,
+        max_attempts_per_channel=Config.RETRY_MAX_ATTEMPTS_PER_CHANNEL,
+    ),
+)
+
+status_publisher = StatusPublisher(get_redis(), ttl=Config.STATUS_TTL)
+
+status_stream_hub = StatusStreamHub(get_redis(), interval=Config.STATUS_STREAM_INTERVAL)
+
+payload_store = (
+    PayloadStore(
+        get_binary_redis(),
+        ttl=Config.PAYLOAD_TTL,
+        codec=PayloadCodec(
+            Config.PAYLOAD_COMPRESSION, min_size=Config.PAYLOAD_COMPRESS_MIN_SIZE
+        ),
+        cache_size=Config.PAYLOAD_CACHE_SIZE,
+    )
+    if Config.PAYLOAD_STORE_ENABLED
+    else None
+)
+
+audience_fanout = AudienceFanout(
+    dispatch_queue,
+    chunk_size=Config.FANOUT_CHUNK_SIZE,
+    suppression=suppression_filter,
+    status_publisher=status_publisher,
+    payloads=payload_store,
+)
+
+
+async def fan_out(
+    broadcast: BroadcastSchema,
+    owner_uid: UUID,
+    broadcast_uid: UUID,
+    session: AsyncSession,
+    timezones: Optional[List[Optional[str]]] = None,
+    cursor: Optional[FanoutCursor] = None,
+) -> int:
+    """
+    Queue a broadcast's recipients, past the cursor's position when given.
+    Its attachments are looked up for the owner here, so items only carry
+    attachments the owner may send.
+    """
+    attachments = await AttachmentService().resolve_attachments(
+        broadcast.attachments, owner_uid, session
+    )
+    return await audience_fanout.fan_out(
+        broadcast,
+        owner_uid,
+        session,
+        broadcast_uid=broadcast_uid,
+        timezones=timezones,
+        attachments=attachments,
+        after=cursor.after if cursor is not None else None,
+        checkpoint=cursor.save if cursor is not None else None,
+    )
+
+
+async def schedule_broadcast(
+    broadcast: BroadcastSchema,
+    owner_uid: UUID,
+    broadcast_uid: UUID,
+    session: AsyncSession,
+) -> int:
+    """
+    Plan a broadcast by recipient timezone and hand its send buckets to
+    the broadcast scheduler, which fans each out when it is due.
+    Returns:
+        The number of recipients scheduled
+    """
+    planner = SendTimePlanner(
+        local_time=broadcast.local_send_time,
+        quiet_hours=(
+            QuietHours(Config.QUIET_HOURS_START, Config.QUIET_HOURS_END)
+            if broadcast.respect_quiet_hours
+            else None
+        ),
+        default_timezone=Config.DEFAULT_RECIPIENT_TIMEZONE,
+    )
+    timezones = await audience_timezones(
+        session, owner_uid, broadcast.channel, broadcast.segment_uid
+    )
+    buckets = planner.plan(timezones)
+    scheduled = await broadcast_scheduler.schedule(
+        broadcast, owner_uid, broadcast_uid, buckets
+    )
+    logger.info(
+        "Broadcast %s scheduled for %d recipients in %d send buckets",
+        broadcast_uid,
+        scheduled,
+        len(buckets),
+    )
+    return scheduled
+
+
+async def fan_out_scheduled(scheduled: ScheduledBroadcast, cursor: FanoutCursor) -> int:
+    """
+    Queue the recipients of a send bucket once it is due. A submitted
+    broadcast is fanned out whole, or first planned into send buckets when
+    it goes by the recipients' local time.
+    """
+    broadcast = scheduled.broadcast
+    async with async_session() as session:
+        if scheduled.timezones is None and (
+            broadcast.local_send_time is not None or broadcast.respect_quiet_hours
+        ):
+            return await schedule_broadcast(
+                broadcast, scheduled.owner_uid, scheduled.broadcast_uid, session
+            )
+        return await fan_out(
+            broadcast,
+            scheduled.owner_uid,
+            scheduled.broadcast_uid,
+            session,
+            timezones=scheduled.timezones,
+            cursor=cursor,
+        )
+
+
+broadcast_scheduler = BroadcastScheduler(get_redis(), fan_out=fan_out_scheduled)
+
+
+def _dead_letter_response(dead_letter: DeadLetter) -> DeadLetterResponse:
+    return DeadLetterResponse(
+        uid=dead_letter.item.uid,
+        channel=dead_letter.item.channel,
+        to=dead_letter.item.to,
+        attempts=dead_letter.item.attempts,
+        error=dead_letter.error,
+        failed_at=dead_letter.failed_at,
+    )
+
+
+class DeadLetterService:
+    async def retrieve_dead_letters(
+        self, owner_uid: UUID, offset: int = 0, limit: int = 100
+    ) -> List[DeadLetterResponse]:
+        dead_letters = await retry_scheduler.dead_letters.list(
+            offset, limit, owner_uid=owner_uid
+        )
+        return [_dead_letter_response(dead_letter) for dead_letter in dead_letters]
+
+    async def retrieve_dead_letter(
+        self, uid: UUID, owner_uid: UUID
+    ) -> Optional[DeadLetterResponse]:
+        dead_letter = await retry_scheduler.dead_letters.get(uid)
+        if not dead_letter or dead_letter.item.owner_uid != owner_uid:
+            return None
+        return _dead_letter_response(dead_letter)
+
+    async def replay_dead_letters(self, uids: List[UUID], owner_uid: UUID) -> int:
+        return await retry_scheduler.dead_letters.replay(
+            uids, dispatch_queue, owner_uid=owner_uid
+        )
+
+
+class DispatchService:
+    attachment_service = AttachmentService()
+
+    async def _recipients(
+        self, recipient_uids: List[UUID], owner_uid: UUID, session: AsyncSession
+    ) -> Dict[UUID, Recipient]:
+        if not recipient_uids:
+            return {}
+        statement = select(Recipient).where(
+            Recipient.uid.in_(recipient_uids), Recipient.created_by == owner_uid
+        )
+        result = await session.execute(statement)
+        return {recipient.uid: recipient for recipient in result.scalars().all()}
+
+    async def enqueue_notifications(
+        self,
+        notification_batch: NotificationBatchSchema,
+        owner_uid: UUID,
+        session: AsyncSession,
+    ) -> NotificationBatchResponse:
+        """
+        Queue a batch of notifications for delivery. Notifications to
+        suppressed addresses, or whose dedup key was already used by this
+        owner, are acknowledged but not queued.
+
+        Raises:
+            ValueError: If a recipient does not exist or has no address for the channel.
+        """
+        notifications = notification_batch.notifications
+        recipients = await self._recipients(
+            list({n.recipient_uid for n in notifications if n.recipient_uid}),
+            owner_uid,
+            session,
+        )
+        attachment_uids = list(
+            dict.fromkeys(uid for n in notifications for uid in n.attachments)
+        )
+        attachments = dict(
+            zip(
+                attachment_uids,
+                await self.attachment_service.resolve_attachments(
+                    attachment_uids, owner_uid, session
+                ),
+            )
+        )
+        items = []
+        for notification in notifications:
+            to = notification.to
+            if notification.recipient_uid:
+                recipient = recipients.get(notification.recipient_uid)
+                if not recipient:
+                    raise ValueError(
+                        f"Recipient {notification.recipient_uid} does not exist"
+                    )
+                address_field = CHANNEL_ADDRESS_FIELDS.get(notification.channel)
+                to = to or (
+                    getattr(recipient, address_field) if address_field else None
+                )
+            if not to:
+                raise ValueError(
+                    f"No {notification.channel} address for recipient {notification.recipient_uid}"
+                )
+            items.append(
+                DispatchItem(
+                    channel=notification.channel,
+                    to=to,
+                    body=notification.body,
+                    subject=notification.subject,
+                    html=notification.html,
+                    recipient_uid=notification.recipient_uid,
+                    owner_uid=owner_uid,
+                    priority=notification.priority,
+                    dedup_key=notification.dedup_key,
+                    digest=notification.digest,
+                    metadata=notification.metadata,
+                    attachments=[attachments[uid] for uid in notification.attachments],
+                )
+            )
+
+        suppressed = []
+        by_channel: Dict[str, List[DispatchItem]] = {}
+        for item in items:
+            by_channel.setdefault(item.channel, []).append(item)
+        for channel, channel_items in by_channel.items():
+            skip = await suppression_filter.suppressed(
+                owner_uid, channel, [item.to for item in channel_items]
+            )
+            suppressed.extend(item for item in channel_items if item.to in skip)
+        if suppressed:
+            suppressed_uids = {item.uid for item in suppressed}
+            items = [item for item in items if item.uid not in suppressed_uids]
+
+        keyed = [item for item in items if item.dedup_key]
+        keys = [IdempotencyGuard.key(str(owner_uid), item.dedup_key) for item in keyed]
+        claims = await idempotency_guard.claim(keys)
+        claimed_keys = [key for key, claimed in zip(keys, claims) if claimed]
+        duplicate_uids = {
+            item.uid for item, claimed in zip(keyed, claims) if not claimed
+        }
+        accepted = [item for item in items if item.uid not in duplicate_uids]
+        duplicates = [item.dedup_key for item in keyed if item.uid in duplicate_uids]
+        try:
+            await status_publisher.publish(
+                [(item, DeliveryStatus.QUEUED) for item in accepted]
+            )
+            await dispatch_queue.enqueue(accepted)
+        except Exception:
+            await idempotency_guard.release(claimed_keys)
+            raise
+        return NotificationBatchResponse(
+            accepted=[item.uid for item in accepted],
+            duplicates=duplicates,
+            suppressed=[item.uid for item in suppressed],
+        )
+
+    @staticmethod
+    def _broadcast_dedup_key(owner_uid: UUID, dedup_key: str) -> str:
+        # apart from notification keys, which don't hold a broadcast uid
+        return IdempotencyGuard.key(f"{owner_uid}:broadcast", dedup_key)
+
+    async def claim_broadcast(
+        self, broadcast: BroadcastSchema, owner_uid: UUID, session: AsyncSession
+    ) -> BroadcastResponse:
+        """
+        Allocate a broadcast uid, or flag a repeat of an earlier dedup key
+        with the uid of the original broadcast. The broadcast's attachments
+        are checked here and looked up again when it is fanned out.
+
+        Raises:
+            ValueError: If the target segment or an attachment does not exist.
+        """
+        if broadcast.segment_uid:
+            segment = await session.get(Segment, broadcast.segment_uid)
+            if not segment or segment.created_by != owner_uid:
+                raise ValueError(f"Segment {broadcast.segment_uid} does not exist")
+        await self.attachment_service.resolve_attachments(
+            broadcast.attachments, owner_uid, session
+        )
+        response = BroadcastResponse(broadcast_uid=uuid4())
+        if broadcast.dedup_key:
+            original = await idempotency_guard.claim_value(
+                self._broadcast_dedup_key(owner_uid, broadcast.dedup_key),
+                str(response.broadcast_uid),
+            )
+            if original is not None:
+                return BroadcastResponse(broadcast_uid=original, duplicate=True)
+        await status_publisher.open_broadcast(response.broadcast_uid, owner_uid)
+        return response
+
+    async def submit_broadcast(
+        self, broadcast: BroadcastSchema, owner_uid: UUID, broadcast_uid: UUID
+    ):
+        """
+        Hand a claimed broadcast to the workers, which fan it out to all of
+        the owner's recipients or schedule it by their local time. The job
+        is kept in Redis until it is done, so it survives restarts. When it
+        can't be submitted, the broadcast's dedup key is released so the
+        client can send the broadcast again.
+        """
+        try:
+            await broadcast_scheduler.submit(broadcast, owner_uid, broadcast_uid)
+        except Exception:
+            logger.exception("Submitting broadcast %s failed", broadcast_uid)
+            if broadcast.dedup_key:
+                await idempotency_guard.release(
+                    [self._broadcast_dedup_key(owner_uid, broadcast.dedup_key)]
+                )
+            raise
+
+
+class StatusStreamService:
+    async def status_events(
+        self, kind: str, uid: UUID, owner_uid: UUID
+    ) -> Optional[AsyncIterator[str]]:
+        """
+        Server-sent events with the delivery status of a notification or a
+        broadcast, None when it is unknown or not the owner's. A notification
+        stream ends once it is sent or failed; broadcast streams run until the
+        client leaves.
+        """
+        topic = status_topic(kind, uid)
+        snapshot = await status_stream_hub.snapshot(topic)
+        if not snapshot or snapshot.get("owner_uid") != str(owner_uid):
+            return None
+
+        async def events() -> AsyncIterator[str]:
+            async with status_stream_hub.listen(topic) as listener:
+                while True:
+                    try:
+                        state = await asyncio.wait_for(
+                            listener.get(), Config.STATUS_STREAM_HEARTBEAT
+                        )
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+                        continue
+                    state = {k: v for k, v in state.items() if k != "owner_uid"}
+                    yield f"event: status\ndata: {json.dumps(state)}\n\n"
+                    if state.get("status") in TERMINAL_STATUSES:
+                        return
+
+        return events()
+
+
+def build_coalescer() -> Coalescer:
+    """Digest coalescer feeding merged digests back into the dispatch queue"""
+    return Coalescer(
+        flush=dispatch_queue.enqueue,
+        renderer=template_renderer,
+        window=Config.DIGEST_WINDOW,
+        max_items=Config.DIGEST_MAX_ITEMS,
+        max_buffered_items=Config.DIGEST_MAX_BUFFERED_ITEMS,
+        redis=get_redis(),
+    )
+
+
+def build_dispatcher() -> Dispatcher:
+    return Dispatcher(
+        queue=dispatch_queue,
+        retry_scheduler=retry_scheduler,
+        get_channel=get_channel,
+        coalescer=build_coalescer(),
+        status_publisher=status_publisher,
+        delivery_log=delivery_log_writer,
+        payloads=payload_store,
+    )
+
+
+def build_shard_worker(worker_id: str) -> ShardWorker:
+    """
+    Consumer of the dispatch queue shards worker_id is assigned, for
+    DISPATCH_SHARDS > 0.
+    """
+    if not isinstance(dispatch_queue, ShardedDispatchQueue):
+        raise ValueError("The dispatch queue is not sharded, set DISPATCH_SHARDS")
+    return ShardWorker(
+        build_dispatcher(),
+        dispatch_queue,
+        ShardCoordinator(
+            get_redis(),
+            worker_id,
+            Config.DISPATCH_SHARDS,
+            ttl=Config.DISPATCH_SHARD_LEASE_TTL,
+            vnodes=Config.DISPATCH_SHARD_VNODES,
+        ),
+        batch_size=Config.DISPATCH_BATCH_SIZE,
+        rebalance_interval=Config.DISPATCH_SHARD_REBALANCE_INTERVAL,
+    )
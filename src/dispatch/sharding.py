@@ -0,0 +1,478 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import time
+from collections import defaultdict, deque
+from hashlib import blake2b
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from .dispatcher import Dispatcher
+from .queue import DispatchQueue
+from .schema import LANES, DispatchItem, Lane
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_SHARD_KEY = "dispatch:shard"
+
+# Extend the leases in KEYS still held by ARGV[1] to ARGV[2] ms; 1 per lease
+# still held, 0 per lease lost
+RENEW_LEASES_SCRIPT = """
+local held = {}
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('PEXPIRE', key, ARGV[2])
+        held[i] = 1
+    else
+        held[i] = 0
+    end
+end
+return held
+"""
+
+# Push ARGV[#KEYS + 1 ..] back onto the lanes KEYS[2 ..], ARGV[i] of them
+# onto KEYS[i], only while the lease KEYS[1] is still held by ARGV[1];
+# 1 when pushed, 0 when the lease is lost
+REQUEUE_IF_HELD_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local at = #KEYS + 1
+for i = 2, #KEYS do
+    local count = tonumber(ARGV[i])
+    for j = at, at + count - 1 do
+        redis.call('RPUSH', KEYS[i], ARGV[j])
+    end
+    at = at + count
+end
+return 1
+"""
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _hash(value: str) -> int:
+    # stable across processes and hosts, unlike hash()
+    return int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def ordering_key(item: DispatchItem) -> str:
+    """Items with the same key are delivered in the order they were queued"""
+    return str(item.recipient_uid or item.to)
+
+
+def shard_for(key: str, shards: int) -> int:
+    return _hash(key) % shards
+
+
+class ShardedDispatchQueue:
+    """
+    Dispatch queue split into shards by recipient, each shard a DispatchQueue
+    with its own lanes. All notifications of a recipient land on the same
+    shard, and each shard has a single consumer, so they go out in order.
+    The number of shards must stay the same while items are queued.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        shards: int,
+        prefix: str = DISPATCH_SHARD_KEY,
+        weights: Optional[Dict[Lane, float]] = None,
+    ):
+        self.redis = redis
+        self.shards = [
+            DispatchQueue(redis, prefix=f"{prefix}:{shard}", weights=weights)
+            for shard in range(shards)
+        ]
+
+    def shard_of(self, item: DispatchItem) -> int:
+        return shard_for(ordering_key(item), len(self.shards))
+
+    def shard(self, shard: int) -> DispatchQueue:
+        return self.shards[shard]
+
+    def key_for(self, item: DispatchItem) -> str:
+        return self.shards[self.shard_of(item)].key_for(item)
+
+    async def enqueue(self, items: Sequence[DispatchItem]) -> int:
+        if not items:
+            return 0
+        by_key: Dict[str, List[str]] = defaultdict(list)
+        for item in items:
+            by_key[self.key_for(item)].append(item.dump())
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, payloads in by_key.items():
+                pipe.lpush(key, *payloads)
+            await pipe.execute()
+        return len(items)
+
+    async def depths(self) -> Dict[Lane, int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for queue in self.shards:
+                for lane in LANES:
+                    pipe.llen(queue.key(lane))
+            results = await pipe.execute()
+        depths = {lane: 0 for lane in LANES}
+        for i, depth in enumerate(results):
+            depths[LANES[i % len(LANES)]] += depth
+        return depths
+
+    async def depth(self) -> int:
+        return sum((await self.depths()).values())
+
+
+class ShardRing:
+    """
+    Consistent hash ring of workers, vnodes points per worker. A worker
+    joining or leaving moves only the shards next to its points, about
+    1/len(workers) of them, instead of reshuffling every shard.
+    """
+
+    def __init__(self, workers: Iterable[str], vnodes: int = 64):
+        points = sorted(
+            (_hash(f"{worker}#{vnode}"), worker)
+            for worker in workers
+            for vnode in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._workers = [worker for _, worker in points]
+
+    def owner(self, shard: int) -> Optional[str]:
+        if not self._workers:
+            return None
+        i = bisect.bisect(self._hashes, _hash(f"shard:{shard}"))
+        return self._workers[i % len(self._workers)]
+
+
+class ShardCoordinator:
+    """
+    Shard ownership through Redis. Workers heartbeat into a ZSET scored by
+    time, and those seen within ttl make up the ring that assigns shards.
+    A worker only consumes a shard while it holds the shard's lease, so
+    during a rebalance the new owner waits for the old one to drain and
+    release it, and a crashed worker's shards free up once its leases
+    expire. The lease holds the worker id, which fences requeues: items
+    only go back to the head of a shard while its lease is still held.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        worker_id: str,
+        shards: int,
+        ttl: float = 15.0,
+        vnodes: int = 64,
+        prefix: str = DISPATCH_SHARD_KEY,
+    ):
+        self.redis = redis
+        self.worker_id = worker_id
+        self.shards = shards
+        self.ttl = ttl
+        self.vnodes = vnodes
+        self.workers_key = f"{prefix}:workers"
+        self.lease_prefix = f"{prefix}:lease"
+        self._renew = redis.register_script(RENEW_LEASES_SCRIPT)
+        self._release = redis.register_script(RELEASE_LEASE_SCRIPT)
+        self._requeue = redis.register_script(REQUEUE_IF_HELD_SCRIPT)
+
+    def lease_key(self, shard: int) -> str:
+        return f"{self.lease_prefix}:{shard}"
+
+    async def heartbeat(self) -> List[str]:
+        """Announce this worker; returns the live workers"""
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(self.workers_key, {self.worker_id: now})
+            pipe.zremrangebyscore(self.workers_key, "-inf", now - self.ttl)
+            pipe.zrange(self.workers_key, 0, -1)
+            *_, workers = await pipe.execute()
+        return workers
+
+    async def assignment(self) -> Set[int]:
+        """Heartbeat, then the shards the ring gives this worker"""
+        ring = ShardRing(await self.heartbeat(), self.vnodes)
+        return {
+            shard for shard in range(self.shards) if ring.owner(shard) == self.worker_id
+        }
+
+    async def acquire(self, shard: int) -> bool:
+        return bool(
+            await self.redis.set(
+                self.lease_key(shard), self.worker_id, nx=True, px=int(self.ttl * 1000)
+            )
+        )
+
+    async def renew(self, shards: Sequence[int]) -> Set[int]:
+        """Extend the leases of shards; returns those still held"""
+        shards = list(shards)
+        if not shards:
+            return set()
+        held = await self._renew(
+            keys=[self.lease_key(shard) for shard in shards],
+            args=[self.worker_id, int(self.ttl * 1000)],
+        )
+        return {shard for shard, still_held in zip(shards, held) if still_held}
+
+    async def requeue(
+        self, shard: int, queue: DispatchQueue, items: Sequence[DispatchItem]
+    ) -> bool:
+        """
+        Put items back at the head of the shard's lanes, to be popped in the
+        given order, as long as this worker still holds the shard's lease.
+        Returns:
+            False when the lease is lost and nothing was pushed
+        """
+        by_lane: Dict[str, List[str]] = {}
+        for item in items:
+            by_lane.setdefault(queue.key_for(item), []).append(item.dump())
+        # items are popped from the right end
+        payloads = [payload for lane in by_lane.values() for payload in reversed(lane)]
+        return bool(
+            await self._requeue(
+                keys=[self.lease_key(shard), *by_lane],
+                args=[
+                    self.worker_id,
+                    *(len(lane) for lane in by_lane.values()),
+                    *payloads,
+                ],
+            )
+        )
+
+    async def release(self, shard: int):
+        await self._release(keys=[self.lease_key(shard)], args=[self.worker_id])
+
+    async def leave(self):
+        await self.redis.zrem(self.workers_key, self.worker_id)
+
+
+class ShardConsumer:
+    """
+    The single consumer of a shard, delivering each recipient's items in
+    queue order. A batch goes out in waves: the first item of every
+    recipient, then the second, and so on. A retryable failure holds the
+    recipient back in memory, together with every later item of theirs,
+    until the retry is due, instead of going through the retry scheduler
+    where later items could overtake it. Held items go back to the head of
+    the shard when the consumer stops, so the next owner resumes in order;
+    so do the items of a batch not yet sent when processing it fails.
+
+    With a coordinator, those requeues are fenced by the shard's lease: once
+    it is lost another worker may be consuming the shard, and the items go
+    to the tail instead of in front of what that worker has not sent yet.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        queue: DispatchQueue,
+        coordinator: Optional[ShardCoordinator] = None,
+        shard: Optional[int] = None,
+    ):
+        self.dispatcher = dispatcher
+        self.queue = queue
+        self.coordinator = coordinator
+        self.shard = shard
+        self.held: Dict[str, Deque[DispatchItem]] = {}
+        self._due: List[Tuple[float, str]] = []
+        # items of the current batch neither sent nor held yet, in queue order
+        self.unsent: Dict[UUID, DispatchItem] = {}
+
+    @property
+    def held_items(self) -> int:
+        return sum(len(items) for items in self.held.values())
+
+    def _hold(self, item: DispatchItem, due: float):
+        key = ordering_key(item)
+        self.held[key] = deque([item])
+        heapq.heappush(self._due, (due, key))
+
+    def _release_due(self) -> List[DispatchItem]:
+        now = time.monotonic()
+        items: List[DispatchItem] = []
+        while self._due and self._due[0][0] <= now:
+            _, key = heapq.heappop(self._due)
+            items.extend(self.held.pop(key, ()))
+        return items
+
+    async def requeue(self, items: Sequence[DispatchItem]):
+        if not items:
+            return
+        if self.coordinator is None:
+            await self.queue.requeue(items)
+        elif not await self.coordinator.requeue(self.shard, self.queue, items):
+            logger.warning(
+                "Lost the lease of shard %s, %d items go to its tail",
+                self.shard,
+                len(items),
+            )
+            await self.queue.enqueue(items)
+
+    async def process(self, items: Sequence[DispatchItem]):
+        policy = self.dispatcher.retry_scheduler.policy
+        self.unsent = {item.uid: item for item in items}
+        waves: List[List[DispatchItem]] = []
+        seen: Dict[str, int] = defaultdict(int)
+        for item in items:
+            key = ordering_key(item)
+            if seen[key] == len(waves):
+                waves.append([])
+            waves[seen[key]].append(item)
+            seen[key] += 1
+
+        for wave in waves:
+            ready = []
+            for item in wave:
+                held = self.held.get(ordering_key(item))
+                if held is not None:
+                    held.append(item)
+                    self.unsent.pop(item.uid, None)
+                else:
+                    ready.append(item)
+            if not ready:
+                continue
+            outcome = await self.dispatcher.send(ready)
+            for item in ready:
+                self.unsent.pop(item.uid, None)
+            now = time.monotonic()
+            for item, error in zip(outcome.retry, outcome.retry_errors):
+                item.attempts += 1
+                item.last_error = error
+                if item.attempts >= policy.attempts_for(item.channel):
+                    outcome.dead.append(item)
+                    outcome.dead_errors.append(error)
+                else:
+                    self._hold(item, now + policy.delay(item.attempts))
+                    outcome.held.append(item)
+            outcome.retry, outcome.retry_errors = [], []
+            await self.dispatcher.record(outcome)
+
+    async def run(self, stop: asyncio.Event, batch_size: int = 100):
+        """Process batches until stop is set, then hand held items back"""
+        try:
+            while not stop.is_set():
+                items = self._release_due()
+                # don't block past the next held recipient's retry
+                timeout = 1.0
+                if self._due:
+                    timeout = min(max(self._due[0][0] - time.monotonic(), 0.01), 1.0)
+                items.extend(await self.queue.dequeue(batch_size, timeout=timeout))
+                if not items:
+                    continue
+                try:
+                    await self.process(items)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception("Dispatch of %d items failed", len(items))
+                    # what wasn't sent goes back to the head, still in order
+                    unsent, self.unsent = list(self.unsent.values()), {}
+                    await self.requeue(unsent)
+                    await asyncio.sleep(1.0)
+        finally:
+            held = [item for items in self.held.values() for item in items]
+            self.held.clear()
+            self._due = []
+            await self.requeue(held)
+
+
+class ShardWorker:
+    """
+    Runs one ShardConsumer per shard this worker owns, adjusting every
+    rebalance_interval seconds as workers join and leave. A shard moving
+    away is drained (its current batch finished, held items requeued)
+    before its lease is released to the new owner.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        queue: ShardedDispatchQueue,
+        coordinator: ShardCoordinator,
+        batch_size: int = 100,
+        rebalance_interval: float = 2.0,
+    ):
+        self.dispatcher = dispatcher
+        self.queue = queue
+        self.coordinator = coordinator
+        self.batch_size = batch_size
+        self.rebalance_interval = rebalance_interval
+        self.consumers: Dict[int, Tuple[asyncio.Task, asyncio.Event]] = {}
+        self.handovers: Dict[int, asyncio.Task] = {}
+
+    def _start(self, shard: int):
+        stop = asyncio.Event()
+        consumer = ShardConsumer(
+            self.dispatcher, self.queue.shard(shard), self.coordinator, shard
+        )
+        task = asyncio.create_task(consumer.run(stop, self.batch_size))
+        self.consumers[shard] = (task, stop)
+
+    async def _hand_over(self, shard: int, task: asyncio.Task, release: bool):
+        try:
+            await task
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Consumer of shard %d failed", shard)
+        if release:
+            await self.coordinator.release(shard)
+
+    def _stop(self, shard: int, release: bool = True):
+        task, stop = self.consumers.pop(shard)
+        stop.set()
+        self.handovers[shard] = asyncio.create_task(
+            self._hand_over(shard, task, release)
+        )
+        self.handovers[shard].add_done_callback(
+            lambda _: self.handovers.pop(shard, None)
+        )
+
+    async def rebalance(self):
+        assigned = await self.coordinator.assignment()
+        held = await self.coordinator.renew([*self.consumers, *self.handovers])
+        for shard in list(self.consumers):
+            if shard not in held:
+                logger.warning("Lost the lease of shard %d", shard)
+                self._stop(shard, release=False)
+            elif shard not in assigned or self.consumers[shard][0].done():
+                self._stop(shard)
+        for shard in sorted(assigned - self.consumers.keys() - self.handovers.keys()):
+            if await self.coordinator.acquire(shard):
+                self._start(shard)
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        """
+        Consume owned shards until cancelled or stop is set, then drain them
+        and leave the ring. The delivery log buffer is flushed alongside and
+        drained last.
+        """
+        stop = stop or asyncio.Event()
+        flusher = None
+        if self.dispatcher.delivery_log is not None:
+            flusher = asyncio.create_task(self.dispatcher.delivery_log.run())
+        try:
+            while not stop.is_set():
+                try:
+                    await self.rebalance()
+                except aioredis.RedisError:
+                    logger.exception("Shard rebalance failed")
+                try:
+                    await asyncio.wait_for(stop.wait(), self.rebalance_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for shard in list(self.consumers):
+                self._stop(shard)
+            await asyncio.gather(*self.handovers.values(), return_exceptions=True)
+            try:
+                await self.coordinator.leave()
+            except aioredis.RedisError:
+                logger.exception("Leaving the shard ring failed")
+            if flusher is not None:
+                flusher.cancel()
+                await asyncio.gather(flusher, return_exceptions=True)
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Sequence, Set, Tuple
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from .schema import DispatchItem
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY_PREFIX = "dispatch:status"
+
+# Add the per-status deltas in ARGV[3..] to a broadcast's counters and
+# publish the new totals, atomically, so the last message a subscriber sees
+# always carries the latest counts. The owner in ARGV[2] is only given when
+# the broadcast is opened, and never replaces the one already there.
+BROADCAST_STATUS_SCRIPT = """
+for i = 3, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+if ARGV[2] ~= '' then
+    redis.call('HSETNX', KEYS[1], 'owner_uid', ARGV[2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+local flat = redis.call('HGETALL', KEYS[1])
+local state = {}
+for i = 1, #flat, 2 do
+    state[flat[i]] = flat[i + 1]
+end
+redis.call('PUBLISH', KEYS[1], cjson.encode(state))
+return #flat
+"""
+
+
+class DeliveryStatus(str, Enum):
+    QUEUED = "queued"
+    SENT = "sent"
+    RETRYING = "retrying"
+    FAILED = "failed"
+
+
+TERMINAL_STATUSES = {DeliveryStatus.SENT.value, DeliveryStatus.FAILED.value}
+
+
+def status_topic(kind: str, uid: UUID) -> str:
+    """Redis key of the status hash, also the pub/sub channel of its updates"""
+    return f"{STATUS_KEY_PREFIX}:{kind}:{uid}"
+
+
+def decode_state(raw: Dict[str, str]) -> Dict[str, Any]:
+    state: Dict[str, Any] = dict(raw)
+    for status in DeliveryStatus:
+        if status.value in state and str(state[status.value]).lstrip("-").isdigit():
+            state[status.value] = int(state[status.value])
+    return state
+
+
+class StatusPublisher:
+    """
+    Publishes delivery status changes from the dispatch pipeline. Single
+    notifications get their latest status; broadcasts get running counts per
+    status, one update per broadcast per batch rather than per message.
+    Publishing is best effort and never fails a dispatch.
+    """
+
+    def __init__(self, redis: aioredis.Redis, ttl: int = 86400):
+        self.redis = redis
+        self.ttl = ttl
+        self._broadcast_status = redis.register_script(BROADCAST_STATUS_SCRIPT)
+
+    async def open_broadcast(self, broadcast_uid: UUID, owner_uid: UUID):
+        """Create the status of a broadcast so it can be watched before fan-out"""
+        try:
+            await self._broadcast_status(
+                keys=[status_topic("broadcast", broadcast_uid)],
+                args=[self.ttl, str(owner_uid)],
+            )
+        except aioredis.RedisError:
+            logger.exception("Opening status of broadcast %s failed", broadcast_uid)
+
+    async def publish(self, changes: Sequence[Tuple[DispatchItem, DeliveryStatus]]):
+        if not changes:
+            return
+        broadcasts: Dict[UUID, Counter] = {}
+        notifications = []
+        for item, status in changes:
+            broadcast_uid = item.broadcast_uid
+            if broadcast_uid:
+                broadcasts.setdefault(broadcast_uid, Counter())[status.value] += 1
+            else:
+                notifications.append((item, status))
+        try:
+            for broadcast_uid, counts in broadcasts.items():
+                args: List[Any] = [self.ttl, ""]
+                for status, count in counts.items():
+                    args.extend([status, count])
+                await self._broadcast_status(
+                    keys=[status_topic("broadcast", broadcast_uid)], args=args
+                )
+            if notifications:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for item, status in notifications:
+                        topic = status_topic("notification", item.uid)
+                        state = {
+                            "status": status.value,
+                            "owner_uid": str(item.owner_uid or ""),
+                            "channel": item.channel,
+                            "attempts": item.attempts,
+                            "error": item.last_error or "",
+                            "digest_uid": str(item.digest_uid or ""),
+                        }
+                        pipe.hset(topic, mapping=state)
+                        pipe.expire(topic, self.ttl)
+                        pipe.publish(topic, json.dumps(state))
+                    await pipe.execute()
+        except aioredis.RedisError:
+            logger.exception("Publishing %d status changes failed", len(changes))
+
+
+class StatusListener:
+    """Holds only the newest state, so a slow reader skips to the latest"""
+
+    def __init__(self):
+        self._latest: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=1)
+
+    def offer(self, state: Dict[str, Any]):
+        if self._latest.full():
+            self._latest.get_nowait()
+        self._latest.put_nowait(state)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self._latest.get()
+
+
+class StatusStreamHub:
+    """
+    Status streams of this process. A topic is subscribed once however many
+    dashboards watch it; updates arriving in between are coalesced and
+    listeners get at most one state per topic every interval seconds.
+    """
+
+    def __init__(self, redis: aioredis.Redis, interval: float = 1.0):
+        self.redis = redis
+        self.interval = interval
+        self.listeners: Dict[str, Set[StatusListener]] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._pubsub = None
+        self._tasks: List[asyncio.Task] = []
+        self._lock = asyncio.Lock()
+        self._stopping = False
+
+    async def snapshot(self, topic: str) -> Dict[str, Any]:
+        return decode_state(await self.redis.hgetall(topic))
+
+    @asynccontextmanager
+    async def listen(self, topic: str) -> AsyncIterator[StatusListener]:
+        listener = StatusListener()
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            listeners = self.listeners.setdefault(topic, set())
+            listeners.add(listener)
+            if len(listeners) == 1:
+                # subscribe before reading the snapshot so no update is missed
+                await self._pubsub.subscribe(topic)
+                self._latest[topic] = await self.snapshot(topic)
+            if not self._tasks:
+                self._tasks = [
+                    asyncio.create_task(self._read()),
+                    asyncio.create_task(self._flush()),
+                ]
+        if self._latest.get(topic):
+            listener.offer(self._latest[topic])
+        try:
+            yield listener
+        finally:
+            async with self._lock:
+                listeners.discard(listener)
+                if not listeners:
+                    del self.listeners[topic]
+                    self._latest.pop(topic, None)
+                    self._dirty.discard(topic)
+                    if self._pubsub is not None:
+                        await self._pubsub.unsubscribe(topic)
+
+    async def _read(self):
+        # redis-py can swallow a cancel that lands mid-read, so the loop
+        # also checks the flag
+        while not self._stopping:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Status pub/sub read failed")
+                await asyncio.sleep(1.0)
+                continue
+            if message and message["type"] == "message":
+                topic = message["channel"]
+                if topic in self.listeners:
+                    self._latest[topic] = decode_state(json.loads(message["data"]))
+                    self._dirty.add(topic)
+
+    async def _flush(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            dirty, self._dirty = self._dirty, set()
+            for topic in dirty:
+                state = self._latest.get(topic)
+                for listener in self.listeners.get(topic, ()):
+                    listener.offer(state)
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
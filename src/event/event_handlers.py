@@ -1 +1,22 @@
-def new_event(): ...
+import logging
+from typing import List
+
+from src.core.event.bus import EventBus
+from src.core.event.events import RecipientCreated, UserCreated
+
+logger = logging.getLogger(__name__)
+
+
+async def log_user_created(events: List[UserCreated]):
+    for event in events:
+        logger.info("User %s created", event.user_uid)
+
+
+async def log_recipient_created(events: List[RecipientCreated]):
+    logger.info("%d recipients created", len(events))
+
+
+def register_event_handlers(bus: EventBus):
+    """Subscribe the application's event handlers to the bus"""
+    bus.subscribe(UserCreated, log_user_created)
+    bus.subscribe(RecipientCreated, log_recipient_created)
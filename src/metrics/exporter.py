@@ -0,0 +1,92 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .exposition import Snapshot, merge, render
+from .registry import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsExporter:
+    """
+    Metrics of several processes (uvicorn workers, the prefork dispatch
+    workers): each process writes a snapshot of its registry to directory
+    every interval seconds, one file per process start, and whichever
+    process serves /metrics adds the others' files to its own live values.
+    Files of exited processes stay, so their counts are kept; clear the
+    directory on deploys. Without a directory only the serving process is
+    reported.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        directory: Optional[str] = None,
+        interval: float = 5.0,
+    ):
+        self.registry = registry
+        self.directory = Path(directory) if directory else None
+        self.interval = interval
+        self.path: Optional[Path] = None
+
+    def _write(self, path: Path, data: str):
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(data)
+        os.replace(temporary, path)
+
+    def _dump(self) -> str:
+        return json.dumps({"pid": os.getpid(), "metrics": self.registry.snapshot()})
+
+    async def run(self):
+        """Write this process' snapshot every interval, and once more when cancelled"""
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{os.getpid()}-{time.time_ns()}.json"
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await asyncio.to_thread(self._write, self.path, self._dump())
+                except OSError:
+                    logger.exception("Writing metrics to %s failed", self.path)
+        finally:
+            try:
+                self._write(self.path, self._dump())
+            except OSError:
+                logger.exception("Writing metrics to %s failed", self.path)
+
+    def _read_others(self) -> List[Tuple[Snapshot, bool]]:
+        snapshots = []
+        if self.directory is None or not self.directory.is_dir():
+            return snapshots
+        for path in self.directory.glob("*.json"):
+            if path == self.path:
+                continue
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # removed or being replaced, it is read again next scrape
+                continue
+            snapshots.append((data["metrics"], _alive(data["pid"])))
+        return snapshots
+
+    async def render(self) -> str:
+        """All processes' metrics in the Prometheus text format"""
+        others = await asyncio.to_thread(self._read_others)
+        return render(merge(self.registry.snapshot(), others))
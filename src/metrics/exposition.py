@@ -0,0 +1,89 @@
+import math
+from typing import Any, Dict, Iterable, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Snapshot = Dict[str, Dict[str, Any]]
+
+
+def merge(own: Snapshot, others: Iterable[Tuple[Snapshot, bool]]) -> Snapshot:
+    """
+    Add up the snapshots of the serving process (own) and of the other
+    processes, each given with whether it is still alive. Counters and
+    histograms keep the counts of exited processes so they never go down;
+    gauges only count live processes, and "scraper" gauges only own.
+    """
+    merged: Snapshot = {}
+    for snapshot, live, is_own in [
+        (own, True, True),
+        *((snapshot, live, False) for snapshot, live in others),
+    ]:
+        for name, family in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {**family, "samples": {}}
+            if family["type"] != target["type"]:
+                continue
+            if family["type"] == "gauge" and not (
+                is_own or (live and family.get("aggregate") == "sum")
+            ):
+                continue
+            histogram = family["type"] == "histogram"
+            if histogram and family["buckets"] != target["buckets"]:
+                # the layout changed across a deploy, keep the first one seen
+                continue
+            samples = target["samples"]
+            for labels, value in family["samples"]:
+                key = tuple(labels)
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = [list(value[0]), value[1]] if histogram else value
+                elif histogram:
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                else:
+                    samples[key] = current + value
+    return merged
+
+
+def _value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render(merged: Snapshot) -> str:
+    """The Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for name, family in sorted(merged.items()):
+        help_text = family["help"].replace("\\", r"\\").replace("\n", r"\n")
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        names = family["labelnames"]
+        for labels, value in sorted(family["samples"].items()):
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_labels(names, labels)} {_value(value)}")
+                continue
+            counts, total = value
+            cumulative = 0
+            for bound, count in zip([*family["buckets"], math.inf], counts):
+                cumulative += count
+                lines.append(
+                    f"{name}_bucket{_labels(names, labels, le=_value(bound))} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_labels(names, labels)} {_value(total)}")
+            lines.append(f"{name}_count{_labels(names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
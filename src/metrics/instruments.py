@@ -0,0 +1,146 @@
+import time
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.event.bus import event_bus
+
+from .registry import metrics_registry
+
+# HTTP
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, by route template",
+    ["method", "route", "status"],
+)
+http_requests_in_flight = metrics_registry.gauge(
+    "http_requests_in_flight", "HTTP requests being served"
+)
+
+# SQLAlchemy connection pool
+db_pool_checkout_wait = metrics_registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, connecting included",
+)
+db_pool_checkout_timeouts = metrics_registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up waiting for the pool"
+)
+db_pool_connection_held = metrics_registry.histogram(
+    "db_pool_connection_held_seconds", "Time connections stay checked out"
+)
+db_pool_checked_out = metrics_registry.gauge(
+    "db_pool_checked_out", "Connections checked out of the pool"
+)
+db_pool_connections_created = metrics_registry.counter(
+    "db_pool_connections_created_total", "Database connections opened"
+)
+
+# Redis
+redis_call_duration = metrics_registry.histogram(
+    "redis_call_duration_seconds", "Latency of Redis calls", ["call"]
+)
+
+# Queues: the Redis backed ones are shared, read by the process serving /metrics
+dispatch_queue_depth = metrics_registry.gauge(
+    "dispatch_queue_depth",
+    "Notifications waiting in the dispatch queue",
+    ["lane"],
+    "scraper",
+)
+dispatch_retry_depth = metrics_registry.gauge(
+    "dispatch_retry_depth", "Notifications waiting for a retry", ["lane"], "scraper"
+)
+dispatch_dead_letters = metrics_registry.gauge(
+    "dispatch_dead_letters",
+    "Notifications in the dead letter store",
+    aggregate="scraper",
+)
+scheduled_broadcast_buckets = metrics_registry.gauge(
+    "scheduled_broadcast_buckets",
+    "Broadcast send buckets waiting for their send time",
+    aggregate="scraper",
+)
+event_bus_queue_depth = metrics_registry.gauge(
+    "event_bus_queue_depth", "Events waiting for a subscriber", ["subscription"]
+)
+
+
+@metrics_registry.add_collector
+def _event_bus_depths():
+    for name, stats in event_bus.stats().items():
+        event_bus_queue_depth.labels(name).set(stats["queued"])
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """The async engine's pool, timing how long checkouts wait"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            db_pool_checkout_timeouts.inc()
+            raise
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine):
+    """Count connections and time how long they are held, from pool events"""
+
+    @sa_event.listens_for(engine, "connect")
+    def _connect(_dbapi_connection, _connection_record):
+        db_pool_connections_created.inc()
+
+    @sa_event.listens_for(engine, "checkout")
+    def _checkout(_dbapi_connection, connection_record, _connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        db_pool_checked_out.inc()
+
+    @sa_event.listens_for(engine, "checkin")
+    def _checkin(_dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            db_pool_connection_held.observe(time.perf_counter() - checked_out_at)
+            db_pool_checked_out.dec()
+
+
+class MetricsMiddleware:
+    """
+    Latency of every HTTP request, labelled with the route's path template
+    (/recipients/{recipient_uid}, not the uid) so the series stay bounded;
+    requests no route matched share one label. Plain ASGI, the route is
+    read from the scope once the router has matched it.
+    """
+
+    UNMATCHED = "<unmatched>"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_duration.labels(
+                scope["method"],
+                route.path if route is not None else self.UNMATCHED,
+                status,
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,246 @@
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, ClassVar, Dict, List, Sequence, Tuple
+
+# seconds, from a fast Redis call to a slow request
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class CounterSeries:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def reset(self):
+        self.value = 0.0
+
+    def sample(self) -> Any:
+        return self.value
+
+
+class GaugeSeries(CounterSeries):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class HistogramSeries:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # per bucket, not cumulative; the last one is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self):
+        """Observe the seconds the block takes"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def sample(self) -> Any:
+        return [list(self.counts), self.sum]
+
+
+class Metric:
+    """
+    A metric family, one series per combination of label values (strings).
+    Series are plain objects updated in place, without locks: a process
+    only updates its metrics from its event loop thread, SQLAlchemy's pool
+    events included since they run there through greenlets.
+    """
+
+    type: ClassVar[str]
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.series: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._series = self.labels()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        series = self.series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes the labels {self.labelnames}")
+            series = self.series[values] = self._new_series()
+        return series
+
+    def reset(self):
+        for series in self.series.values():
+            series.reset()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [
+                [list(labels), series.sample()]
+                for labels, series in self.series.items()
+            ],
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_series(self) -> CounterSeries:
+        return CounterSeries()
+
+    def inc(self, amount: float = 1.0):
+        self._series.inc(amount)
+
+
+class Gauge(Metric):
+    """
+    aggregate is how the processes' values add up: "sum" over the live
+    processes, or "scraper" for gauges of shared state (queue lengths in
+    Redis) that the process serving /metrics sets on every scrape.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        aggregate: str = "sum",
+    ):
+        if aggregate not in ("sum", "scraper"):
+            raise ValueError(f"Unknown gauge aggregate: {aggregate}")
+        self.aggregate = aggregate
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self) -> GaugeSeries:
+        return GaugeSeries()
+
+    def inc(self, amount: float = 1.0):
+        self._series.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._series.dec(amount)
+
+    def set(self, value: float):
+        self._series.set(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**super().snapshot(), "aggregate": self.aggregate}
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self) -> HistogramSeries:
+        return HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        self._series.observe(value)
+
+    def time(self):
+        return self._series.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames=(), aggregate: str = "sum"
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, aggregate))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> Callable[[], None]:
+        """Refresh gauges from in-process state before every snapshot"""
+        self.collectors.append(collector)
+        return collector
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        for collector in self.collectors:
+            collector()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+
+metrics_registry = MetricsRegistry()
+
+# a forked worker starts from zero rather than counting its parent's values again
+os.register_at_fork(after_in_child=metrics_registry.reset)
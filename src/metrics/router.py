@@ -0,0 +1,28 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from .exposition import CONTENT_TYPE
+from .service import MetricsService, verify_scrape_token
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+
+async def scrape_token(authorization: Optional[str] = Header(None)):
+    if not verify_scrape_token(authorization):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token"
+        )
+
+
+@metrics_router.get(
+    "/metrics", response_class=PlainTextResponse, dependencies=[Depends(scrape_token)]
+)
+async def metrics(
+    metrics_service: MetricsService = Depends(MetricsService),
+) -> PlainTextResponse:
+    """Every process' metrics in the Prometheus text format"""
+    return PlainTextResponse(
+        await metrics_service.render_metrics(), media_type=CONTENT_TYPE
+    )
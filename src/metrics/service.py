@@ -0,0 +1,52 @@
+import hmac
+import logging
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from src.core.config.env_data import Config
+from src.dispatch.service import broadcast_scheduler, dispatch_queue, retry_scheduler
+
+from .exporter import MetricsExporter
+from .instruments import (
+    dispatch_dead_letters,
+    dispatch_queue_depth,
+    dispatch_retry_depth,
+    scheduled_broadcast_buckets,
+)
+from .registry import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+metrics_exporter = MetricsExporter(
+    metrics_registry,
+    directory=Config.METRICS_DIR,
+    interval=Config.METRICS_EXPORT_INTERVAL,
+)
+
+
+async def collect_queue_depths():
+    """Read the Redis backed queue lengths into their gauges"""
+    for lane, depth in (await dispatch_queue.depths()).items():
+        dispatch_queue_depth.labels(lane.value).set(depth)
+    for lane, depth in (await retry_scheduler.depths()).items():
+        dispatch_retry_depth.labels(lane.value).set(depth)
+    dispatch_dead_letters.set(await retry_scheduler.dead_letters.count())
+    scheduled_broadcast_buckets.set(await broadcast_scheduler.depth())
+
+
+def verify_scrape_token(authorization: Optional[str]) -> bool:
+    """Constant-time check of the scraper's bearer token, when METRICS_TOKEN is set"""
+    if not Config.METRICS_TOKEN:
+        return True
+    return hmac.compare_digest(f"Bearer {Config.METRICS_TOKEN}", authorization or "")
+
+
+class MetricsService:
+    async def render_metrics(self) -> str:
+        try:
+            await collect_queue_depths()
+        except aioredis.RedisError:
+            # still report the rest, the queue gauges keep their last values
+            logger.exception("Reading queue depths failed")
+        return await metrics_exporter.render()
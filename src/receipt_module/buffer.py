@@ -0,0 +1,332 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+import redis.asyncio as aioredis
+from sqlalchemy import text
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.delivery_module.partitions import DeliveryLogPartitions
+from src.delivery_module.writer import utc_now
+
+from .schema import ReceiptSchema
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_SPILL_KEY = "receipts:pending"
+
+# (notification uid, status, occurred at, error)
+ReceiptRow = Tuple[UUID, str, datetime, Optional[str]]
+
+# One statement per batch: the receipts are joined, as arrays, to the sent
+# row of their notification, which supplies owner, channel and address. The
+# created_at bound confines the join to the recent partitions. Repeats hit
+# the primary key and are skipped. Receipts without a sent row are returned,
+# the row may still be in the delivery log writer's buffer.
+APPLY_RECEIPTS_STATEMENT = text(
+    """
+    WITH receipt AS (
+        SELECT * FROM unnest(
+            CAST(:notification_uids AS uuid[]),
+            CAST(:statuses AS varchar[]),
+            CAST(:occurred_at AS timestamp[]),
+            CAST(:errors AS text[])
+        ) AS receipt(notification_uid, status, occurred_at, error)
+    ),
+    inserted AS (
+        INSERT INTO delivery_log (
+            created_at, notification_uid, status, broadcast_uid, recipient_uid,
+            owner_uid, channel, address, attempts, error
+        )
+        SELECT DISTINCT ON (receipt.notification_uid, receipt.status)
+            receipt.occurred_at, sent.notification_uid, receipt.status,
+            sent.broadcast_uid, sent.recipient_uid, sent.owner_uid, sent.channel,
+            sent.address, sent.attempts, receipt.error
+        FROM receipt
+        JOIN delivery_log AS sent
+            ON sent.notification_uid = receipt.notification_uid
+            AND sent.status = 'sent'
+            AND sent.created_at >= :since
+        ORDER BY receipt.notification_uid, receipt.status, receipt.occurred_at
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    )
+    SELECT
+        (SELECT count(*) FROM inserted) AS inserted,
+        ARRAY(
+            SELECT DISTINCT receipt.notification_uid
+            FROM receipt
+            WHERE NOT EXISTS (
+                SELECT 1 FROM delivery_log AS sent
+                WHERE sent.notification_uid = receipt.notification_uid
+                AND sent.status = 'sent'
+                AND sent.created_at >= :since
+            )
+        ) AS unmatched
+    """
+)
+
+
+async def _execute_apply(
+    session_factory: Callable[[], AsyncSession],
+    rows: Sequence[ReceiptRow],
+    lookback: timedelta,
+) -> Tuple[int, Set[UUID]]:
+    async with session_factory() as session:
+        try:
+            result = await session.execute(
+                APPLY_RECEIPTS_STATEMENT,
+                {
+                    "notification_uids": [row[0] for row in rows],
+                    "statuses": [row[1] for row in rows],
+                    "occurred_at": [row[2] for row in rows],
+                    "errors": [row[3] for row in rows],
+                    "since": min(row[2] for row in rows) - lookback,
+                },
+            )
+            inserted, unmatched = result.one()
+            await session.commit()
+            return inserted, set(unmatched)
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+
+async def apply_receipts(
+    session_factory: Callable[[], AsyncSession],
+    rows: Sequence[ReceiptRow],
+    lookback: timedelta,
+    partitions: Optional[DeliveryLogPartitions] = None,
+) -> Tuple[int, Set[UUID]]:
+    """
+    Apply receipts to the delivery log in one set-based statement.
+    Returns:
+        The number of delivery log rows inserted, and the notification uids
+        that have no sent row
+    """
+    try:
+        return await _execute_apply(session_factory, rows, lookback)
+    except Exception as e:
+        if partitions is None or "no partition" not in str(e):
+            raise
+        # a day without a partition yet, e.g. maintenance hasn't run
+        await partitions.ensure(row[2].date() for row in rows)
+        return await _execute_apply(session_factory, rows, lookback)
+
+
+class ReceiptBuffer:
+    """
+    Receipts acknowledged but not yet applied. Callbacks only append to the
+    in-memory buffer; it is applied to the delivery log in batches every
+    flush_interval seconds, or as soon as batch_size receipts are waiting.
+    Batches that fail to apply, and receipts past max_buffered, go to a
+    Redis list and are applied from there once the database is back.
+
+    A receipt is filed under the time the provider reports, kept within
+    max_age before its arrival, so a wrong clock can't point it at a
+    partition that doesn't exist. A batch the database rejects for its data
+    is split until the offending receipts are found and dropped. Receipts
+    that beat their sent row to the delivery log are retried up to
+    unmatched_retries times, backing off from unmatched_retry_delay seconds.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[Sequence[ReceiptRow]], Awaitable[Tuple[int, Set[UUID]]]],
+        redis: Optional[aioredis.Redis] = None,
+        flush_interval: float = 0.1,
+        batch_size: int = 5000,
+        max_buffered: int = 200000,
+        max_age: timedelta = timedelta(days=3),
+        unmatched_retries: int = 5,
+        unmatched_retry_delay: float = 1.0,
+    ):
+        self.apply = apply
+        self.redis = redis
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffered = max_buffered
+        self.max_age = max_age
+        self.unmatched_retries = unmatched_retries
+        self.unmatched_retry_delay = unmatched_retry_delay
+        self.buffer: List[ReceiptRow] = []
+        # (due, sequence, row) of unmatched receipts waiting for a retry
+        self.retrying: List[Tuple[float, int, ReceiptRow]] = []
+        self._attempts: Dict[ReceiptRow, int] = {}
+        self._sequence = itertools.count()
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.received = 0
+        self.applied = 0
+        self.unmatched = 0
+        self.rejected = 0
+        self.spilled = 0
+        # left over by an earlier process, maybe
+        self._spill_pending = redis is not None
+
+    def row(self, receipt: ReceiptSchema, received_at: datetime) -> ReceiptRow:
+        occurred_at = receipt.occurred_at or received_at
+        if occurred_at.tzinfo is not None:
+            occurred_at = (occurred_at - occurred_at.utcoffset()).replace(tzinfo=None)
+        occurred_at = min(max(occurred_at, received_at - self.max_age), received_at)
+        return (
+            receipt.notification_uid,
+            receipt.status.value,
+            occurred_at,
+            receipt.error,
+        )
+
+    async def add(self, receipts: Sequence[ReceiptSchema]):
+        received_at = utc_now()
+        self.buffer.extend(self.row(receipt, received_at) for receipt in receipts)
+        self.received += len(receipts)
+        if len(self.buffer) > self.max_buffered and self.redis is not None:
+            overflow, self.buffer = self.buffer, []
+            await self._spill(overflow)
+        if len(self.buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def _spill(self, rows: Sequence[ReceiptRow]):
+        try:
+            await self.redis.rpush(
+                RECEIPT_SPILL_KEY,
+                *(
+                    json.dumps([str(uid), status, occurred_at.isoformat(), error])
+                    for uid, status, occurred_at, error in rows
+                ),
+            )
+            self.spilled += len(rows)
+            self._spill_pending = True
+        except aioredis.RedisError:
+            logger.exception("Spilling %d receipts failed, they are lost", len(rows))
+
+    async def _unspill(self) -> List[ReceiptRow]:
+        if self.redis is None or not self._spill_pending:
+            return []
+        try:
+            raw = await self.redis.lpop(RECEIPT_SPILL_KEY, self.batch_size)
+        except aioredis.RedisError:
+            # retried after the next spill rather than on every flush
+            self._spill_pending = False
+            logger.exception("Reading spilled receipts failed")
+            return []
+        rows = []
+        for entry in raw or []:
+            uid, status, occurred_at, error = json.loads(entry)
+            rows.append((UUID(uid), status, datetime.fromisoformat(occurred_at), error))
+        self._spill_pending = len(rows) == self.batch_size
+        return rows
+
+    def _due_retries(self) -> List[ReceiptRow]:
+        now = time.monotonic()
+        rows = []
+        while self.retrying and self.retrying[0][0] <= now:
+            rows.append(heapq.heappop(self.retrying)[2])
+        return rows
+
+    def _retry_unmatched(self, batch: Sequence[ReceiptRow], unmatched: Set[UUID]):
+        now = time.monotonic()
+        for row in batch:
+            attempts = self._attempts.pop(row, 0)
+            if row[0] not in unmatched:
+                continue
+            if attempts >= self.unmatched_retries or (
+                len(self.retrying) >= self.max_buffered
+            ):
+                self.unmatched += 1
+                continue
+            self._attempts[row] = attempts + 1
+            due = now + self.unmatched_retry_delay * 2**attempts
+            heapq.heappush(self.retrying, (due, next(self._sequence), row))
+
+    async def _apply_isolating(
+        self, batch: Sequence[ReceiptRow]
+    ) -> Tuple[int, Set[UUID]]:
+        try:
+            return await self.apply(batch)
+        except (DataError, IntegrityError):
+            if len(batch) == 1:
+                self._attempts.pop(batch[0], None)
+                self.rejected += 1
+                logger.exception(
+                    "Dropping receipt %s, the database rejects it", batch[0]
+                )
+                return 0, set()
+        # halve the batch until the receipts the database rejects are alone
+        middle = len(batch) // 2
+        head_inserted, head_unmatched = await self._apply_isolating(batch[:middle])
+        tail_inserted, tail_unmatched = await self._apply_isolating(batch[middle:])
+        return head_inserted + tail_inserted, head_unmatched | tail_unmatched
+
+    async def flush(self) -> int:
+        """
+        Apply everything buffered, the unmatched receipts due for a retry and
+        a batch of spilled receipts.
+        Returns:
+            The number of receipts applied
+        """
+        async with self._lock:
+            rows, self.buffer = self.buffer, []
+            rows.extend(self._due_retries())
+            rows.extend(await self._unspill())
+            done = 0
+            try:
+                for start in range(0, len(rows), self.batch_size):
+                    batch = rows[start : start + self.batch_size]
+                    inserted, unmatched = await self._apply_isolating(batch)
+                    self.applied += inserted
+                    self._retry_unmatched(batch, unmatched)
+                    done += len(batch)
+            except Exception:
+                logger.exception("Applying %d receipts failed", len(rows) - done)
+            finally:
+                if done < len(rows):
+                    if self.redis is not None:
+                        for row in rows[done:]:
+                            self._attempts.pop(row, None)
+                        await self._spill(rows[done:])
+                    else:
+                        self.buffer[:0] = rows[done:]
+            return done
+
+    async def run(self):
+        """Flush every flush_interval seconds until cancelled, then drain"""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                if (
+                    self.buffer
+                    or self._spill_pending
+                    or (self.retrying and self.retrying[0][0] <= time.monotonic())
+                ):
+                    await self.flush()
+        except asyncio.CancelledError:
+            if self.buffer:
+                await self.flush()
+            if self.retrying and self.redis is not None:
+                # the next process gives them a fresh round of retries
+                await self._spill([entry[2] for entry in self.retrying])
+                self.retrying.clear()
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self.buffer),
+            "retrying": len(self.retrying),
+            "received": self.received,
+            "applied": self.applied,
+            "unmatched": self.unmatched,
+            "rejected": self.rejected,
+            "spilled": self.spilled,
+        }
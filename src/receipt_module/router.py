@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from .schema import ReceiptAckResponse, ReceiptBatchSchema
+from .service import ReceiptService, verify_provider_token
+
+receipt_router = APIRouter(tags=["Delivery Receipts"], prefix="/receipts")
+
+
+async def provider_token(
+    provider: str, x_receipt_token: str = Header(..., alias="X-Receipt-Token")
+) -> str:
+    if not verify_provider_token(provider, x_receipt_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid receipt token"
+        )
+    return provider
+
+
+@receipt_router.post(
+    "/{provider}",
+    response_model=ReceiptAckResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def ingest_receipts(
+    receipt_payload: ReceiptBatchSchema,
+    provider: str = Depends(provider_token),
+    receipt_service: ReceiptService = Depends(ReceiptService),
+) -> ReceiptAckResponse:
+    """
+    Delivery receipts from a provider. Acknowledged as soon as they are
+    buffered; they reach the delivery log within RECEIPT_FLUSH_INTERVAL.
+    """
+    return await receipt_service.ingest_receipts(receipts=receipt_payload.receipts)
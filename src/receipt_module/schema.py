@@ -0,0 +1,36 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class ReceiptStatus(str, Enum):
+    DELIVERED = "delivered"
+    BOUNCED = "bounced"
+    COMPLAINED = "complained"
+    REJECTED = "rejected"
+
+
+class ReceiptSchema(BaseModel):
+    notification_uid: UUID = Field(
+        ..., description="the delivery id the notification was sent with"
+    )
+    status: ReceiptStatus
+    occurred_at: Optional[datetime] = Field(None, description="UTC")
+    error: Optional[str] = Field(None, max_length=1000)
+
+    class Config:
+        extra = "ignore"
+
+
+class ReceiptBatchSchema(BaseModel):
+    receipts: List[ReceiptSchema] = Field(..., min_length=1, max_length=10000)
+
+    class Config:
+        extra = "forbid"
+
+
+class ReceiptAckResponse(BaseModel):
+    accepted: int
@@ -0,0 +1,43 @@
+import hmac
+from datetime import timedelta
+from functools import partial
+from typing import List
+
+from src.core.config.env_data import Config
+from src.database.db import async_session
+from src.database.redis_client import get_redis
+from src.delivery_module.service import delivery_log_partitions
+
+from .buffer import ReceiptBuffer, apply_receipts
+from .schema import ReceiptAckResponse, ReceiptSchema
+
+receipt_buffer = ReceiptBuffer(
+    partial(
+        apply_receipts,
+        async_session,
+        lookback=timedelta(days=Config.RECEIPT_LOOKBACK_DAYS),
+        partitions=delivery_log_partitions,
+    ),
+    redis=get_redis(),
+    flush_interval=Config.RECEIPT_FLUSH_INTERVAL,
+    batch_size=Config.RECEIPT_BATCH_SIZE,
+    max_buffered=Config.RECEIPT_MAX_BUFFERED,
+    max_age=timedelta(days=Config.RECEIPT_LOOKBACK_DAYS),
+    unmatched_retries=Config.RECEIPT_UNMATCHED_RETRIES,
+    unmatched_retry_delay=Config.RECEIPT_UNMATCHED_RETRY_DELAY,
+)
+
+
+def verify_provider_token(provider: str, token: str) -> bool:
+    """Constant-time check of a provider's callback token, no database involved"""
+    expected = Config.RECEIPT_PROVIDER_TOKENS.get(provider)
+    return bool(expected) and hmac.compare_digest(expected, token)
+
+
+class ReceiptService:
+    async def ingest_receipts(
+        self, receipts: List[ReceiptSchema]
+    ) -> ReceiptAckResponse:
+        """Buffer receipts for the delivery log; they are applied after the ack"""
+        await receipt_buffer.add(receipts)
+        return ReceiptAckResponse(accepted=len(receipts))
@@ -1,19 +1,26 @@
 from uuid import UUID, uuid4
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlmodel import Column, Field, SQLModel
+from sqlmodel import Column, Field, Index, SQLModel
 
 
 class Recipient(SQLModel, table=True):
     __tablename__ = "recipeints"
+    __table_args__ = (
+        # an owner's audience in uid order, for resumable broadcast fan-out
+        Index("ix_recipeints_created_by_uid", "created_by", "uid"),
+    )
 
     uid: UUID = Field(
         sa_column=Column(pg.UUID, primary_key=True, default=lambda: uuid4(), index=True)
     )
     first_name: str = Field(max_length=100)
     last_name: str = Field(max_length=100, nullable=True)
-    email: str = Field(max_length=100,  nullable=True)
+    email: str = Field(max_length=100, nullable=True)
     phone_number: str = Field(max_length=30, nullable=True)
+    # IANA zone name and BCP 47 tag, e.g. "Europe/Paris" and "fr-FR"
+    timezone: str = Field(max_length=64, nullable=True, index=True)
+    locale: str = Field(max_length=35, nullable=True)
     created_by: UUID = Field(sa_column=Column(pg.UUID))
 
     def __str__(self):
@@ -0,0 +1,73 @@
+import re
+from typing import Optional
+
+from src.utils.prefix_trie import PrefixTrie
+
+# ITU-T E.164 country calling codes of geographic numbering plans
+CALLING_CODES = (
+    "1 7 20 27 30 31 32 33 34 36 39 40 41 43 44 45 46 47 48 49 51 52 53 54 55 "
+    "56 57 58 60 61 62 63 64 65 66 81 82 84 86 90 91 92 93 94 95 98 211 212 "
+    "213 216 218 220 221 222 223 224 225 226 227 228 229 230 231 232 233 234 "
+    "235 236 237 238 239 240 241 242 243 244 245 246 247 248 249 250 251 252 "
+    "253 254 255 256 257 258 260 261 262 263 264 265 266 267 268 269 290 291 "
+    "297 298 299 350 351 352 353 354 355 356 357 358 359 370 371 372 373 374 "
+    "375 376 377 378 379 380 381 382 383 385 386 387 389 420 421 423 500 501 "
+    "502 503 504 505 506 507 508 509 590 591 592 593 594 595 596 597 598 599 "
+    "670 672 673 674 675 676 677 678 679 680 681 682 683 685 686 687 688 689 "
+    "690 691 692 850 852 853 855 856 880 886 960 961 962 963 964 965 966 967 "
+    "968 970 971 972 973 974 975 976 977 992 993 994 995 996 998"
+).split()
+
+# prefix dialled before national numbers, "0" unless listed; Italy, San
+# Marino and the Vatican keep their leading 0 in international format
+TRUNK_PREFIXES = {"1": "1", "7": "8", "36": "06", "39": "", "378": "", "379": ""}
+
+calling_codes = PrefixTrie((code, code) for code in CALLING_CODES)
+
+# separators people write numbers with, and the "(0)" of "+44 (0)20 ..."
+_FORMATTING = re.compile(r"\(0\)|[\s\-./()]")
+# E.164 allows 15 digits, the shortest plans (Niue, Tokelau) have 4 after the code
+MAX_DIGITS = 15
+MIN_SUBSCRIBER_DIGITS = 4
+
+
+def normalize_phone_number(raw: str, default_country_code: Optional[str] = None) -> str:
+    """
+    Normalize a phone number to E.164 (+<country code><number>). Numbers
+    without an international prefix (+ or 00) are national numbers of
+    default_country_code, with their trunk prefix dropped.
+
+    Raises:
+        ValueError: If the number is not a valid international number.
+    """
+    number = _FORMATTING.sub("", raw.strip())
+    if number.startswith("+"):
+        digits = number[1:]
+    elif number.startswith("00"):
+        digits = number[2:]
+    elif number.startswith("011") and default_country_code == "1":
+        # the North American international prefix
+        digits = number[3:]
+    elif default_country_code:
+        digits = number
+        trunk = TRUNK_PREFIXES.get(default_country_code, "0")
+        # a North American 1 is only a trunk prefix in front of ten digits
+        if (
+            trunk
+            and digits.startswith(trunk)
+            and (default_country_code != "1" or len(digits) == 11)
+        ):
+            digits = digits[len(trunk) :]
+        digits = default_country_code + digits
+    else:
+        raise ValueError(
+            f"Phone number {raw} has no country code, write it as +<country code><number>"
+        )
+    if not (digits.isascii() and digits.isdigit()):
+        raise ValueError(f"Invalid phone number: {raw}")
+    code = calling_codes.get(digits)
+    if code is None:
+        raise ValueError(f"Unknown country code in phone number: {raw}")
+    if len(digits) > MAX_DIGITS or len(digits) - len(code) < MIN_SUBSCRIBER_DIGITS:
+        raise ValueError(f"Invalid phone number length: {raw}")
+    return f"+{digits}"
@@ -1,11 +1,19 @@
-from fastapi import status, Depends, HTTPException, APIRouter
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
-from src.authentication.auth import get_current_active_user, AdminRoleChecker
-from .schema import RecipientSchema, RecipientResponse, RecipientUpdateSchema
-from src.database.db import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.authentication.auth import AdminRoleChecker, get_current_active_user
+from src.database.db import get_session
+
+from .schema import (
+    RecipientBulkSchema,
+    RecipientResponse,
+    RecipientSchema,
+    RecipientUpdateSchema,
+)
 from .service import RecipientService
-from typing import Optional, List
 
 admin_role = AdminRoleChecker()
 
@@ -36,6 +44,29 @@ async def create_new_recipient(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@recipient_router.post(
+    "/bulk",
+    response_model=List[RecipientResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_recipients(
+    recipient_payload: RecipientBulkSchema,
+    recipient_service: RecipientService = Depends(RecipientService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> List[RecipientResponse]:
+    """Create up to 1000 recipients at once; one invalid recipient fails the batch"""
+    try:
+        for recipient in recipient_payload.recipients:
+            recipient.created_by = current_user.uid
+        return await recipient_service.import_recipients(
+            recipient_schemas=recipient_payload.recipients, session=session
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @recipient_router.get(
     "/", response_model=List[RecipientResponse], status_code=status.HTTP_200_OK
 )
@@ -1,7 +1,30 @@
+import re
+from typing import List, Optional
 from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+
+LOCALE_PATTERN = re.compile(r"^[A-Za-z]{2,3}(-[A-Za-z0-9]{2,8})*$")
+
+
+def validate_timezone(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return value
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {value}")
+    return value
+
+
+def validate_locale(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return value
+    value = value.replace("_", "-")
+    if not LOCALE_PATTERN.match(value):
+        raise ValueError(f"Invalid locale: {value}")
+    return value
 
 
 class RecipientSchema(BaseModel):
@@ -9,10 +32,22 @@ class RecipientSchema(BaseModel):
     last_name: str = Field(None, description="last name")
     email: str = Field(None, description="email address")
     phone_number: str = Field(None, description="phone number")
+    timezone: str = Field(None, description="IANA timezone, e.g. Europe/Paris")
+    locale: str = Field(None, description="BCP 47 locale, e.g. fr-FR")
     created_by: UUID = Field(
         None, description="uuid of the user that create the new recipient"
     )
 
+    _timezone = field_validator("timezone")(validate_timezone)
+    _locale = field_validator("locale")(validate_locale)
+
+
+class RecipientBulkSchema(BaseModel):
+    recipients: List[RecipientSchema] = Field(..., min_length=1, max_length=1000)
+
+    class Config:
+        extra = "forbid"
+
 
 class RecipientResponse(BaseModel):
     uid: UUID
@@ -20,6 +55,8 @@ class RecipientResponse(BaseModel):
     last_name: Optional[str]
     email: Optional[str]
     phone_number: Optional[str]
+    timezone: Optional[str] = None
+    locale: Optional[str] = None
     created_by: UUID
 
 
@@ -28,3 +65,8 @@ class RecipientUpdateSchema(BaseModel):
     last_name: str = Field(None, description="last name")
     email: str = Field(None, description="email address")
     phone_number: str = Field(None, description="phone number")
+    timezone: str = Field(None, description="IANA timezone, e.g. Europe/Paris")
+    locale: str = Field(None, description="BCP 47 locale, e.g. fr-FR")
+
+    _timezone = field_validator("timezone")(validate_timezone)
+    _locale = field_validator("locale")(validate_locale)
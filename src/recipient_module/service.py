@@ -1,36 +1,96 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from src.core.config.env_data import Config
+from src.core.event.bus import emit_after_commit
+from src.core.event.events import RecipientCreated
+from src.segment_module.service import forget_recipient
+
 from .models import Recipient
+from .phone import normalize_phone_number
 from .schema import RecipientResponse, RecipientSchema, RecipientUpdateSchema
 
 
+def _recipient_response(recipient: Recipient) -> RecipientResponse:
+    return RecipientResponse(
+        uid=recipient.uid,
+        first_name=recipient.first_name,
+        last_name=recipient.last_name,
+        email=recipient.email,
+        phone_number=recipient.phone_number,
+        timezone=recipient.timezone,
+        locale=recipient.locale,
+        created_by=recipient.created_by,
+    )
+
+
+def _normalized(recipient_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Recipient fields with the phone number in E.164, parsed once here"""
+    if recipient_dict.get("phone_number"):
+        recipient_dict["phone_number"] = normalize_phone_number(
+            recipient_dict["phone_number"], Config.DEFAULT_PHONE_COUNTRY_CODE
+        )
+    return recipient_dict
+
+
 class RecipientService:
     async def create_recipient(
         self, recipient_schema: RecipientSchema, session: AsyncSession
     ) -> Optional[RecipientResponse]:
         try:
-            recipient_dict = recipient_schema.model_dump()
+            recipient_dict = _normalized(recipient_schema.model_dump())
             new_recipient = Recipient(**recipient_dict)
             session.add(new_recipient)
+            emit_after_commit(
+                session,
+                lambda: RecipientCreated(
+                    recipient_uid=new_recipient.uid,
+                    created_by=new_recipient.created_by,
+                ),
+            )
             await session.commit()
             await session.refresh(new_recipient)
-            recipient_response = RecipientResponse(
-                uid=new_recipient.uid,
-                first_name=new_recipient.first_name,
-                last_name=new_recipient.last_name,
-                email=new_recipient.email,
-                phone_number=new_recipient.phone_number,
-                created_by=new_recipient.created_by,
-            )
+            recipient_response = _recipient_response(new_recipient)
             return recipient_response
         except Exception as e:
             await session.rollback()
             raise e
 
+    async def import_recipients(
+        self, recipient_schemas: List[RecipientSchema], session: AsyncSession
+    ) -> List[RecipientResponse]:
+        """
+        Create a batch of recipients in one transaction, all or none.
+
+        Raises:
+            ValueError: If a phone number is invalid, naming its position.
+        """
+        try:
+            new_recipients = []
+            for index, recipient_schema in enumerate(recipient_schemas):
+                try:
+                    recipient_dict = _normalized(recipient_schema.model_dump())
+                except ValueError as e:
+                    raise ValueError(f"Recipient {index}: {e}") from e
+                new_recipients.append(Recipient(**recipient_dict))
+            session.add_all(new_recipients)
+            for new_recipient in new_recipients:
+                emit_after_commit(
+                    session,
+                    lambda new_recipient=new_recipient: RecipientCreated(
+                        recipient_uid=new_recipient.uid,
+                        created_by=new_recipient.created_by,
+                    ),
+                )
+            await session.commit()
+            return [_recipient_response(recipient) for recipient in new_recipients]
+        except Exception as e:
+            await session.rollback()
+            raise e
+
     async def retrieve_recipient(
         self, recipient_uid: str, session: AsyncSession
     ) -> Optional[RecipientResponse]:
@@ -39,14 +99,7 @@ class RecipientService:
             recipient = await session.get(Recipient, recipient_uid)
             if not recipient:
                 return None
-            recipient_response = recipient_response = RecipientResponse(
-                uid=recipient.uid,
-                first_name=recipient.first_name,
-                last_name=recipient.last_name,
-                email=recipient.email,
-                phone_number=recipient.phone_number,
-                created_by=recipient.created_by,
-            )
+            recipient_response = _recipient_response(recipient)
             return recipient_response
         except Exception as e:
             await session.rollback()
@@ -64,15 +117,7 @@ class RecipientService:
                 return []
 
             recipient_responses = [
-                RecipientResponse(
-                    uid=recipient.uid,
-                    first_name=recipient.first_name,
-                    last_name=recipient.last_name,
-                    email=recipient.email,
-                    phone_number=recipient.phone_number,
-                    created_by=recipient.created_by,
-                )
-                for recipient in recipients
+                _recipient_response(recipient) for recipient in recipients
             ]
             return recipient_responses
 
@@ -87,7 +132,7 @@ class RecipientService:
         session: AsyncSession,
     ) -> Optional[RecipientResponse]:
         try:
-            update_recipient_dict = recipient_schema.model_dump()
+            update_recipient_dict = _normalized(recipient_schema.model_dump())
             recipient = await session.get(Recipient, recipient_uid)
             if not recipient:
                 return None
@@ -97,14 +142,7 @@ class RecipientService:
 
             await session.commit()
             await session.refresh(recipient)
-            recipient_response = RecipientResponse(
-                uid=recipient.uid,
-                first_name=recipient.first_name,
-                last_name=recipient.last_name,
-                email=recipient.email,
-                phone_number=recipient.phone_number,
-                created_by=recipient.created_by,
-            )
+            recipient_response = _recipient_response(recipient)
             return recipient_response
         except Exception as e:
             await session.rollback()
@@ -117,6 +155,7 @@ class RecipientService:
             recipient = await session.get(Recipient, recipient_uid)
             if not recipient:
                 return None
+            await forget_recipient(recipient.uid, session)
             await session.delete(recipient)
             await session.commit()
             return True
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional, Sequence
+from uuid import UUID
+
+import redis.asyncio as aioredis
+from pydantic import BaseModel
+
+from src.dispatch.schema import BroadcastSchema
+
+from .planner import SendBucket
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED_BROADCAST_KEY = "schedule:broadcasts"
+
+# Claim up to ARGV[2] entries due at ARGV[1] by pushing their score out to
+# ARGV[3], in one step: the entries stay in the ZSET, invisible to other
+# runners until then, and come due again if the claimer dies.
+CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, member in ipairs(due) do
+    redis.call('ZADD', KEYS[1], 'XX', ARGV[3], member)
+end
+return due
+"""
+
+
+class ScheduledBroadcast(BaseModel):
+    """
+    One send bucket of a broadcast, fanned out when it is due; without
+    timezones, a whole broadcast submitted for fan-out
+    """
+
+    broadcast_uid: UUID
+    owner_uid: UUID
+    send_at: datetime
+    timezones: Optional[List[Optional[str]]] = None
+    broadcast: BroadcastSchema
+
+
+class FanoutCursor:
+    """
+    The last recipient a claimed bucket's fan-out queued, None at the
+    start. Saving a new position also renews the claim, so a long fan-out
+    keeps its bucket.
+    """
+
+    def __init__(
+        self, scheduler: "BroadcastScheduler", entry: str, after: Optional[UUID]
+    ):
+        self.scheduler = scheduler
+        self.entry = entry
+        self.after = after
+
+    async def save(self, after: UUID):
+        self.after = after
+        await self.scheduler.checkpoint(self.entry, after)
+
+
+class BroadcastScheduler:
+    """
+    Broadcasts waiting for fan-out: a Redis ZSET of send buckets scored by
+    send time, one entry per bucket rather than per recipient. A campaign's
+    buckets are added in one ZADD; a broadcast sent right away is a single
+    entry due now, so the workers fan it out rather than the API process.
+    The runner claims due buckets for lease seconds and hands them to
+    fan_out with their cursor, which queues the bucket's recipients (those
+    in its timezones) from where an earlier attempt stopped. A bucket is
+    removed once fan_out succeeds; a failed one comes due again after a
+    backoff from retry_delay, and is dropped after max_attempts.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        fan_out: Callable[[ScheduledBroadcast, FanoutCursor], Awaitable[int]],
+        prefix: str = SCHEDULED_BROADCAST_KEY,
+        lease: float = 300.0,
+        retry_delay: float = 10.0,
+        max_retry_delay: float = 600.0,
+        max_attempts: int = 10,
+    ):
+        self.redis = redis
+        self.fan_out = fan_out
+        self.prefix = prefix
+        self.failures_key = f"{prefix}:failures"
+        self.cursors_key = f"{prefix}:cursors"
+        self.lease = lease
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max_attempts
+        self._claim_due = redis.register_script(CLAIM_DUE_SCRIPT)
+
+    async def schedule(
+        self,
+        broadcast: BroadcastSchema,
+        owner_uid: UUID,
+        broadcast_uid: UUID,
+        buckets: Sequence[SendBucket],
+    ) -> int:
+        """
+        Returns:
+            The number of recipients scheduled
+        """
+        if not buckets:
+            return 0
+        entries = {
+            ScheduledBroadcast(
+                broadcast_uid=broadcast_uid,
+                owner_uid=owner_uid,
+                send_at=bucket.send_at,
+                timezones=bucket.timezones,
+                broadcast=broadcast,
+            ).model_dump_json(): bucket.send_at.timestamp()
+            for bucket in buckets
+        }
+        await self.redis.zadd(self.prefix, entries)
+        return sum(bucket.recipients for bucket in buckets)
+
+    async def submit(
+        self, broadcast: BroadcastSchema, owner_uid: UUID, broadcast_uid: UUID
+    ):
+        """Queue a broadcast for fan-out by the workers right away"""
+        now = datetime.now(timezone.utc)
+        entry = ScheduledBroadcast(
+            broadcast_uid=broadcast_uid,
+            owner_uid=owner_uid,
+            send_at=now,
+            broadcast=broadcast,
+        ).model_dump_json()
+        await self.redis.zadd(self.prefix, {entry: now.timestamp()})
+
+    async def claim_due(self, batch_size: int = 100) -> List[str]:
+        """
+        Returns:
+            The raw entries of the claimed buckets, for done() and failed()
+        """
+        now = time.time()
+        return await self._claim_due(
+            keys=[self.prefix], args=[now, batch_size, now + self.lease]
+        )
+
+    async def checkpoint(self, entry: str, after: UUID):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.cursors_key, entry, str(after))
+            pipe.zadd(self.prefix, {entry: time.time() + self.lease}, xx=True)
+            await pipe.execute()
+
+    async def done(self, entry: str):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.prefix, entry)
+            pipe.hdel(self.failures_key, entry)
+            pipe.hdel(self.cursors_key, entry)
+            await pipe.execute()
+
+    async def failed(self, entry: str):
+        """Make a bucket due again after a backoff, or drop it past max_attempts"""
+        attempts = await self.redis.hincrby(self.failures_key, entry, 1)
+        if attempts >= self.max_attempts:
+            logger.error("Dropping scheduled broadcast after %d attempts", attempts)
+            await self.done(entry)
+            return
+        delay = min(self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay)
+        await self.redis.zadd(self.prefix, {entry: time.time() + delay}, xx=True)
+
+    async def next_due_in(self) -> Optional[float]:
+        earliest = await self.redis.zrange(self.prefix, 0, 0, withscores=True)
+        if not earliest:
+            return None
+        return max(earliest[0][1] - time.time(), 0.0)
+
+    async def depth(self) -> int:
+        return await self.redis.zcard(self.prefix)
+
+    async def _process(self, entry: str):
+        try:
+            scheduled = ScheduledBroadcast.model_validate_json(entry)
+        except ValueError:
+            logger.exception("Dropping unreadable scheduled broadcast")
+            await self.done(entry)
+            return
+        after = await self.redis.hget(self.cursors_key, entry)
+        cursor = FanoutCursor(self, entry, UUID(after) if after else None)
+        try:
+            await self.fan_out(scheduled, cursor)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception(
+                "Scheduled broadcast %s (%s) failed",
+                scheduled.broadcast_uid,
+                scheduled.send_at,
+            )
+            await self.failed(entry)
+            return
+        await self.done(entry)
+
+    async def run(self, batch_size: int = 100, max_interval: float = 1.0):
+        """Fan out buckets as they come due, until cancelled"""
+        while True:
+            try:
+                due = await self.claim_due(batch_size)
+            except aioredis.RedisError:
+                logger.exception("Reading due broadcasts failed")
+                await asyncio.sleep(max_interval)
+                continue
+            for entry in due:
+                try:
+                    await self._process(entry)
+                except aioredis.RedisError:
+                    # still claimed, it comes due again when the lease ends
+                    logger.exception("Settling a scheduled broadcast failed")
+            if len(due) >= batch_size:
+                continue
+            try:
+                due_in = await self.next_due_in()
+            except aioredis.RedisError:
+                logger.exception("Reading due broadcasts failed")
+                due_in = max_interval
+            await asyncio.sleep(
+                min(due_in if due_in is not None else max_interval, max_interval)
+            )
@@ -0,0 +1,103 @@
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+class QuietHours(NamedTuple):
+    """Local hours nothing is sent in; start after end wraps past midnight"""
+
+    start: time
+    end: time
+
+    def contains(self, moment: time) -> bool:
+        if self.start <= self.end:
+            return self.start <= moment < self.end
+        return moment >= self.start or moment < self.end
+
+
+class SendBucket(NamedTuple):
+    """Recipients of a campaign that are due at the same instant"""
+
+    send_at: datetime
+    # recipient timezone values as stored, None for recipients without one
+    timezones: List[Optional[str]]
+    recipients: int
+
+
+@lru_cache(maxsize=1024)
+def _zone(name: str) -> Optional[ZoneInfo]:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+class SendTimePlanner:
+    """
+    Works out when a campaign reaches each recipient: at local_time on the
+    recipient's clock, or right away when local_time is None, in both cases
+    pushed to the end of quiet hours when it falls inside them.
+
+    The send time only depends on the timezone, so planning takes the
+    number of recipients per timezone (one pass over the audience, or a
+    GROUP BY) and computes one send time per timezone. Timezones with the
+    same UTC offset at that moment land on the same instant and share a
+    bucket, so a campaign becomes a few dozen schedule entries however large
+    its audience is. Recipients without a timezone, or with one this
+    system doesn't know, use default_timezone.
+    """
+
+    def __init__(
+        self,
+        local_time: Optional[time] = None,
+        quiet_hours: Optional[QuietHours] = None,
+        default_timezone: str = "UTC",
+    ):
+        self.local_time = local_time
+        self.quiet_hours = quiet_hours
+        self.default_zone = _zone(default_timezone) or ZoneInfo("UTC")
+
+    def zone(self, name: Optional[str]) -> ZoneInfo:
+        return (_zone(name) if name else None) or self.default_zone
+
+    def send_time(self, zone: ZoneInfo, now: datetime) -> datetime:
+        """The UTC instant to send at for recipients in zone"""
+        local_now = now.astimezone(zone)
+        send_at = local_now
+        if self.local_time is not None:
+            send_at = datetime.combine(local_now.date(), self.local_time, zone)
+            if send_at < local_now:
+                # same wall clock time tomorrow, across DST changes too
+                send_at += timedelta(days=1)
+        if self.quiet_hours is not None and self.quiet_hours.contains(send_at.time()):
+            quiet_end = datetime.combine(send_at.date(), self.quiet_hours.end, zone)
+            if quiet_end <= send_at:
+                quiet_end += timedelta(days=1)
+            send_at = quiet_end
+        return send_at.astimezone(timezone.utc)
+
+    def plan(
+        self,
+        timezone_counts: Mapping[Optional[str], int],
+        now: Optional[datetime] = None,
+    ) -> List[SendBucket]:
+        """Send buckets for recipient counts by timezone, earliest first"""
+        now = now or datetime.now(timezone.utc)
+        buckets: Dict[datetime, Tuple[List[Optional[str]], List[int]]] = {}
+        for name, count in timezone_counts.items():
+            send_at = self.send_time(self.zone(name), now)
+            timezones, counts = buckets.setdefault(send_at, ([], []))
+            timezones.append(name)
+            counts.append(count)
+        return [
+            SendBucket(send_at, timezones, sum(counts))
+            for send_at, (timezones, counts) in sorted(buckets.items())
+        ]
+
+    def plan_recipients(
+        self, timezones: Iterable[Optional[str]], now: Optional[datetime] = None
+    ) -> List[SendBucket]:
+        """Send buckets for the timezones of a campaign's recipients"""
+        return self.plan(Counter(timezones), now)
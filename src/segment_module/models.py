@@ -0,0 +1,48 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlmodel import Column, Field, ForeignKey, SQLModel
+
+
+class Segment(SQLModel, table=True):
+    __tablename__ = "segments"
+
+    uid: UUID = Field(
+        sa_column=Column(pg.UUID, primary_key=True, default=lambda: uuid4(), index=True)
+    )
+    name: str = Field(max_length=100)
+    description: str = Field(sa_column=Column(pg.TEXT, nullable=True))
+    # maintained by the membership statements, never counted on read
+    member_count: int = Field(default=0)
+    created_by: UUID = Field(sa_column=Column(pg.UUID, index=True))
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    updated_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now)
+    )
+
+
+class SegmentMember(SQLModel, table=True):
+    """
+    Segment membership. The (segment_uid, recipient_uid) primary key makes
+    reading a segment an index range scan.
+    """
+
+    __tablename__ = "segment_members"
+
+    segment_uid: UUID = Field(
+        sa_column=Column(
+            pg.UUID,
+            ForeignKey("segments.uid", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
+    recipient_uid: UUID = Field(
+        sa_column=Column(
+            pg.UUID,
+            ForeignKey("recipeints.uid", ondelete="CASCADE"),
+            primary_key=True,
+            index=True,
+        )
+    )
+    added_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
@@ -0,0 +1,215 @@
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.authentication.auth import AdminRoleChecker, get_current_active_user
+from src.database.db import get_session
+
+from .schema import (
+    SegmentMembershipResponse,
+    SegmentMembershipSchema,
+    SegmentMembersResponse,
+    SegmentResponse,
+    SegmentSchema,
+    SegmentUpdateSchema,
+)
+from .service import SegmentService
+
+admin_role = AdminRoleChecker()
+
+segment_router = APIRouter(tags=["Segment Management"], prefix="/segments")
+
+
+async def _owned_segment(
+    segment_uid: str,
+    segment_service: SegmentService,
+    session: AsyncSession,
+    current_user,
+):
+    segment = await segment_service.retrieve_segment(segment_uid, session)
+    if not segment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Segment Does not exist"
+        )
+    if segment.created_by != current_user.uid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="You are not allowed to view this resource",
+        )
+    return segment
+
+
+@segment_router.post(
+    "/", response_model=SegmentResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_new_segment(
+    segment_payload: SegmentSchema,
+    segment_service: SegmentService = Depends(SegmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[SegmentResponse]:
+    try:
+        return await segment_service.create_segment(
+            segment_schema=segment_payload,
+            created_by=current_user.uid,
+            session=session,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@segment_router.get(
+    "/", response_model=List[SegmentResponse], status_code=status.HTTP_200_OK
+)
+async def retrieve_all_segments(
+    segment_service: SegmentService = Depends(SegmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> List[SegmentResponse]:
+    try:
+        return await segment_service.retrieve_all_segments(
+            created_by=current_user.uid, session=session
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@segment_router.get(
+    "/{segment_uid}", response_model=SegmentResponse, status_code=status.HTTP_200_OK
+)
+async def retrieve_segment(
+    segment_uid: str,
+    segment_service: SegmentService = Depends(SegmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[SegmentResponse]:
+    try:
+        return await _owned_segment(segment_uid, segment_service, session, current_user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@segment_router.patch(
+    "/{segment_uid}", response_model=SegmentResponse, status_code=status.HTTP_200_OK
+)
+async def update_segment(
+    segment_uid: str,
+    segment_payload: SegmentUpdateSchema,
+    segment_service: SegmentService = Depends(SegmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[SegmentResponse]:
+    try:
+        await _owned_segment(segment_uid, segment_service, session, current_user)
+        return await segment_service.update_segment(
+            segment_uid=segment_uid,
+            segment_schema=segment_payload,
+            session=session,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@segment_router.delete("/{segment_uid}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_segment(
+    segment_uid: str,
+    segment_service: SegmentService = Depends(SegmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+):
+    try:
+        await _owned_segment(segment_uid, segment_service, session, current_user)
+        await segment_service.delete_segment(segment_uid, session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@segment_router.get(
+    "/{segment_uid}/members",
+    response_model=SegmentMembersResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def retrieve_segment_members(
+    segment_uid: UUID,
+    after: Optional[UUID] = Query(
+        None, description="last recipient uid of the previous page"
+    ),
+    limit: int = Query(1000, ge=1, le=10000),
+    segment_service: SegmentService = Depends(SegmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> SegmentMembersResponse:
+    try:
+        await _owned_segment(segment_uid, segment_service, session, current_user)
+        return await segment_service.retrieve_members(
+            segment_uid, session, after=after, limit=limit
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@segment_router.post(
+    "/{segment_uid}/members",
+    response_model=SegmentMembershipResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def add_segment_members(
+    segment_uid: UUID,
+    membership_payload: SegmentMembershipSchema,
+    segment_service: SegmentService = Depends(SegmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> SegmentMembershipResponse:
+    try:
+        await _owned_segment(segment_uid, segment_service, session, current_user)
+        return await segment_service.add_members(
+            segment_uid,
+            membership_payload.recipient_uids,
+            owner_uid=current_user.uid,
+            session=session,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@segment_router.post(
+    "/{segment_uid}/members/remove",
+    response_model=SegmentMembershipResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def remove_segment_members(
+    segment_uid: UUID,
+    membership_payload: SegmentMembershipSchema,
+    segment_service: SegmentService = Depends(SegmentService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> SegmentMembershipResponse:
+    try:
+        await _owned_segment(segment_uid, segment_service, session, current_user)
+        return await segment_service.remove_members(
+            segment_uid, membership_payload.recipient_uids, session=session
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
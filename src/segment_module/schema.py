@@ -0,0 +1,47 @@
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class SegmentSchema(BaseModel):
+    name: str = Field(..., min_length=2, max_length=100)
+    description: Optional[str] = Field(None, max_length=1000)
+
+    class Config:
+        extra = "forbid"
+
+
+class SegmentUpdateSchema(BaseModel):
+    name: Optional[str] = Field(None, min_length=2, max_length=100)
+    description: Optional[str] = Field(None, max_length=1000)
+
+    class Config:
+        extra = "forbid"
+
+
+class SegmentResponse(BaseModel):
+    uid: UUID
+    name: str
+    description: Optional[str]
+    member_count: int
+    created_by: UUID
+
+
+class SegmentMembershipSchema(BaseModel):
+    recipient_uids: List[UUID] = Field(..., min_length=1, max_length=10000)
+
+    class Config:
+        extra = "forbid"
+
+
+class SegmentMembershipResponse(BaseModel):
+    changed: int = Field(..., description="members actually added or removed")
+    member_count: int
+
+
+class SegmentMembersResponse(BaseModel):
+    recipient_uids: List[UUID]
+    next_after: Optional[UUID] = Field(
+        None, description="pass as after to fetch the next page"
+    )
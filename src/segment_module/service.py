@@ -0,0 +1,235 @@
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import any_, delete, func, literal, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.recipient_module.models import Recipient
+
+from .models import Segment, SegmentMember
+from .schema import (
+    SegmentMembershipResponse,
+    SegmentMembersResponse,
+    SegmentResponse,
+    SegmentSchema,
+    SegmentUpdateSchema,
+)
+
+
+def _segment_response(segment: Segment) -> SegmentResponse:
+    return SegmentResponse(
+        uid=segment.uid,
+        name=segment.name,
+        description=segment.description,
+        member_count=segment.member_count,
+        created_by=segment.created_by,
+    )
+
+
+def _uid_array(uids: Sequence[UUID]):
+    # one array parameter instead of one bind parameter per uid
+    return any_(literal(list(uids), pg.ARRAY(pg.UUID)))
+
+
+def add_members_statement(
+    segment_uid: UUID, recipient_uids: Sequence[UUID], owner_uid: UUID
+):
+    """
+    One statement that inserts the owner's recipients not yet in the segment
+    and bumps member_count by the number of rows actually inserted.
+    """
+    added = (
+        pg.insert(SegmentMember)
+        .from_select(
+            ["segment_uid", "recipient_uid", "added_at"],
+            select(literal(segment_uid, pg.UUID), Recipient.uid, func.now()).where(
+                Recipient.uid == _uid_array(recipient_uids),
+                Recipient.created_by == owner_uid,
+            ),
+        )
+        .on_conflict_do_nothing()
+        .returning(SegmentMember.recipient_uid)
+        .cte("added")
+    )
+    return _count_update(segment_uid, added, removed=False)
+
+
+def remove_members_statement(segment_uid: UUID, recipient_uids: Sequence[UUID]):
+    """Delete memberships and lower member_count by the rows actually deleted"""
+    removed = (
+        delete(SegmentMember)
+        .where(
+            SegmentMember.segment_uid == segment_uid,
+            SegmentMember.recipient_uid == _uid_array(recipient_uids),
+        )
+        .returning(SegmentMember.recipient_uid)
+        .cte("removed")
+    )
+    return _count_update(segment_uid, removed, removed=True)
+
+
+def _count_update(segment_uid: UUID, changed, removed: bool):
+    changed_count = select(func.count()).select_from(changed).scalar_subquery()
+    member_count = (
+        Segment.member_count - changed_count
+        if removed
+        else Segment.member_count + changed_count
+    )
+    return (
+        update(Segment)
+        .where(Segment.uid == segment_uid)
+        .values(member_count=member_count)
+        .returning(Segment.member_count, changed_count)
+        .add_cte(changed)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def forget_recipient(recipient_uid: UUID, session: AsyncSession):
+    """
+    Keep member counts right when a recipient is deleted; the membership rows
+    themselves go with the recipient through ON DELETE CASCADE.
+    """
+    await session.execute(
+        update(Segment)
+        .where(
+            Segment.uid.in_(
+                select(SegmentMember.segment_uid).where(
+                    SegmentMember.recipient_uid == recipient_uid
+                )
+            )
+        )
+        .values(member_count=Segment.member_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class SegmentService:
+    async def create_segment(
+        self, segment_schema: SegmentSchema, created_by: UUID, session: AsyncSession
+    ) -> Optional[SegmentResponse]:
+        try:
+            new_segment = Segment(**segment_schema.model_dump(), created_by=created_by)
+            session.add(new_segment)
+            await session.commit()
+            await session.refresh(new_segment)
+            return _segment_response(new_segment)
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def get_segment(
+        self, segment_uid: str, session: AsyncSession
+    ) -> Optional[Segment]:
+        UUID(str(segment_uid))
+        return await session.get(Segment, segment_uid)
+
+    async def retrieve_segment(
+        self, segment_uid: str, session: AsyncSession
+    ) -> Optional[SegmentResponse]:
+        segment = await self.get_segment(segment_uid, session)
+        if not segment:
+            return None
+        return _segment_response(segment)
+
+    async def retrieve_all_segments(
+        self, created_by: UUID, session: AsyncSession
+    ) -> List[SegmentResponse]:
+        statement = select(Segment).where(Segment.created_by == created_by)
+        result = await session.execute(statement)
+        return [_segment_response(segment) for segment in result.scalars().all()]
+
+    async def update_segment(
+        self,
+        segment_uid: str,
+        segment_schema: SegmentUpdateSchema,
+        session: AsyncSession,
+    ) -> Optional[SegmentResponse]:
+        try:
+            segment = await self.get_segment(segment_uid, session)
+            if not segment:
+                return None
+            for attribute, value in segment_schema.model_dump().items():
+                if value is not None:
+                    setattr(segment, attribute, value)
+            await session.commit()
+            await session.refresh(segment)
+            return _segment_response(segment)
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def delete_segment(
+        self, segment_uid: str, session: AsyncSession
+    ) -> Optional[bool]:
+        try:
+            segment = await self.get_segment(segment_uid, session)
+            if not segment:
+                return None
+            await session.delete(segment)
+            await session.commit()
+            return True
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def add_members(
+        self,
+        segment_uid: UUID,
+        recipient_uids: Sequence[UUID],
+        owner_uid: UUID,
+        session: AsyncSession,
+    ) -> SegmentMembershipResponse:
+        """Add recipients to a segment; unknown uids and existing members are skipped"""
+        try:
+            result = await session.execute(
+                add_members_statement(segment_uid, recipient_uids, owner_uid)
+            )
+            member_count, changed = result.one()
+            await session.commit()
+            return SegmentMembershipResponse(changed=changed, member_count=member_count)
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def remove_members(
+        self,
+        segment_uid: UUID,
+        recipient_uids: Sequence[UUID],
+        session: AsyncSession,
+    ) -> SegmentMembershipResponse:
+        try:
+            result = await session.execute(
+                remove_members_statement(segment_uid, recipient_uids)
+            )
+            member_count, changed = result.one()
+            await session.commit()
+            return SegmentMembershipResponse(changed=changed, member_count=member_count)
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def retrieve_members(
+        self,
+        segment_uid: UUID,
+        session: AsyncSession,
+        after: Optional[UUID] = None,
+        limit: int = 1000,
+    ) -> SegmentMembersResponse:
+        """Keyset-paginated member uids, read straight off the primary key index"""
+        statement = (
+            select(SegmentMember.recipient_uid)
+            .where(SegmentMember.segment_uid == segment_uid)
+            .order_by(SegmentMember.recipient_uid)
+            .limit(limit)
+        )
+        if after is not None:
+            statement = statement.where(SegmentMember.recipient_uid > after)
+        result = await session.execute(statement)
+        recipient_uids = list(result.scalars().all())
+        return SegmentMembersResponse(
+            recipient_uids=recipient_uids,
+            next_after=recipient_uids[-1] if len(recipient_uids) == limit else None,
+        )
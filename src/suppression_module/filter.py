@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import any_, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.config.env_data import Config
+from src.recipient_module.phone import normalize_phone_number
+
+from .bloom import BloomFilter
+from .models import Suppression
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_address(channel: str, address: str) -> str:
+    if channel == "email":
+        return address.strip().lower()
+    if channel == "sms":
+        # the E.164 form recipients' phone numbers are stored in
+        try:
+            return normalize_phone_number(address, Config.DEFAULT_PHONE_COUNTRY_CODE)
+        except ValueError:
+            pass
+    return "".join(address.split())
+
+
+def suppression_key(owner_uid: UUID, channel: str, address: str) -> str:
+    return f"{owner_uid}:{channel}:{address}"
+
+
+class SuppressionFilter:
+    """
+    Per-process Bloom filter of every suppressed (owner, channel, address).
+
+    A miss means the address is not suppressed and costs no database call;
+    only filter hits are confirmed with one exact query per batch. The filter
+    catches up from the suppressions table by seq at most every
+    refresh_interval seconds. Identity values are handed out before commit,
+    so a row can become visible after rows with a higher seq: every catch-up
+    reads the last overlap seqs again, and the filter is rebuilt from
+    scratch every rebuild_interval seconds (at twice the size when full) for
+    rows later still. Removed suppressions stay in the filter until the
+    next rebuild and are weeded out by the exact check. Callers arriving
+    while a catch-up runs wait for that one rather than starting their own.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        capacity: int = 1000000,
+        error_rate: float = 0.001,
+        refresh_interval: float = 5.0,
+        overlap: int = 1000,
+        rebuild_interval: float = 3600.0,
+        chunk_size: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.overlap = overlap
+        self.rebuild_interval = rebuild_interval
+        self.chunk_size = chunk_size
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.last_seq = 0
+        self._refreshed_at = float("-inf")
+        self._rebuilt_at = time.monotonic()
+        self._refreshing: Optional[asyncio.Future] = None
+        self.lookups = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+        self.suppressed_hits = 0
+
+    def stats(self) -> Dict[str, float]:
+        negatives = self.lookups - self.suppressed_hits
+        return {
+            "lookups": self.lookups,
+            "filter_hits": self.filter_hits,
+            "false_positives": self.false_positives,
+            "false_positive_rate": (
+                self.false_positives / negatives if negatives else 0.0
+            ),
+            "filter_items": len(self.bloom),
+            "filter_bytes": self.bloom.memory,
+            "last_seq": self.last_seq,
+        }
+
+    def add_local(self, rows: Iterable[Tuple[UUID, str, str]]):
+        """Add (owner, channel, address) rows this process just wrote"""
+        for owner_uid, channel, address in rows:
+            self.bloom.add(suppression_key(owner_uid, channel, address))
+
+    async def _load(self, bloom: BloomFilter, after_seq: int) -> int:
+        async with self.session_factory() as session:
+            while True:
+                result = await session.execute(
+                    select(
+                        Suppression.seq,
+                        Suppression.owner_uid,
+                        Suppression.channel,
+                        Suppression.address,
+                    )
+                    .where(Suppression.seq > after_seq)
+                    .order_by(Suppression.seq)
+                    .limit(self.chunk_size)
+                )
+                rows = result.all()
+                for _, owner_uid, channel, address in rows:
+                    key = suppression_key(owner_uid, channel, address)
+                    # rows of the overlap are read again, count them once
+                    if key not in bloom:
+                        bloom.add(key)
+                if rows:
+                    after_seq = rows[-1][0]
+                if len(rows) < self.chunk_size:
+                    return after_seq
+
+    async def _refresh(self):
+        now = time.monotonic()
+        if self.bloom.full or now - self._rebuilt_at >= self.rebuild_interval:
+            capacity = self.bloom.capacity * (2 if self.bloom.full else 1)
+            bloom = BloomFilter(capacity, self.error_rate)
+            last_seq = await self._load(bloom, 0)
+            self.bloom, self.last_seq = bloom, last_seq
+            self._rebuilt_at = now
+            logger.info("Suppression filter rebuilt for %d entries", bloom.capacity)
+        else:
+            self.last_seq = await self._load(
+                self.bloom, max(self.last_seq - self.overlap, 0)
+            )
+        self._refreshed_at = now
+
+    async def refresh(self):
+        """Catch up with the suppressions table, joining a catch-up in flight"""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._refresh())
+        # a cancelled caller leaves the catch-up to the others
+        await asyncio.shield(self._refreshing)
+
+    async def refresh_if_stale(self):
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            await self.refresh()
+
+    async def suppressed(
+        self, owner_uid: UUID, channel: str, addresses: Iterable[str]
+    ) -> Set[str]:
+        """
+        Returns:
+            The given addresses that are suppressed for owner_uid on channel
+        """
+        await self.refresh_if_stale()
+        normalized: Dict[str, List[str]] = {}
+        for address in addresses:
+            normalized.setdefault(normalize_address(channel, address), []).append(
+                address
+            )
+        self.lookups += len(normalized)
+        hits = [
+            address
+            for address in normalized
+            if suppression_key(owner_uid, channel, address) in self.bloom
+        ]
+        if not hits:
+            return set()
+        self.filter_hits += len(hits)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Suppression.address).where(
+                    Suppression.owner_uid == owner_uid,
+                    Suppression.channel == channel,
+                    Suppression.address == any_(literal(hits, pg.ARRAY(pg.TEXT))),
+                )
+            )
+            confirmed = set(result.scalars().all())
+        self.suppressed_hits += len(confirmed)
+        self.false_positives += len(hits) - len(confirmed)
+        return {original for address in confirmed for original in normalized[address]}
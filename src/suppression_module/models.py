@@ -0,0 +1,23 @@
+from datetime import datetime
+from uuid import UUID
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlmodel import Column, Field, Identity, SQLModel, UniqueConstraint
+
+
+class Suppression(SQLModel, table=True):
+    """
+    An address that must not be sent to on a channel, per owner. seq only
+    grows, so reading rows above the last seen seq is the change feed the
+    per-worker filters catch up from.
+    """
+
+    __tablename__ = "suppressions"
+    __table_args__ = (UniqueConstraint("owner_uid", "channel", "address"),)
+
+    seq: int = Field(sa_column=Column(pg.BIGINT, Identity(), primary_key=True))
+    owner_uid: UUID = Field(sa_column=Column(pg.UUID, nullable=False))
+    channel: str = Field(max_length=30)
+    address: str = Field(max_length=320)
+    reason: str = Field(max_length=30, default="unsubscribed")
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
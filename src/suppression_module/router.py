@@ -0,0 +1,83 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.authentication.auth import AdminRoleChecker, get_current_active_user
+from src.database.db import get_session
+
+from .schema import (
+    SuppressionBatchSchema,
+    SuppressionChangeResponse,
+    SuppressionRemoveSchema,
+    SuppressionResponse,
+)
+from .service import SuppressionService
+
+admin_role = AdminRoleChecker()
+
+suppression_router = APIRouter(tags=["Suppression List"], prefix="/suppressions")
+
+
+@suppression_router.post(
+    "/", response_model=SuppressionChangeResponse, status_code=status.HTTP_201_CREATED
+)
+async def add_suppressions(
+    suppression_payload: SuppressionBatchSchema,
+    suppression_service: SuppressionService = Depends(SuppressionService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> SuppressionChangeResponse:
+    try:
+        return await suppression_service.add_suppressions(
+            suppressions=suppression_payload.suppressions,
+            owner_uid=current_user.uid,
+            session=session,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@suppression_router.get(
+    "/", response_model=List[SuppressionResponse], status_code=status.HTTP_200_OK
+)
+async def retrieve_suppressions(
+    channel: Optional[str] = None,
+    after_seq: int = Query(0, ge=0, description="last seq of the previous page"),
+    limit: int = Query(1000, ge=1, le=10000),
+    suppression_service: SuppressionService = Depends(SuppressionService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> List[SuppressionResponse]:
+    try:
+        return await suppression_service.retrieve_suppressions(
+            owner_uid=current_user.uid,
+            session=session,
+            channel=channel,
+            after_seq=after_seq,
+            limit=limit,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@suppression_router.post(
+    "/remove", response_model=SuppressionChangeResponse, status_code=status.HTTP_200_OK
+)
+async def remove_suppressions(
+    suppression_payload: SuppressionRemoveSchema,
+    suppression_service: SuppressionService = Depends(SuppressionService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> SuppressionChangeResponse:
+    try:
+        return await suppression_service.remove_suppressions(
+            suppressions=suppression_payload.suppressions,
+            owner_uid=current_user.uid,
+            session=session,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,52 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SuppressionReason(str, Enum):
+    UNSUBSCRIBED = "unsubscribed"
+    BOUNCED = "bounced"
+    COMPLAINED = "complained"
+    MANUAL = "manual"
+
+
+class SuppressionKeySchema(BaseModel):
+    channel: str = Field(..., min_length=2, max_length=30, description="channel name")
+    address: str = Field(..., min_length=1, max_length=320)
+
+    class Config:
+        extra = "forbid"
+
+
+class SuppressionSchema(SuppressionKeySchema):
+    reason: SuppressionReason = SuppressionReason.UNSUBSCRIBED
+
+
+class SuppressionBatchSchema(BaseModel):
+    suppressions: List[SuppressionSchema] = Field(..., min_length=1, max_length=10000)
+
+    class Config:
+        extra = "forbid"
+
+
+class SuppressionRemoveSchema(BaseModel):
+    suppressions: List[SuppressionKeySchema] = Field(
+        ..., min_length=1, max_length=10000
+    )
+
+    class Config:
+        extra = "forbid"
+
+
+class SuppressionResponse(BaseModel):
+    seq: int
+    channel: str
+    address: str
+    reason: str
+    created_at: Optional[datetime]
+
+
+class SuppressionChangeResponse(BaseModel):
+    changed: int = Field(..., description="suppressions actually added or removed")
@@ -0,0 +1,120 @@
+from typing import List, Optional
+from uuid import UUID
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.config.env_data import Config
+from src.database.db import async_session
+
+from .filter import SuppressionFilter, normalize_address
+from .models import Suppression
+from .schema import (
+    SuppressionChangeResponse,
+    SuppressionKeySchema,
+    SuppressionResponse,
+    SuppressionSchema,
+)
+
+suppression_filter = SuppressionFilter(
+    async_session,
+    capacity=Config.SUPPRESSION_FILTER_CAPACITY,
+    error_rate=Config.SUPPRESSION_FILTER_ERROR_RATE,
+    refresh_interval=Config.SUPPRESSION_REFRESH_INTERVAL,
+    overlap=Config.SUPPRESSION_REFRESH_OVERLAP,
+    rebuild_interval=Config.SUPPRESSION_REBUILD_INTERVAL,
+)
+
+
+def _suppression_response(suppression: Suppression) -> SuppressionResponse:
+    return SuppressionResponse(
+        seq=suppression.seq,
+        channel=suppression.channel,
+        address=suppression.address,
+        reason=suppression.reason,
+        created_at=suppression.created_at,
+    )
+
+
+class SuppressionService:
+    async def add_suppressions(
+        self,
+        suppressions: List[SuppressionSchema],
+        owner_uid: UUID,
+        session: AsyncSession,
+    ) -> SuppressionChangeResponse:
+        """Suppress addresses; addresses already suppressed are left as they are"""
+        try:
+            rows = {
+                (entry.channel, normalize_address(entry.channel, entry.address)): {
+                    "owner_uid": owner_uid,
+                    "channel": entry.channel,
+                    "address": normalize_address(entry.channel, entry.address),
+                    "reason": entry.reason.value,
+                }
+                for entry in suppressions
+            }
+            result = await session.execute(
+                pg.insert(Suppression)
+                .values(list(rows.values()))
+                .on_conflict_do_nothing()
+                .returning(Suppression.channel, Suppression.address)
+            )
+            added = result.all()
+            await session.commit()
+            suppression_filter.add_local(
+                (owner_uid, channel, address) for channel, address in added
+            )
+            return SuppressionChangeResponse(changed=len(added))
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def remove_suppressions(
+        self,
+        suppressions: List[SuppressionKeySchema],
+        owner_uid: UUID,
+        session: AsyncSession,
+    ) -> SuppressionChangeResponse:
+        try:
+            result = await session.execute(
+                delete(Suppression).where(
+                    Suppression.owner_uid == owner_uid,
+                    or_(
+                        *(
+                            (Suppression.channel == entry.channel)
+                            & (
+                                Suppression.address
+                                == normalize_address(entry.channel, entry.address)
+                            )
+                            for entry in suppressions
+                        )
+                    ),
+                )
+            )
+            await session.commit()
+            return SuppressionChangeResponse(changed=result.rowcount)
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def retrieve_suppressions(
+        self,
+        owner_uid: UUID,
+        session: AsyncSession,
+        channel: Optional[str] = None,
+        after_seq: int = 0,
+        limit: int = 1000,
+    ) -> List[SuppressionResponse]:
+        statement = (
+            select(Suppression)
+            .where(Suppression.owner_uid == owner_uid, Suppression.seq > after_seq)
+            .order_by(Suppression.seq)
+            .limit(limit)
+        )
+        if channel:
+            statement = statement.where(Suppression.channel == channel)
+        result = await session.execute(statement)
+        return [_suppression_response(row) for row in result.scalars().all()]
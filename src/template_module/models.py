@@ -0,0 +1,27 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import sqlalchemy.dialects.postgresql as pg
+from sqlmodel import Column, Field, SQLModel
+
+
+class NotificationTemplate(SQLModel, table=True):
+    __tablename__ = "notification_templates"
+
+    uid: UUID = Field(
+        sa_column=Column(pg.UUID, primary_key=True, default=lambda: uuid4(), index=True)
+    )
+    name: str = Field(max_length=100)
+    channel: str = Field(max_length=30)
+    subject: str = Field(sa_column=Column(pg.TEXT, nullable=True))
+    body: str = Field(sa_column=Column(pg.TEXT, nullable=False))
+    version: int = Field(default=1)
+    created_by: UUID = Field(sa_column=Column(pg.UUID, index=True))
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    updated_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now)
+    )
+
+    def cache_key(self, part: str) -> str:
+        """Name of one compiled part (subject/body) of this template version"""
+        return f"{self.uid}:{self.version}:{part}"
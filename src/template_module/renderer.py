@@ -0,0 +1,171 @@
+import asyncio
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from jinja2 import (
+    BaseLoader,
+    FileSystemBytecodeCache,
+    StrictUndefined,
+    TemplateNotFound,
+)
+from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+# (compiled template name, template source) for each part of a notification
+TemplateParts = Dict[str, Tuple[str, str]]
+Rendered = Dict[str, str]
+
+
+class VersionedTemplateLoader(BaseLoader):
+    """
+    Loader serving template sources registered in memory. Names embed the
+    template version, so a loaded template never goes stale. Sources are
+    kept in an LRU as large as the environment's template cache; renders
+    register their sources again, so an evicted one is simply added back.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self.sources: "OrderedDict[str, str]" = OrderedDict()
+
+    def add(self, name: str, source: str):
+        self.sources[name] = source
+        self.sources.move_to_end(name)
+        # sizes jinja2 treats specially (0 no cache, -1 unbounded) keep all
+        if 0 < self.max_size < len(self.sources):
+            self.sources.popitem(last=False)
+
+    def get_source(self, environment, template: str):
+        source = self.sources.get(template)
+        if source is None:
+            raise TemplateNotFound(template)
+        return source, None, lambda: True
+
+
+class TemplateRenderer:
+    """
+    Renders notification templates, compiling each template version once.
+
+    Compiled templates are kept in the jinja2 environment's LRU cache and the
+    generated bytecode is written to cache_dir, so other processes (and
+    restarts) load the bytecode instead of compiling the source again.
+    Templates are user supplied and run in a sandbox.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, cache_size: int = 1000):
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.loader = VersionedTemplateLoader(max_size=cache_size)
+        bytecode_cache = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        self.environment = ImmutableSandboxedEnvironment(
+            loader=self.loader,
+            bytecode_cache=bytecode_cache,
+            cache_size=cache_size,
+            undefined=StrictUndefined,
+            auto_reload=False,
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def register(self, parts: TemplateParts):
+        for name, source in parts.values():
+            self.loader.add(name, source)
+
+    def render(self, parts: TemplateParts, context: Dict[str, Any]) -> Rendered:
+        self.register(parts)
+        return {
+            part: self.environment.get_template(name).render(context)
+            for part, (name, _) in parts.items()
+        }
+
+    def render_batch(
+        self, parts: TemplateParts, contexts: Iterable[Dict[str, Any]]
+    ) -> List[Rendered]:
+        """Render one template for many recipients in the current process"""
+        self.register(parts)
+        templates = [
+            (part, self.environment.get_template(name))
+            for part, (name, _) in parts.items()
+        ]
+        return [
+            {part: template.render(context) for part, template in templates}
+            for context in contexts
+        ]
+
+    def executor(self, processes: Optional[int] = None) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=processes or os.cpu_count(),
+                initializer=_init_worker,
+                initargs=(self.cache_dir, self.cache_size),
+            )
+        return self._executor
+
+    async def render_batch_parallel(
+        self,
+        parts: TemplateParts,
+        contexts: Sequence[Dict[str, Any]],
+        chunk_size: int = 5000,
+        processes: Optional[int] = None,
+    ) -> List[Rendered]:
+        """
+        Render a large campaign across a process pool, in chunks of
+        chunk_size recipients. Small batches are rendered in-process.
+        """
+        if len(contexts) <= chunk_size:
+            return self.render_batch(parts, contexts)
+        # compile once here so the workers find the bytecode on disk
+        self.register(parts)
+        for name, _ in parts.values():
+            self.environment.get_template(name)
+        loop = asyncio.get_running_loop()
+        executor = self.executor(processes)
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor, _render_chunk, parts, contexts[start : start + chunk_size]
+                )
+                for start in range(0, len(contexts), chunk_size)
+            )
+        )
+        return [rendered for chunk in chunks for rendered in chunk]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+_worker_renderer: Optional[TemplateRenderer] = None
+
+
+def _init_worker(cache_dir: Optional[str], cache_size: int):
+    global _worker_renderer  # pylint: disable=global-statement
+    _worker_renderer = TemplateRenderer(cache_dir=cache_dir, cache_size=cache_size)
+
+
+def _render_chunk(
+    parts: TemplateParts, contexts: Sequence[Dict[str, Any]]
+) -> List[Rendered]:
+    return _worker_renderer.render_batch(parts, contexts)
+
+
+def recipient_context(
+    recipient, variables: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Template variables for a recipient, any extra variables take precedence"""
+    context = {
+        "uid": str(recipient.uid),
+        "first_name": recipient.first_name,
+        "last_name": recipient.last_name,
+        "email": recipient.email,
+        "phone_number": recipient.phone_number,
+        "timezone": recipient.timezone,
+        "locale": recipient.locale,
+    }
+    if variables:
+        context.update(variables)
+    return context
@@ -0,0 +1,164 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.authentication.auth import AdminRoleChecker, get_current_active_user
+from src.database.db import get_session
+
+from .schema import (
+    RenderedTemplateResponse,
+    TemplatePreviewSchema,
+    TemplateResponse,
+    TemplateSchema,
+    TemplateUpdateSchema,
+)
+from .service import TemplateService
+
+admin_role = AdminRoleChecker()
+
+template_router = APIRouter(tags=["Template Management"], prefix="/templates")
+
+
+async def _owned_template(
+    template_uid: str,
+    template_service: TemplateService,
+    session: AsyncSession,
+    current_user,
+):
+    template = await template_service.retrieve_template(template_uid, session)
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Template Does not exist"
+        )
+    if template.created_by != current_user.uid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="You are not allowed to view this resource",
+        )
+    return template
+
+
+@template_router.post(
+    "/", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_new_template(
+    template_payload: TemplateSchema,
+    template_service: TemplateService = Depends(TemplateService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[TemplateResponse]:
+    try:
+        return await template_service.create_template(
+            template_schema=template_payload,
+            created_by=current_user.uid,
+            session=session,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@template_router.get(
+    "/", response_model=List[TemplateResponse], status_code=status.HTTP_200_OK
+)
+async def retrieve_all_templates(
+    template_service: TemplateService = Depends(TemplateService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> List[TemplateResponse]:
+    try:
+        return await template_service.retrieve_all_templates(
+            created_by=current_user.uid, session=session
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@template_router.get(
+    "/{template_uid}", response_model=TemplateResponse, status_code=status.HTTP_200_OK
+)
+async def retrieve_template(
+    template_uid: str,
+    template_service: TemplateService = Depends(TemplateService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[TemplateResponse]:
+    try:
+        return await _owned_template(
+            template_uid, template_service, session, current_user
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@template_router.patch(
+    "/{template_uid}", response_model=TemplateResponse, status_code=status.HTTP_200_OK
+)
+async def update_template(
+    template_uid: str,
+    template_payload: TemplateUpdateSchema,
+    template_service: TemplateService = Depends(TemplateService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[TemplateResponse]:
+    try:
+        await _owned_template(template_uid, template_service, session, current_user)
+        return await template_service.update_template(
+            template_uid=template_uid,
+            template_schema=template_payload,
+            session=session,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@template_router.delete("/{template_uid}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_template(
+    template_uid: str,
+    template_service: TemplateService = Depends(TemplateService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+):
+    try:
+        await _owned_template(template_uid, template_service, session, current_user)
+        await template_service.delete_template(template_uid, session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@template_router.post(
+    "/{template_uid}/preview",
+    response_model=RenderedTemplateResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def preview_template(
+    template_uid: str,
+    preview_payload: TemplatePreviewSchema,
+    template_service: TemplateService = Depends(TemplateService),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_active_user),
+    admin_user: AdminRoleChecker = Depends(admin_role),
+) -> Optional[RenderedTemplateResponse]:
+    try:
+        await _owned_template(template_uid, template_service, session, current_user)
+        return await template_service.render_template(
+            template_uid,
+            session,
+            recipient_uid=preview_payload.recipient_uid,
+            variables=preview_payload.variables,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
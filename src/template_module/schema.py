@@ -0,0 +1,47 @@
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class TemplateSchema(BaseModel):
+    name: str = Field(..., min_length=2, max_length=100)
+    channel: str = Field(
+        ..., min_length=2, max_length=30, description="delivery channel"
+    )
+    subject: Optional[str] = Field(None, description="jinja2 subject template")
+    body: str = Field(..., min_length=1, description="jinja2 body template")
+
+    class Config:
+        extra = "forbid"
+
+
+class TemplateUpdateSchema(BaseModel):
+    name: Optional[str] = Field(None, min_length=2, max_length=100)
+    subject: Optional[str] = Field(None, description="jinja2 subject template")
+    body: Optional[str] = Field(None, min_length=1, description="jinja2 body template")
+
+    class Config:
+        extra = "forbid"
+
+
+class TemplateResponse(BaseModel):
+    uid: UUID
+    name: str
+    channel: str
+    subject: Optional[str]
+    body: str
+    version: int
+    created_by: UUID
+
+
+class TemplatePreviewSchema(BaseModel):
+    recipient_uid: Optional[UUID] = None
+    variables: Dict[str, Any] = Field(default_factory=dict)
+
+
+class RenderedTemplateResponse(BaseModel):
+    template_uid: UUID
+    version: int
+    subject: Optional[str]
+    body: str
@@ -0,0 +1,174 @@
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from jinja2 import TemplateError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.config.env_data import Config
+from src.recipient_module.models import Recipient
+
+from .models import NotificationTemplate
+from .renderer import Rendered, TemplateParts, TemplateRenderer, recipient_context
+from .schema import (
+    RenderedTemplateResponse,
+    TemplateResponse,
+    TemplateSchema,
+    TemplateUpdateSchema,
+)
+
+template_renderer = TemplateRenderer(
+    cache_dir=Config.TEMPLATE_CACHE_DIR, cache_size=Config.TEMPLATE_CACHE_SIZE
+)
+
+
+def template_parts(template: NotificationTemplate) -> TemplateParts:
+    parts = {"body": (template.cache_key("body"), template.body)}
+    if template.subject:
+        parts["subject"] = (template.cache_key("subject"), template.subject)
+    return parts
+
+
+def _template_response(template: NotificationTemplate) -> TemplateResponse:
+    return TemplateResponse(
+        uid=template.uid,
+        name=template.name,
+        channel=template.channel,
+        subject=template.subject,
+        body=template.body,
+        version=template.version,
+        created_by=template.created_by,
+    )
+
+
+class TemplateService:
+    def _validate(self, template: NotificationTemplate):
+        """Compile the template once so syntax errors surface at write time"""
+        try:
+            template_renderer.register(template_parts(template))
+            for name, _ in template_parts(template).values():
+                template_renderer.environment.get_template(name)
+        except TemplateError as e:
+            raise ValueError(f"Invalid template: {e}") from e
+
+    async def create_template(
+        self, template_schema: TemplateSchema, created_by: UUID, session: AsyncSession
+    ) -> Optional[TemplateResponse]:
+        try:
+            new_template = NotificationTemplate(
+                **template_schema.model_dump(), created_by=created_by
+            )
+            session.add(new_template)
+            await session.flush()
+            self._validate(new_template)
+            await session.commit()
+            await session.refresh(new_template)
+            return _template_response(new_template)
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def get_template(
+        self, template_uid: str, session: AsyncSession
+    ) -> Optional[NotificationTemplate]:
+        UUID(str(template_uid))
+        return await session.get(NotificationTemplate, template_uid)
+
+    async def retrieve_template(
+        self, template_uid: str, session: AsyncSession
+    ) -> Optional[TemplateResponse]:
+        template = await self.get_template(template_uid, session)
+        if not template:
+            return None
+        return _template_response(template)
+
+    async def retrieve_all_templates(
+        self, created_by: UUID, session: AsyncSession
+    ) -> List[TemplateResponse]:
+        statement = select(NotificationTemplate).where(
+            NotificationTemplate.created_by == created_by
+        )
+        result = await session.execute(statement)
+        return [_template_response(template) for template in result.scalars().all()]
+
+    async def update_template(
+        self,
+        template_uid: str,
+        template_schema: TemplateUpdateSchema,
+        session: AsyncSession,
+    ) -> Optional[TemplateResponse]:
+        """Update a template; content changes create a new version"""
+        try:
+            template = await self.get_template(template_uid, session)
+            if not template:
+                return None
+            content_changed = False
+            for attribute, value in template_schema.model_dump().items():
+                if value is not None and getattr(template, attribute) != value:
+                    setattr(template, attribute, value)
+                    content_changed = content_changed or attribute != "name"
+            if content_changed:
+                template.version += 1
+                self._validate(template)
+            await session.commit()
+            await session.refresh(template)
+            return _template_response(template)
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def delete_template(
+        self, template_uid: str, session: AsyncSession
+    ) -> Optional[bool]:
+        try:
+            template = await self.get_template(template_uid, session)
+            if not template:
+                return None
+            await session.delete(template)
+            await session.commit()
+            return True
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def render_template(
+        self,
+        template_uid: str,
+        session: AsyncSession,
+        recipient_uid: Optional[UUID] = None,
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> Optional[RenderedTemplateResponse]:
+        template = await self.get_template(template_uid, session)
+        if not template:
+            return None
+        context = dict(variables or {})
+        if recipient_uid:
+            recipient = await session.get(Recipient, recipient_uid)
+            if not recipient:
+                raise ValueError("Recipient does not exist")
+            context = recipient_context(recipient, variables)
+        try:
+            rendered = template_renderer.render(template_parts(template), context)
+        except TemplateError as e:
+            raise ValueError(f"Template rendering failed: {e}") from e
+        return RenderedTemplateResponse(
+            template_uid=template.uid,
+            version=template.version,
+            subject=rendered.get("subject"),
+            body=rendered["body"],
+        )
+
+    async def render_for_recipients(
+        self,
+        template: NotificationTemplate,
+        recipients: Sequence[Recipient],
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> List[Rendered]:
+        """Render a template for a batch of recipients, using the process pool for big batches"""
+        contexts = [recipient_context(recipient, variables) for recipient in recipients]
+        return await template_renderer.render_batch_parallel(
+            template_parts(template),
+            contexts,
+            chunk_size=Config.TEMPLATE_RENDER_CHUNK_SIZE,
+            processes=Config.TEMPLATE_RENDER_PROCESSES or None,
+        )
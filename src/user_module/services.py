@@ -5,10 +5,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from src.authentication.auth_utils import get_password_hash, verify_password
+from src.core.event.bus import emit_after_commit
+from src.core.event.events import UserCreated
 
 from .model import Role, User
-from .schema import (RoleResponse, RoleSchema, UserResponse, UserRoleSchema,
-                     UserSchema, UserUpdateSchema)
+from .schema import (
+    RoleResponse,
+    RoleSchema,
+    UserResponse,
+    UserRoleSchema,
+    UserSchema,
+    UserUpdateSchema,
+)
 
 
 class RoleService:
@@ -81,6 +89,10 @@ class UserService:
             new_user_data = new_user_schema.model_dump()
             new_user = User(**new_user_data)
             session.add(new_user)
+            emit_after_commit(
+                session,
+                lambda: UserCreated(user_uid=new_user.uid, email=new_user.email),
+            )
             await session.commit()
             await session.refresh(new_user)
             user_response = UserResponse(
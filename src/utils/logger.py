@@ -0,0 +1,311 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+from uuid import uuid4
+
+correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+CORRELATION_HEADER = b"x-request-id"
+# ids accepted from the client, anything else is replaced by a fresh one
+_VALID_CORRELATION_ID = re.compile(r"[\w.:\-]{1,128}")
+
+# attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "correlation_id",
+    "taskName",
+}
+
+# records written at once by the listener
+WRITE_BATCH_SIZE = 1000
+
+# json.dumps(default=) builds a new encoder per call
+_encode_json = json.JSONEncoder(default=str).encode
+
+TEXT_FORMAT = (
+    "%(asctime)s %(processName)s[%(process)d] %(levelname)s %(name)s: %(message)s"
+)
+
+
+def get_correlation_id() -> Optional[str]:
+    return correlation_id.get()
+
+
+@contextmanager
+def correlation_scope(value: Optional[str]):
+    """Log with the given correlation id inside the block"""
+    token = correlation_id.set(value)
+    try:
+        yield value
+    finally:
+        correlation_id.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the extra= fields of the call"""
+
+    def __init__(self):
+        super().__init__()
+        self._second = -1
+        self._timestamp = ""
+
+    def timestamp(self, record: logging.LogRecord) -> str:
+        # strftime once a second, the listener thread is the only caller
+        second = int(record.created)
+        if second != self._second:
+            self._second = second
+            self._timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self._timestamp}.{int(record.msecs):03d}Z"
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.timestamp(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "correlation_id", None):
+            entry["correlation_id"] = record.correlation_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return _encode_json(entry)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain lines for a terminal, the correlation id appended when there is one"""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        if getattr(record, "correlation_id", None):
+            return f"{message} [{record.correlation_id}]"
+        return message
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keeps a sample_rate share of DEBUG records, everything above passes.
+    Requests are sampled whole: all the debug lines of a correlation id are
+    kept or none, so a sampled request can still be followed end to end.
+    """
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self._threshold = int(sample_rate * 2**32)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.sample_rate >= 1:
+            return True
+        request = correlation_id.get()
+        if request is not None:
+            return zlib.crc32(request.encode()) < self._threshold
+        return random.random() < self.sample_rate
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread as they are: formatting (message
+    args included) and writing happen there, off the event loop. Args are
+    therefore formatted a little later, pass values rather than objects that
+    change right after the call. Past max_size queued records new ones are
+    dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, max_size: int = 0):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # the queue is thread safe, no need for the handler lock
+        if not self.filter(record):
+            return False
+        self.enqueue(self.prepare(record))
+        return True
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the context is gone once the call returns, the record keeps the id
+        record.correlation_id = correlation_id.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.max_size and self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+class LogQueueListener(QueueListener):
+    """
+    Writes what is queued in batches: one write and flush per stream for
+    all the records waiting, rather than a wakeup and a write per record.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, *handlers: logging.StreamHandler):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+
+    def _monitor(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not self._sentinel]
+            for handler in self.handlers:
+                self._write(handler, records)
+            if len(records) < len(batch):
+                return
+
+    def _write(self, handler: logging.StreamHandler, records):
+        lines = []
+        for record in records:
+            if record.levelno < handler.level or not handler.filter(record):
+                continue
+            try:
+                lines.append(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+        if not lines:
+            return
+        with handler.lock:
+            try:
+                handler.stream.write("".join(lines))
+                handler.flush()
+            except Exception:
+                handler.handleError(records[-1])
+
+
+_handler: Optional[LogQueueHandler] = None
+_listener: Optional[LogQueueListener] = None
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "json",
+    debug_sample_rate: float = 1.0,
+    queue_size: int = 10000,
+    stream: Optional[TextIO] = None,
+) -> LogQueueHandler:
+    """
+    Route every log record, uvicorn's included, through a queue to a
+    listener thread writing to stream (stderr by default).
+
+    Args:
+        level: Root log level
+        fmt: "json" for one JSON object per line, "text" for plain lines
+        debug_sample_rate: Share of DEBUG records kept, see DebugSampler
+        queue_size: Records buffered before new ones are dropped, 0 for no limit
+        stream: Where the records are written
+    Returns:
+        The queue handler, its dropped attribute counts lost records
+    """
+    global _handler, _listener
+    stop_logging()
+    if fmt not in ("json", "text"):
+        raise ValueError(f"Unknown log format: {fmt}")
+    # skip collecting what neither format prints, the caller pays for it on
+    # every record: the source line (and stack_info with it), the thread and
+    # the multiprocessing process name
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logMultiprocessing = fmt == "text"
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if fmt == "json" else TextFormatter(TEXT_FORMAT)
+    )
+    _handler = LogQueueHandler(queue.SimpleQueue(), queue_size)
+    if debug_sample_rate < 1:
+        _handler.addFilter(DebugSampler(debug_sample_rate))
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(level)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    _listener = LogQueueListener(_handler.queue, output)
+    _listener.start()
+    return _handler
+
+
+def stop_logging():
+    """Write out the queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    """
+    A forked child gets the queue but not the listener thread; it starts its
+    own, on a fresh queue since the old one's lock may have been held at the
+    time of the fork.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _handler.queue = queue.SimpleQueue()
+    _listener = LogQueueListener(_handler.queue, *_listener.handlers)
+    _listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(stop_logging)
+
+
+class CorrelationIdMiddleware:
+    """
+    Gives every request a correlation id: the client's X-Request-ID when it
+    is a sane one, a fresh id otherwise. It is set in a contextvar for the
+    whole request, so the services' log records carry it, and echoed in the
+    response header. Plain ASGI rather than BaseHTTPMiddleware, which runs
+    the endpoint in another task.
+    """
+
+    def __init__(self, app, header: bytes = CORRELATION_HEADER):
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == self.header:
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None or not _VALID_CORRELATION_ID.fullmatch(request_id):
+            request_id = uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (self.header, request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        with correlation_scope(request_id):
+            await self.app(scope, receive, send_with_id)
@@ -0,0 +1,63 @@
+from typing import Dict, Generic, Iterable, Iterator, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+# key of a node's own value, next to its children keyed by character
+_VALUE = None
+
+
+class PrefixTrie(Generic[V]):
+    """
+    Longest-prefix match over strings, in O(length of the key): one dict
+    hop per character, whatever the number of prefixes stored.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, V]] = ()):
+        self.root: Dict = {}
+        self.size = 0
+        for prefix, value in items:
+            self.insert(prefix, value)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def insert(self, prefix: str, value: V):
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if _VALUE not in node:
+            self.size += 1
+        node[_VALUE] = value
+
+    def longest_prefix(self, key: str) -> Tuple[str, Optional[V]]:
+        """The longest stored prefix of key and its value, ("", None) if none"""
+        node = self.root
+        found, value = -1, node.get(_VALUE)
+        for index, char in enumerate(key):
+            node = node.get(char)
+            if node is None:
+                break
+            if _VALUE in node:
+                found, value = index, node[_VALUE]
+        return key[: found + 1], value
+
+    def get(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        """Value of the longest stored prefix of key"""
+        node = self.root
+        value = node.get(_VALUE, default)
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+            value = node.get(_VALUE, value)
+        return value
+
+    def items(self) -> Iterator[Tuple[str, V]]:
+        stack = [("", self.root)]
+        while stack:
+            prefix, node = stack.pop()
+            if _VALUE in node:
+                yield prefix, node[_VALUE]
+            for char, child in node.items():
+                if char is not _VALUE:
+                    stack.append((prefix + char, child))
@@ -0,0 +1,67 @@
+"""
+Dispatch workers, run apart from the API:
+
+    python -m src.worker --processes 4
+    python -m src.worker --list
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+
+from src.core.config.env_data import Config
+from src.database.redis_client import get_redis
+from src.utils.logger import configure_logging
+
+from .registry import WorkerRegistry
+from .supervisor import Supervisor, run_worker
+
+
+async def list_workers():
+    redis = get_redis()
+    try:
+        registry = WorkerRegistry(redis, ttl=Config.WORKER_HEARTBEAT_TTL)
+        for worker in await registry.workers():
+            print(json.dumps(worker))
+    finally:
+        await redis.close(close_connection_pool=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.worker")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=Config.WORKER_PROCESSES or os.cpu_count() or 1,
+        help="worker processes to fork (WORKER_PROCESSES, default one per CPU)",
+    )
+    parser.add_argument(
+        "--no-uvloop", action="store_true", help="use the default asyncio event loop"
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="print the live workers and exit"
+    )
+    args = parser.parse_args()
+    configure_logging(
+        Config.LOG_LEVEL,
+        Config.LOG_FORMAT,
+        debug_sample_rate=Config.LOG_DEBUG_SAMPLE_RATE,
+        queue_size=Config.LOG_QUEUE_SIZE,
+    )
+    if args.list:
+        asyncio.run(list_workers())
+        return
+    Supervisor(
+        args.processes,
+        functools.partial(
+            run_worker, use_uvloop=Config.WORKER_UVLOOP and not args.no_uvloop
+        ),
+        drain_timeout=Config.WORKER_DRAIN_TIMEOUT,
+        backoff_max=Config.WORKER_RESTART_BACKOFF_MAX,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
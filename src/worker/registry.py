@@ -0,0 +1,89 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+WORKER_REGISTRY_KEY = "workers"
+
+
+class WorkerRegistry:
+    """
+    Live dispatch workers in Redis: a ZSET of worker ids scored by their
+    last heartbeat, plus a hash per worker with its pid, host and counters
+    that expires when the worker stops beating.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        ttl: float = 15.0,
+        prefix: str = WORKER_REGISTRY_KEY,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def key(self, worker_id: str) -> str:
+        return f"{self.prefix}:{worker_id}"
+
+    async def beat(self, worker_id: str, info: Dict[str, Any]):
+        now = time.time()
+        state = {
+            name: value if isinstance(value, (str, int, float)) else json.dumps(value)
+            for name, value in info.items()
+        }
+        state["heartbeat_at"] = now
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(self.key(worker_id), mapping=state)
+            pipe.pexpire(self.key(worker_id), int(self.ttl * 1000))
+            pipe.zadd(self.prefix, {worker_id: now})
+            pipe.zremrangebyscore(self.prefix, "-inf", now - self.ttl)
+            await pipe.execute()
+
+    async def remove(self, worker_id: str):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(self.key(worker_id))
+            pipe.zrem(self.prefix, worker_id)
+            await pipe.execute()
+
+    async def workers(self) -> List[Dict[str, str]]:
+        """Workers that beat within ttl, each with its id and last state"""
+        worker_ids = await self.redis.zrangebyscore(
+            self.prefix, time.time() - self.ttl, "+inf"
+        )
+        if not worker_ids:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for worker_id in worker_ids:
+                pipe.hgetall(self.key(worker_id))
+            states = await pipe.execute()
+        return [
+            {"worker_id": worker_id, **state}
+            for worker_id, state in zip(worker_ids, states)
+            if state
+        ]
+
+    async def run(
+        self,
+        worker_id: str,
+        info: Callable[[], Dict[str, Any]],
+        interval: float = 5.0,
+    ):
+        """Beat every interval seconds until cancelled, then deregister"""
+        try:
+            while True:
+                try:
+                    await self.beat(worker_id, info())
+                except aioredis.RedisError:
+                    logger.exception("Worker heartbeat failed")
+                await asyncio.sleep(interval)
+        finally:
+            try:
+                await self.remove(worker_id)
+            except aioredis.RedisError:
+                logger.exception("Deregistering worker %s failed", worker_id)
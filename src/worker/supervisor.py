@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from multiprocessing.process import BaseProcess
+from typing import Any, Callable, Dict, List, Optional
+
+from src.channels.registry import close_channels
+from src.core.config.env_data import Config
+from src.database.db import async_engine
+from src.database.redis_client import get_redis
+from src.dispatch.service import (
+    broadcast_scheduler,
+    build_dispatcher,
+    build_shard_worker,
+    retry_scheduler,
+)
+from src.metrics.service import metrics_exporter
+from src.template_module.service import template_renderer
+from src.utils.logger import stop_logging
+
+from .registry import WorkerRegistry
+
+logger = logging.getLogger(__name__)
+
+# a child that dies sooner than this after starting counts as crash looping
+CRASH_LOOP_WINDOW = 10.0
+
+
+def install_uvloop() -> bool:
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+async def serve(worker_id: str, stop: asyncio.Event):
+    """
+    The dispatch loop of one worker process: queue consumers (or the shard
+    consumers with DISPATCH_SHARDS), the retry promoter, the scheduled
+    broadcast runner, the digest coalescer, the metrics writer and the
+    heartbeat. Once stop is set the consumers finish the batches in hand,
+    then the rest is flushed and shut down.
+    """
+    shard_worker = None
+    if Config.DISPATCH_SHARDS:
+        shard_worker = build_shard_worker(worker_id)
+        dispatcher = shard_worker.dispatcher
+        consume = shard_worker.run(stop)
+    else:
+        dispatcher = build_dispatcher()
+        consume = dispatcher.run_consumers(
+            Config.DISPATCH_CONSUMERS,
+            reserved=Config.DISPATCH_RESERVED_CONSUMERS,
+            batch_size=Config.DISPATCH_BATCH_SIZE,
+            stop=stop,
+        )
+    started_at = time.time()
+
+    def info() -> Dict[str, Any]:
+        state: Dict[str, Any] = {
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "started_at": started_at,
+            "sent": dispatcher.sent,
+            "failed": dispatcher.failed,
+        }
+        if shard_worker is not None:
+            state["shards"] = sorted(shard_worker.consumers)
+        return state
+
+    registry = WorkerRegistry(get_redis(), ttl=Config.WORKER_HEARTBEAT_TTL)
+    background = [
+        asyncio.create_task(retry_scheduler.run()),
+        asyncio.create_task(broadcast_scheduler.run()),
+        asyncio.create_task(metrics_exporter.run()),
+        asyncio.create_task(
+            registry.run(worker_id, info, Config.WORKER_HEARTBEAT_INTERVAL)
+        ),
+    ]
+    if dispatcher.coalescer is not None:
+        background.append(asyncio.create_task(dispatcher.coalescer.run()))
+    try:
+        await consume
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await close_channels()
+        template_renderer.shutdown()
+        await async_engine.dispose()
+
+
+def run_worker(index: int, use_uvloop: bool = True):
+    """Entry point of a worker process; SIGTERM or SIGINT drains it"""
+    # the supervisor's handlers come along with the fork
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if use_uvloop and not install_uvloop():
+        logger.info("uvloop is not installed, using the default event loop")
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+        logger.info("Worker %d (%s) started", index, worker_id)
+        await serve(worker_id, stop)
+        logger.info("Worker %d (%s) drained", index, worker_id)
+
+    try:
+        asyncio.run(main())
+    finally:
+        # forked children skip atexit, write out what is still queued
+        stop_logging()
+
+
+class Supervisor:
+    """
+    Forks one worker process per index below processes, each running
+    target(index), and keeps them running: a child that exits while the supervisor isn't stopping is
+    restarted, after a backoff doubling up to backoff_max when it keeps
+    dying right after starting. SIGTERM or SIGINT stops the supervisor: it
+    passes SIGTERM on, gives the children drain_timeout seconds to finish
+    their work, then kills what is left. A second signal kills right away.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        target: Callable[[int], None],
+        drain_timeout: float = 30.0,
+        backoff_max: float = 30.0,
+        poll_interval: float = 0.5,
+    ):
+        self.processes = processes
+        self.target = target
+        self.drain_timeout = drain_timeout
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.context = multiprocessing.get_context("fork")
+        self.children: List[Optional[BaseProcess]] = [None] * processes
+        self.started_at = [0.0] * processes
+        self.restart_at = [0.0] * processes
+        self.failures = [0] * processes
+        self.restarts = 0
+        self._signals = 0
+
+    def _signal(self, _signum, _frame):
+        self._signals += 1
+        if self._signals > 1:
+            logger.warning("Second signal, killing workers")
+            self._kill()
+
+    def _start(self, index: int):
+        child = self.context.Process(
+            target=self.target, args=(index,), name=f"worker-{index}"
+        )
+        child.start()
+        self.children[index] = child
+        self.started_at[index] = time.monotonic()
+
+    def _check(self, index: int):
+        """Restart a dead child once its backoff has passed"""
+        child = self.children[index]
+        now = time.monotonic()
+        if child is not None:
+            if child.is_alive():
+                return
+            child.join()
+            self.children[index] = None
+            if now - self.started_at[index] < CRASH_LOOP_WINDOW:
+                self.failures[index] += 1
+            else:
+                self.failures[index] = 0
+            delay = 0.0
+            if self.failures[index]:
+                delay = min(self.backoff_max, 0.5 * 2 ** self.failures[index])
+            self.restart_at[index] = now + delay
+            logger.warning(
+                "Worker %d (pid %s) exited with %s, restarting in %.1fs",
+                index,
+                child.pid,
+                child.exitcode,
+                delay,
+            )
+            self.restarts += 1
+        if now >= self.restart_at[index]:
+            self._start(index)
+
+    def _alive(self) -> List[BaseProcess]:
+        return [child for child in self.children if child and child.is_alive()]
+
+    def _kill(self):
+        for child in self._alive():
+            child.kill()
+
+    def _drain(self):
+        alive = self._alive()
+        logger.info("Draining %d workers", len(alive))
+        for child in alive:
+            child.terminate()
+        deadline = time.monotonic() + self.drain_timeout
+        while self._alive() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if self._alive():
+            logger.warning(
+                "%d workers still busy after %.0fs, killing them",
+                len(self._alive()),
+                self.drain_timeout,
+            )
+            self._kill()
+        for child in self.children:
+            if child is not None:
+                child.join()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._signal)
+        signal.signal(signal.SIGINT, self._signal)
+        logger.info("Starting %d workers", self.processes)
+        try:
+            while not self._signals:
+                for index in range(self.processes):
+                    self._check(index)
+                time.sleep(self.poll_interval)
+        finally:
+            self._drain()
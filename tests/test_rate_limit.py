@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from src.dispatch.rate_limit import RateLimiter
+
+WORKERS = 8
+DURATION = 2.0
+
+
+async def _throughput(rate: float) -> float:
+    """Tokens per second that WORKERS limiters sharing one bucket hand out"""
+    redis = fakeredis.aioredis.FakeRedis()
+    limiters = [RateLimiter(redis, "provider", rate) for _ in range(WORKERS)]
+    # start from an empty bucket, so the initial burst doesn't count
+    for limiter in limiters:
+        while await limiter.try_acquire():
+            pass
+    acquired = 0
+
+    async def consume(limiter: RateLimiter, deadline: float):
+        nonlocal acquired
+        while time.monotonic() < deadline:
+            await limiter.acquire()
+            acquired += 1
+
+    started = time.monotonic()
+    await asyncio.gather(
+        *(consume(limiter, started + DURATION) for limiter in limiters)
+    )
+    return acquired / (time.monotonic() - started)
+
+
+@pytest.mark.parametrize("rate", [100, 500, 2000])
+def test_concurrent_limiters_hold_the_shared_rate(rate):
+    throughput = asyncio.run(_throughput(rate))
+    assert throughput == pytest.approx(rate, rel=0.02)